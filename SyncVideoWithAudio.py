@@ -1,12 +1,9 @@
 import subprocess
 import os
-import numpy as np
-import librosa
-from scipy.signal import correlate
-if os.path.exists("temp_video_audio.wav"):
-    os.remove("temp_video_audio.wav")
+from audioAlignment import align_files, measure_drift
+from mediaProbe import probe, read_audio
 def sync_audio_to_video(video_path, audio_path, output_path, 
-                        tolerance=1000, offset=0, debug=False):
+                        tolerance=1000, offset=0, debug=False, drift_windows=1):
     """
     Syncs audio to a video using advanced checks and features.
 
@@ -17,13 +14,14 @@ def sync_audio_to_video(video_path, audio_path, output_path,
     tolerance (int): Maximum allowed duration mismatch in milliseconds (default is 1000).
     offset (int): Initial offset to apply to the audio (default is 0).
     debug (bool): If True, enables printing of debug information (default is False).
+    drift_windows (int): Number of windows across the file checked for audio drift (default is 1, no check).
     """
     if not os.path.exists(video_path):
         raise ValueError(f"Video file not found: {video_path}")
     if not os.path.exists(audio_path):
         raise ValueError(f"Audio file not found: {audio_path}")
 
-    # Get video and audio durations
+    # Get video and audio durations (one ffprobe call per file, reused below)
     video_duration = get_media_duration(video_path)
     audio_duration = get_media_duration(audio_path)
 
@@ -33,17 +31,15 @@ def sync_audio_to_video(video_path, audio_path, output_path,
             f"Duration mismatch: video ({video_duration:.2f}s), audio ({audio_duration:.2f}s)"
         )
 
-    # Extract audio from the video (if available)
-    video_audio_temp = "temp_video_audio.wav"
-    extracted_audio = extract_audio_from_video(video_path, video_audio_temp, debug)
-
-    if not extracted_audio:
+    # Align the audio to the video's own audio, decoded through a pipe (no temporary file)
+    if probe(video_path)['has_audio']:
+        calculated_offset = align_audio_cross_correlation(video_path, audio_path, debug,
+                                                          drift_windows=drift_windows, loader=read_audio)
+    else:
+        # Silence carries no timing, so there is nothing to align to
         if debug:
-            print("No audio stream found in video, generating silent audio...")
-        generate_silent_audio(video_duration, video_audio_temp)
-
-    # Align the audio and calculate offset
-    calculated_offset = align_audio_cross_correlation(video_audio_temp, audio_path, debug)
+            print(f"No audio stream found in video: {video_path}")
+        calculated_offset = 0
 
     # Sync audio to video using FFmpeg
     sync_with_ffmpeg(video_path, audio_path, output_path, offset + calculated_offset, debug)
@@ -51,67 +47,40 @@ def sync_audio_to_video(video_path, audio_path, output_path,
     print(f"Audio synced to video: {output_path}")
 
 def get_media_duration(file_path):
-    """Gets the duration of a video or audio file using FFprobe."""
-    try:
-        return float(subprocess.check_output(
-            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-             '-of', 'default=noprint_wrappers=1:nokey=1', file_path]
-        ).decode('utf-8'))
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Error getting file duration: {e}")
-
-def extract_audio_from_video(video_path, output_audio_path, debug=False):
-    """Extracts audio from video if it exists."""
-    if os.path.exists(output_audio_path):
-        if debug:
-            print(f"Audio file already exists: {output_audio_path}")
-        return output_audio_path
+    """Gets the duration of a video or audio file using FFprobe (cached, see mediaProbe.probe)."""
+    duration = probe(file_path)['duration']
+    if duration is None:
+        raise RuntimeError(f"Error getting file duration: {file_path}")
+    return duration
+
+def align_audio_cross_correlation(video_audio_path, external_audio_path, debug=False,
+                                  window=30, max_lag=10, drift_windows=1, drift_tolerance=0.04, loader=None):
+    """
+    Aligns audio using cross-correlation of onset envelopes, refined at full rate.
 
-    try:
-        output = subprocess.check_output(
-            ['ffprobe', '-v', 'error', '-show_entries', 'stream=index,codec_type',
-             '-select_streams', 'a', '-of', 'json', video_path]
-        )
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"FFprobe failed: {e}")
+    Parameters:
+    video_audio_path (str): Audio extracted from the video (the reference).
+    external_audio_path (str): Audio to align to it.
+    debug (bool): If True, prints the offsets found (default is False).
+    window (float): Seconds of audio decoded and correlated (default is 30).
+    max_lag (float): Largest offset searched, in seconds (default is 10).
+    drift_windows (int): Number of windows spread over the file checked for drift (default is 1, no check).
+    drift_tolerance (float): Offset change over the file, in seconds, above which drift is reported.
+    loader (callable): Decodes (path, start, duration) to (samples, sample rate); mediaProbe.read_audio
+        decodes the audio of video files, audioAlignment.load_window (the default) audio files.
+    """
+    offset = align_files(video_audio_path, external_audio_path, 0.0, window, max_lag, loader=loader)
 
-    if b'"codec_type": "audio"' not in output:
+    if drift_windows > 1:
+        duration = get_media_duration(video_audio_path)
+        offsets, drift = measure_drift(video_audio_path, external_audio_path, duration, drift_windows,
+                                       min(window, 10), max_lag, loader=loader)
         if debug:
-            print(f"No audio stream found in video: {video_path}")
-        return None
-
-    try:
-        subprocess.run(
-            ['ffmpeg', '-i', video_path, '-q:a', '0', '-map', 'a', output_audio_path],
-            check=True
-        )
-        return output_audio_path
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"FFmpeg failed: {e}")
-
-def generate_silent_audio(duration, output_path):
-    """Generates a silent audio file of the specified duration."""
-    try:
-        subprocess.run(
-            ['ffmpeg', '-f', 'lavfi', '-i', 
-             f'anullsrc=channel_layout=mono:sample_rate=44100', 
-             '-t', str(duration), output_path], check=True)
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Error generating silent audio: {e}")
-
-def align_audio_cross_correlation(video_audio_path, external_audio_path, debug=False):
-    """Aligns audio using cross-correlation."""
-    video_audio, sr_video = librosa.load(video_audio_path, sr=44100)
-    external_audio, sr_external = librosa.load(external_audio_path, sr=44100)
-
-    # Use a smaller segment of the audio for cross-correlation
-    segment_length = min(len(video_audio), len(external_audio), sr_video * 30)  # 30 seconds segment
-    video_audio_segment = video_audio[:segment_length]
-    external_audio_segment = external_audio[:segment_length]
-
-    correlation = correlate(external_audio_segment, video_audio_segment, mode='full')
-    lag = np.argmax(correlation) - len(video_audio_segment) + 1
-    offset = lag / sr_video
+            for start, window_offset in offsets:
+                print(f"Offset at {start:.1f}s: {window_offset:.3f} seconds")
+        if abs(drift * duration) > drift_tolerance:
+            print(f"[WARNING] Audio drifts by {drift * duration * 1000:.0f} ms over the video, "
+                  f"a single offset cannot sync it everywhere.")
 
     if debug:
         print(f"Calculated offset: {offset:.3f} seconds")
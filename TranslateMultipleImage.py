@@ -4,9 +4,11 @@ translates the extracted text to a target language, and replaces the original te
 with the translated text. The processed images are saved in a specified output folder.
 
 Usage:
-1. Ensure the 'ExportedImages' folder contains the images to be processed.
-2. Ensure the 'TranslatedImages' folder is empty or contains no conflicting filenames.
-3. Run the script and follow the prompts.
+1. Ensure the 'ExportedImages' folder (or --input-folder) contains the images to be processed.
+2. Ensure the 'TranslatedImages' folder (or --output-folder) is empty or contains no conflicting filenames.
+3. Run the script and follow the prompts, or pass --mode to run without any prompt, e.g.
+   python TranslateMultipleImage.py --mode thread --source en --target de --workers 8
+   (python TranslateMultipleImage.py --help lists every option)
 
 Dependencies:
 - deep_translator
@@ -14,134 +16,515 @@ Dependencies:
 - concurrent.futures
 """
 
-print("[INFO] Starting the image processing...")
-
-from PIL import Image, ImageDraw, ImageFont
-from deep_translator import GoogleTranslator
+from PIL import Image, ImageDraw
 import os
-import easyocr
+import argparse
+import math
+import contextlib
+from fontFitting import get_default_fitter
+from glyphCache import get_default_glyph_cache
+from backgroundColor import estimate_background_colors
+from batchTranslation import translate_texts
+from translationModels import get_reader, get_translator, set_torch_threads
+from translationCache import memory_stats
+from roiOcr import RegionOfInterest, parse_band, roi_batch_ocr, roi_ocr
+from batchOcr import batch_ocr, DEFAULT_CONFIDENCE_THRESHOLD, DEFAULT_WIDTH_THS, DEFAULT_DECODER
+from detectionScale import DEFAULT_MIN_TEXT_HEIGHT, readtext_downscaled
+from ocrInput import readtext_rgb
+from pipeline import translate_images, save_image
+from metrics import get_metrics, profile
+from jobManifest import JobManifest, DEFAULT_MANIFEST_FILENAME, select_frames
 import warnings
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import sys
 import time
 warnings.filterwarnings("ignore", category=RuntimeWarning, module="easyocr.utils")
 
-print("[INFO] Please make sure ExportedImages folder is empty!")
-print("[INFO] Please make sure TranslatedImages folder is empty!")
-print("[Warning] please make sure TranslatedImages folder is empty !")
-
-#add command line pause or ask user to press enter
-input("Press Enter to continue...")
-def process_image(filename, input_folder, output_folder, reader, translator):
-    print(f"[INFO] Processing {filename}...")
-
-    image_path = os.path.join(input_folder, filename)
-    extracted_text_boxes = perform_ocr(image_path, reader)
-
-    translated_texts = []
-    for box in extracted_text_boxes:
-        text = box[1]
-        try:
-            translated_texts.append(translator.translate(text))
-        except Exception as e:
-            print(f"[WARNING] Translation error for '{text}': {e}")
-            print(f"[WARNING] No translation found for: {text}")
-            translated_texts.append(None)
-
-    image = overlay_translated_text(image_path, translated_texts, extracted_text_boxes)
-
-    output_path = os.path.join(output_folder, filename)
-    image.save(output_path)
-    print(f"[INFO] Saved {filename} to {output_folder}.")
-
-print("[INFO] Loading the OCR and translation models...")
+def process_images(filenames, input_folder, output_folder, reader, translator, manifest=None):
+    # OCR the whole group first: text crops of all its images share recognizer batches
+    # and their strings share translation batches
+    for filename in filenames:
+        print(f"[INFO] Processing {filename}...")
+    metrics = get_metrics()
+    image_paths = [os.path.join(input_folder, filename) for filename in filenames]
+    start = time.perf_counter()
+    run_batch = lambda images: batch_ocr(images, reader, confidence_threshold=ocr_confidence_threshold,
+                                         width_ths=ocr_width_ths, decoder=ocr_decoder,
+                                         detection_scale=ocr_detection_scale, min_text_height=ocr_min_text_height)
+    if region_of_interest is not None:
+        # Only the subtitle/caption bands are OCR'd, boxes come back in frame coordinates
+        ocr_results = list(zip(filenames, image_paths, roi_batch_ocr(image_paths, region_of_interest, run_batch)))
+    else:
+        ocr_results = list(zip(filenames, image_paths, run_batch(image_paths)))
+    # Group stages are shared out evenly, so every stage has one timing per image
+    share_durations(metrics, "ocr", time.perf_counter() - start, len(filenames))
+
+    start = time.perf_counter()
+    texts = [box[1] for _, _, extracted_text_boxes in ocr_results for box in extracted_text_boxes]
+    translations = translate_texts(translator, texts)
+    share_durations(metrics, "translate", time.perf_counter() - start, len(filenames))
+
+    # Scatter translations back to their images
+    offset = 0
+    for filename, image_path, extracted_text_boxes in ocr_results:
+        translated_texts = translations[offset:offset + len(extracted_text_boxes)]
+        offset += len(extracted_text_boxes)
+
+        with metrics.timer("load"):
+            image = Image.open(image_path)
+            image.load()
+
+        image = overlay_translated_text(image, translated_texts, extracted_text_boxes)
+
+        output_path = os.path.join(output_folder, output_filename(filename))
+        with metrics.timer("save"):
+            save_image(image, output_path)
+        if manifest is not None:
+            manifest.mark_done(filename, image_path, output_path)
+        print(f"[INFO] Saved {os.path.basename(output_path)} to {output_folder}.")
+    record_cache_gauges(translator)
+
+def record_cache_gauges(translator):
+    # Cache sizes of this process, reported with the stage timings (worker processes send theirs back)
+    metrics = get_metrics()
+    glyph_stats = get_default_glyph_cache().stats()
+    metrics.set_gauge("glyph_cache_entries", glyph_stats["entries"])
+    metrics.set_gauge("glyph_cache_bytes", glyph_stats["bytes"])
+    if hasattr(translator, "stats"):
+        metrics.set_gauge("translation_memory_entries", translator.stats()["memory_entries"])
+
+def share_durations(metrics, stage, seconds, count):
+    for _ in range(count):
+        metrics.observe(stage, seconds / count)
+
+def process_image(filename, input_folder, output_folder, reader, translator, manifest=None):
+    process_images([filename], input_folder, output_folder, reader, translator, manifest)
+
+# Options of every processing function, set from the command line by configure()
 source_lang = "en"
 target_lang = "fr"
-reader = easyocr.Reader([source_lang, target_lang], model_storage_directory='model')
-translator = GoogleTranslator(source="en", target="fr")
-
-def main():
-    input_folder = "ExportedImages"
-    output_folder = "TranslatedImages"
-    choice = input("Do you want to process images one by one or process multiple images? (Enter 1 for one by one or 2 for multiple files same time): ").strip().lower()
-    if choice not in ["1", "2"]:
-        print("[ERROR] Invalid choice. Please Enter 1 for one by one or 2 for multiple for multiple files same time.")
-        return
-
-    if choice == "1":
-        for filename in os.listdir(input_folder):
-            if filename.lower().endswith((".jpg", ".jpeg", ".png")):
-                process_image(filename, input_folder, output_folder, reader, translator)
-        return
+ocr_confidence_threshold = DEFAULT_CONFIDENCE_THRESHOLD  # Boxes at or below this confidence are dropped
+ocr_width_ths = DEFAULT_WIDTH_THS  # How close boxes must be for easyocr to merge them
+ocr_decoder = DEFAULT_DECODER
+ocr_detection_scale = None  # 'auto' or a factor to detect text on a downscaled copy, None for full resolution
+ocr_min_text_height = DEFAULT_MIN_TEXT_HEIGHT  # Smallest text expected, bounds the 'auto' detection scale
+output_format = None  # Extension of the saved images (png, jpg, webp), None to keep the input's
+output_suffix = ""  # Appended to the output file names, e.g. "-translated"
+translator_backend = "google"  # See translationModels.create_backend
+translator_options = {}  # url, concurrency, rate and glossary of the backend
+region_of_interest = None  # roiOcr.RegionOfInterest when OCR is limited to bands of the frames
+MODES = {"1": "sequential", "2": "thread", "3": "process", "4": "pipeline"}
+FRAMES_PER_TRANSLATION_BATCH = 8  # Images whose strings are translated together in option 1
+FRAMES_PER_PROCESS_CHUNK = 8  # Images sent to a worker process at once in option 3
+
+def configure(source=None, target=None, confidence_threshold=None, width_ths=None, decoder=None,
+              image_format=None, suffix=None, backend=None, backend_options=None, roi=None,
+              detection_scale=None, min_text_height=None):
+    """
+    Sets the options used by the processing functions; options left to None are not changed.
+
+    Args:
+        source (str): Language of the text in the images.
+        target (str): Language to translate the text to.
+        confidence_threshold (float): OCR boxes at or below this confidence are dropped.
+        width_ths (float): easyocr width_ths, how close boxes must be to be merged.
+        decoder (str): easyocr decoder ('greedy', 'beamsearch' or 'wordbeamsearch').
+        image_format (str): Format of the saved images ('png', 'jpg', 'webp'), or 'same'.
+        suffix (str): Appended to the output file names.
+        backend (str): Translation backend, see translationModels.create_backend.
+        backend_options (dict): url, concurrency, rate and glossary passed to the backend.
+        roi (dict): bands, learn_frames and refresh_interval of a roiOcr.RegionOfInterest, or
+            an empty dict to OCR whole frames.
+        detection_scale (str): 'auto', a factor in (0, 1] applied before text detection, or 'off'.
+        min_text_height (int): Smallest text expected in the images, in pixels.
+    """
+    global source_lang, target_lang, ocr_confidence_threshold, ocr_width_ths, ocr_decoder
+    global output_format, output_suffix, translator_backend, translator_options, region_of_interest
+    global ocr_detection_scale, ocr_min_text_height
+    if source is not None:
+        source_lang = source
+    if target is not None:
+        target_lang = target
+    if confidence_threshold is not None:
+        ocr_confidence_threshold = confidence_threshold
+    if width_ths is not None:
+        ocr_width_ths = width_ths
+    if decoder is not None:
+        ocr_decoder = decoder
+    if image_format is not None:
+        output_format = None if image_format == "same" else image_format
+    if suffix is not None:
+        output_suffix = suffix
+    if backend is not None:
+        translator_backend = backend
+    if backend_options is not None:
+        translator_options = dict(backend_options)
+    if roi is not None:
+        region_of_interest = RegionOfInterest(**roi) if roi.get("bands") or roi.get("learn_frames") else None
+    if detection_scale is not None:
+        ocr_detection_scale = None if detection_scale == "off" else detection_scale
+    if min_text_height is not None:
+        ocr_min_text_height = min_text_height
+
+def current_settings():
+    # The options as configure() arguments, so worker processes can apply them too
+    return {"source": source_lang, "target": target_lang, "confidence_threshold": ocr_confidence_threshold,
+            "width_ths": ocr_width_ths, "decoder": ocr_decoder, "image_format": output_format or "same",
+            "suffix": output_suffix, "backend": translator_backend, "backend_options": translator_options,
+            "roi": roi_settings(), "detection_scale": ocr_detection_scale or "off",
+            "min_text_height": ocr_min_text_height}
+
+def roi_settings():
+    # Each worker process learns its own bands from its first frames
+    if region_of_interest is None:
+        return {}
+    return {"bands": region_of_interest.configured_bands, "learn_frames": region_of_interest.learn_frames,
+            "refresh_interval": region_of_interest.refresh_interval}
+
+def output_filename(filename):
+    base_filename, extension = os.path.splitext(filename)
+    if output_format is not None:
+        extension = "." + output_format
+    return f"{base_filename}{output_suffix}{extension}"
+
+def output_settings():
+    # Options that change the saved images; a file completed with other ones is redone on resume
+    return {"source": source_lang, "target": target_lang, "output_format": output_format,
+            "output_suffix": output_suffix, "translator": translator_backend,
+            "glossary": translator_options.get("glossary")}
+
+def create_reader():
+    # Loaded on first use and then shared, so importing this module does not load torch
+    return get_reader(source_lang, target_lang)
+
+def create_translator():
+    # Repeated strings are answered from the on-disk translation memory, the rest go out in batches
+    return get_translator(source_lang, target_lang, translator_backend, **translator_options)
+
+# Per-process models used by option 3, created once by init_ocr_worker
+worker_reader = None
+worker_translator = None
+worker_manifests = {}
+
+def init_ocr_worker(torch_threads, translator_factory=create_translator, settings=None):
+    global worker_reader, worker_translator
+
+    # Processes started with spawn do not inherit the options set by the parent
+    if settings is not None:
+        configure(**settings)
+
+    # Split the cores between workers instead of letting every torch pool use all of them
+    set_torch_threads(torch_threads)
+
+    worker_reader = create_reader()
+    worker_translator = translator_factory()
+
+def ocr_in_worker(image):
+    # The OCR timings of the worker go back with the boxes, to be merged by the parent
+    return perform_ocr(image, worker_reader), get_metrics().snapshot(reset=True)
+
+def process_chunk_in_worker(filenames, input_folder, output_folder, manifest_path=None):
+    # Each process keeps its own connection to the manifest
+    manifest = None
+    if manifest_path is not None:
+        if manifest_path not in worker_manifests:
+            worker_manifests[manifest_path] = JobManifest(manifest_path, output_settings())
+        manifest = worker_manifests[manifest_path]
+
+    process_images(filenames, input_folder, output_folder, worker_reader, worker_translator, manifest)
+
+    # The parent merges the timings of every chunk into its own metrics
+    return get_metrics().snapshot(reset=True)
+
+def run_in_processes(filenames, input_folder, output_folder, num_workers, translator_factory=create_translator,
+                     manifest=None):
+    """
+    Processes images with a pool of processes, each owning its own easyocr.Reader.
+
+    Args:
+        filenames (list): Image file names inside input_folder.
+        input_folder (str): Folder containing the images.
+        output_folder (str): Folder where the translated images are saved.
+        num_workers (int): Number of worker processes.
+        translator_factory (callable): Picklable function creating each worker's translator.
+        manifest (JobManifest): Optional manifest where completed and failed files are recorded.
+    """
+    torch_threads = max(1, (os.cpu_count() or 1) // num_workers)
+    chunks = [filenames[start:start + FRAMES_PER_PROCESS_CHUNK]
+              for start in range(0, len(filenames), FRAMES_PER_PROCESS_CHUNK)]
+    print(f"[INFO] Starting {num_workers} OCR worker processes with {torch_threads} torch threads each...")
+
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=init_ocr_worker,
+                             initargs=(torch_threads, translator_factory, current_settings())) as executor:
+        manifest_path = manifest.path if manifest is not None else None
+        futures = {executor.submit(process_chunk_in_worker, chunk, input_folder, output_folder, manifest_path): chunk
+                   for chunk in chunks}
+        for future, chunk in futures.items():
+            try:
+                get_metrics().merge(future.result())
+            except Exception as e:
+                get_metrics().count("failed_images", len(chunk))
+                print(f"[ERROR] Failed to process {chunk[0]}..{chunk[-1]}: {e}")
+                if manifest is not None:
+                    for filename in chunk:
+                        manifest.mark_failed(filename, e)
+
+def run_pipeline(filenames, input_folder, output_folder, num_workers, manifest=None):
+    """Processes images with the staged pipeline, running OCR in num_workers processes."""
+    torch_threads = max(1, (os.cpu_count() or 1) // num_workers)
+    print(f"[INFO] Starting the pipeline with {num_workers} OCR worker processes...")
+
+    # Record every saved image so an interrupted run can be resumed
+    on_saved = None
+    if manifest is not None:
+        on_saved = lambda job: manifest.mark_done(job["filename"], job["image_path"], job["output_path"])
+
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=init_ocr_worker,
+                             initargs=(torch_threads, create_translator, current_settings())) as ocr_executor:
+        pipeline = translate_images(filenames, input_folder, output_folder, ocr_in_worker,
+                                    create_translator(), overlay_translated_text,
+                                    ocr_workers=num_workers, ocr_executor=ocr_executor,
+                                    output_name=output_filename, on_saved=on_saved)
+    pipeline.print_stats()
+    record_cache_gauges(create_translator())
+
+def detection_scale_arg(value):
+    # 'auto', 'off' or a factor in (0, 1]
+    if value in ("auto", "off"):
+        return value
+    scale = float(value)
+    if not 0.0 < scale <= 1.0:
+        raise argparse.ArgumentTypeError(f"detection scale must be in (0, 1], 'auto' or 'off', got {value}")
+    return scale
+
+def shard_arg(value):
+    # I/N with 0 <= I < N
+    try:
+        shard_index, shard_count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must be written as I/N, e.g. 0/4, got {value}")
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise argparse.ArgumentTypeError(f"shard index must be from 0 to N - 1 with N >= 1, got {value}")
+    return shard_index, shard_count
+
+def parse_args(argv=None, defaults=None):
+    """
+    Parses the command line options.
+
+    Args:
+        argv (list): Arguments to parse, sys.argv[1:] when None.
+        defaults (dict): Default values overriding the ones below, e.g. the folders used by main.py.
+    """
+    parser = argparse.ArgumentParser(description="Translate the text inside every image of a folder.")
+    parser.add_argument("--mode", choices=list(MODES.values()) + list(MODES),
+                        help="sequential (1), thread (2), process (3) or pipeline (4); asked interactively "
+                             "when omitted and running in a terminal, sequential otherwise")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of threads or processes for the thread, process and pipeline modes "
+                             "(default: CPU count for threads, CPU count / 4 for processes)")
+    parser.add_argument("--input-folder", default="ExportedImages", help="Folder containing the images")
+    parser.add_argument("--output-folder", default="TranslatedImages", help="Folder where translated images are saved")
+    parser.add_argument("--source", default="en", help="Language of the text in the images")
+    parser.add_argument("--target", default="fr", help="Language to translate the text to")
+    parser.add_argument("--translator", choices=["google", "google-async", "libretranslate", "glossary"],
+                        default="google",
+                        help="Translation backend: google (blocking, batched requests), google-async (concurrent "
+                             "requests with retries), libretranslate (a LibreTranslate-compatible API) or "
+                             "glossary (offline, from --glossary)")
+    parser.add_argument("--glossary", default=None,
+                        help="Glossary file (.json, .tsv or .csv) of the glossary backend")
+    parser.add_argument("--translation-url", default=None,
+                        help="Endpoint of the translation service (required for libretranslate)")
+    parser.add_argument("--translation-concurrency", type=int, default=8,
+                        help="Translation requests in flight at once (asyncio backends)")
+    parser.add_argument("--translation-rate", type=float, default=None,
+                        help="Maximum translation requests per second (asyncio backends)")
+    parser.add_argument("--confidence-threshold", type=float, default=DEFAULT_CONFIDENCE_THRESHOLD,
+                        help="Drop OCR boxes at or below this confidence")
+    parser.add_argument("--width-ths", type=float, default=DEFAULT_WIDTH_THS,
+                        help="easyocr width_ths: maximum horizontal distance for boxes to be merged")
+    parser.add_argument("--decoder", choices=["greedy", "beamsearch", "wordbeamsearch"], default=DEFAULT_DECODER,
+                        help="easyocr recognizer decoder")
+    parser.add_argument("--roi", type=parse_band, action="append", default=[],
+                        help="Only OCR this band of the frames, as fractions of the size: Y0:Y1 for a full-width "
+                             "band (e.g. 0.75:1 for the bottom quarter) or X0,Y0,X1,Y1; can be repeated")
+    parser.add_argument("--roi-learn", type=int, default=0,
+                        help="OCR the first N frames whole and then only the bands where text appeared")
+    parser.add_argument("--roi-refresh", type=int, default=0,
+                        help="With --roi or --roi-learn, OCR every Nth frame whole to find text in new places")
+    parser.add_argument("--detection-scale", type=detection_scale_arg, default="off",
+                        help="Detect text on a copy scaled by this factor (0-1], 'auto' to choose it from the "
+                             "image size and --min-text-height, or 'off'")
+    parser.add_argument("--min-text-height", type=int, default=DEFAULT_MIN_TEXT_HEIGHT,
+                        help="Height in pixels of the smallest text to find, limits the 'auto' detection scale")
+    parser.add_argument("--output-format", choices=["same", "png", "jpg", "webp"], default="same",
+                        help="Format of the saved images (same keeps the input format)")
+    parser.add_argument("--output-suffix", default="", help="Appended to every output file name")
+    parser.add_argument("--first-frame", type=int, default=None,
+                        help="Only process files whose frame number is at least this")
+    parser.add_argument("--last-frame", type=int, default=None,
+                        help="Only process files whose frame number is at most this")
+    parser.add_argument("--shard", type=shard_arg, default="0/1",
+                        help="Process only shard I of N (frame number modulo N), written as I/N; files "
+                             "without a frame number go to shard 0")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Process every file again, even those completed by a previous run")
+    parser.add_argument("--verify-inputs", action="store_true",
+                        help="When resuming, also redo files whose input changed since they were completed")
+    parser.add_argument("--metrics-json", help="Save per-stage timings, histograms and counters to this JSON file")
+    parser.add_argument("--metrics-prometheus",
+                        help="Save the metrics to this file in the Prometheus textfile format")
+    parser.add_argument("--profile", help="Run the job under cProfile and save the profile to this file")
+    if defaults:
+        parser.set_defaults(**defaults)
+    return parser.parse_args(argv)
+
+def main(argv=None, defaults=None):
+    args = parse_args(argv, defaults)
+    output_folder = args.output_folder
+    configure(args.source, args.target, args.confidence_threshold, args.width_ths, args.decoder,
+              args.output_format, args.output_suffix, args.translator,
+              {"url": args.translation_url, "concurrency": args.translation_concurrency,
+               "rate": args.translation_rate, "glossary": args.glossary},
+              {"bands": args.roi, "learn_frames": args.roi_learn,
+               "refresh_interval": args.roi_refresh},
+              args.detection_scale, args.min_text_height)
+
+    print("[INFO] Starting the image processing...")
+    print(f"[INFO] Translating from '{source_lang}' to '{target_lang}'.")
+    if ocr_detection_scale is not None:
+        print(f"[INFO] Text detection scale: {ocr_detection_scale} (smallest text {ocr_min_text_height} px).")
+
+    mode = args.mode
+    if mode is None and sys.stdin.isatty():
+        print(f"[Warning] please make sure {output_folder} folder is empty !")
+        #add command line pause or ask user to press enter
+        input("Press Enter to continue...")
+        mode = input("Do you want to process images one by one or process multiple images? (Enter 1 for one by one, 2 for multiple files same time, 3 for multiple files in separate processes or 4 for the staged pipeline): ").strip().lower()
+        if mode not in MODES:
+            print("[ERROR] Invalid choice. Please Enter 1 for one by one, 2 for multiple files same time, 3 for multiple files in separate processes or 4 for the staged pipeline.")
+            return
+    elif mode is None:
+        # Nobody can answer a prompt (scheduler, pipe), so run the default mode
+        mode = "sequential"
+    mode = MODES.get(mode, mode)
+    print(f"[INFO] Mode: {mode}.")
+
+    # Optionally profile the whole job with cProfile (py-spy can also attach to the running process)
+    with profile(args.profile) if args.profile else contextlib.nullcontext():
+        run_job(args, mode)
+
+    # Per-stage timings and counters of this run (merged from the worker processes in process mode)
+    if region_of_interest is not None and region_of_interest.full_frames + region_of_interest.roi_frames:
+        print(f"[INFO] Regions of interest: {region_of_interest.stats()}")
+
+    metrics = get_metrics()
+    print("[INFO] Stage timings:")
+    metrics.print_summary()
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
+        print(f"[INFO] Metrics saved to {args.metrics_json}.")
+    if args.metrics_prometheus:
+        metrics.write_prometheus(args.metrics_prometheus, {"mode": mode})
+        print(f"[INFO] Prometheus metrics saved to {args.metrics_prometheus}.")
+    # For the closing message of the script
+    return output_folder
+
+def run_job(args, mode):
+    input_folder = args.input_folder
+    output_folder = args.output_folder
+    filenames = [filename for filename in os.listdir(input_folder)
+                 if filename.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))]
 
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
-    
-    if choice == "2":
-        num_workers = os.cpu_count() or 1
+
+    # Select this machine's part of the job and skip what a previous run already completed
+    shard_index, shard_count = args.shard
+    filenames = select_frames(filenames, args.first_frame, args.last_frame, shard_index, shard_count)
+    manifest_name = DEFAULT_MANIFEST_FILENAME if shard_count == 1 else f"job_manifest_{shard_index}_of_{shard_count}.sqlite"
+    manifest = JobManifest(os.path.join(output_folder, manifest_name), output_settings())
+    if not args.no_resume:
+        total_files = len(filenames)
+        filenames = manifest.pending(filenames, input_folder, args.verify_inputs,
+                                     lambda filename: os.path.join(output_folder, output_filename(filename)))
+        print(f"[INFO] Resuming: {total_files - len(filenames)} of {total_files} files already completed.")
+
+    if mode in ["process", "pipeline"]:
+        # Each process loads its own models, so the parent does not load any OCR model
+        num_workers = args.workers or max(1, (os.cpu_count() or 1) // 4)
+        get_metrics().set_gauge("workers", num_workers)
+        if mode == "process":
+            run_in_processes(filenames, input_folder, output_folder, num_workers, manifest=manifest)
+            # The workers translated, their memory counters were merged into this process's metrics
+            summary = get_metrics().summary()
+            counters = summary["counters"]
+            stats = memory_stats(counters.get("translation_memory_hits", 0), counters.get("translation_memory_misses", 0),
+                                 counters.get("translation_memory_evictions", 0),
+                                 summary["gauges"].get("translation_memory_entries", 0))
+            print(f"[INFO] Translation memory (all workers): {stats}")
+        else:
+            run_pipeline(filenames, input_folder, output_folder, num_workers, manifest)
+            print(f"[INFO] Translation memory: {create_translator().stats()}")
+        print(f"[INFO] Job manifest: {manifest.summary()}")
+        return
+
+    print("[INFO] Loading the OCR and translation models...")
+    reader = create_reader()
+    translator = create_translator()
+
+    if mode == "sequential":
+        for start in range(0, len(filenames), FRAMES_PER_TRANSLATION_BATCH):
+            process_images(filenames[start:start + FRAMES_PER_TRANSLATION_BATCH],
+                           input_folder, output_folder, reader, translator, manifest)
+
+    if mode == "thread":
+        num_workers = args.workers or os.cpu_count() or 1
+        get_metrics().set_gauge("workers", num_workers)
         with ThreadPoolExecutor(max_workers=num_workers) as executor:
-            futures = [executor.submit(process_image, filename, input_folder, output_folder, reader, translator)
-                    for filename in os.listdir(input_folder)
-                    if filename.lower().endswith((".jpg", ".jpeg", ".png"))]
+            futures = {executor.submit(process_image, filename, input_folder, output_folder, reader, translator, manifest): filename
+                       for filename in filenames}
 
             total_files = len(futures)
-            for i, future in enumerate(futures):
+            for i, (future, filename) in enumerate(futures.items()):
                 try:
                     future.result()
                 except Exception as e:
-                    print(f"[ERROR] Failed to process {futures[i].filename}: {e}")
+                    get_metrics().count("failed_images")
+                    print(f"[ERROR] Failed to process {filename}: {e}")
+                    manifest.mark_failed(filename, e)
                 # Uncomment the following lines to show progress
                 # progress = (i + 1) / total_files * 100
                 # print(f"[INFO] Progress: {progress:.2f}%")
 
+    print(f"[INFO] Translation memory: {translator.stats()}")
+    print(f"[INFO] Job manifest: {manifest.summary()}")
+
 def perform_ocr(image_path, reader):
+    with get_metrics().timer("ocr"):
+        # Only OCR the bands of interest when configured, boxes come back in frame coordinates
+        if region_of_interest is not None:
+            return roi_ocr(image_path, region_of_interest, lambda image: read_text_boxes(image, reader))
+        return read_text_boxes(image_path, reader)
+
+def read_text_boxes(image, reader):
     # Perform OCR on the image
-    result = reader.readtext(image_path, width_ths = 0.8,  decoder = 'wordbeamsearch')
+    if ocr_detection_scale is not None:
+        # Detect on a downscaled copy, recognize the full-resolution crops
+        result = readtext_downscaled(reader, image, ocr_detection_scale, ocr_min_text_height,
+                                     width_ths=ocr_width_ths, decoder=ocr_decoder)
+    else:
+        result = readtext_rgb(reader, image, width_ths = ocr_width_ths,  decoder = ocr_decoder)
 
     # Extract text and bounding boxes from the OCR result
-    extracted_text_boxes = [(entry[0], entry[1]) for entry in result if entry[2] > 0.4]
+    extracted_text_boxes = [(entry[0], entry[1]) for entry in result if entry[2] > ocr_confidence_threshold]
 
     return extracted_text_boxes
 
 def get_font(image, text, width, height):
-
-    # Default values at start
-    font_size = None  # For font size
-    font = None  # For object truetype with correct font size
-    box = None  # For version 8.0.0
-    x = 0
-    y = 0
-
-    draw = ImageDraw.Draw(image)  # Create a draw object
-
-    # Test for different font sizes
-    for size in range(1, 500):
-
-        # Create new font
-        new_font = ImageFont.truetype("DejaVuSans-Bold.ttf", size=size)
-
-        # Calculate bbox for version 8.0.0
-        new_box = draw.textbbox((0, 0), text, font=new_font)
-
-        # Calculate width and height
-        new_w = new_box[2] - new_box[0]  # Bottom - Top
-        new_h = new_box[3] - new_box[1]  # Right - Left
-
-        # If too big then exit with previous values
-        if new_w > width or new_h > height:
-            break
-
-        # Set new current values as current values
-        font_size = size
-        font = new_font
-        box = new_box
-        w = new_w
-        h = new_h
-
-        # Calculate position (minus margins in box)
-        x = (width - w) // 2 - box[0]  # Minus left margin
-        y = (height - h) // 2 - box[1]  # Minus top margin
-
-    return font, x, y
+    # Find the largest cached font that fits the box (bisection instead of trying every size)
+    with get_metrics().timer("font"):
+        return get_default_fitter().fit(text, width, height)
 
 def adjust_color_brightness(color, strength):
     r, g, b = color
@@ -150,18 +533,6 @@ def adjust_color_brightness(color, strength):
     b = max(0, min(255, b + strength))
     return (r, g, b)
 
-def extract_background_color(image, x_min, y_min, x_max, y_max):
-    margin = 10
-    region = image.crop((
-        max(x_min - margin, 0),
-        max(y_min - margin, 0),
-        min(x_max + margin, image.width),
-        min(y_max + margin, image.height),
-    ))
-    edge_colors = region.getcolors(region.size[0] * region.size[1])
-    background_color = max(edge_colors, key=lambda x: x[0])[1]
-    return adjust_color_brightness(background_color, 40)
-
 def determine_text_color(background_color):
     # Calculate the luminance of the background color
     luminance = (
@@ -177,14 +548,12 @@ def determine_text_color(background_color):
         return "white"  # Use white text for dark backgrounds
 
 def overlay_translated_text(image_path, translated_texts, text_boxes):
-    # Open the image
-    image = Image.open(image_path)
+    # Open the image (or draw directly on an already decoded one)
+    image = image_path if isinstance(image_path, Image.Image) else Image.open(image_path)
     draw = ImageDraw.Draw(image)
 
-    # Load a font that supports French accent marks
-    font = ImageFont.truetype("DejaVuSans-Bold.ttf", size=20)
-    
-    # Replace each text box with translated text
+    # Find the bounds of every box that has a translation
+    boxes = []
     for text_box, translated in zip(text_boxes, translated_texts):
 
         if translated is None:
@@ -207,33 +576,59 @@ def overlay_translated_text(image_path, translated_texts, text_boxes):
             elif y > y_max:
                 y_max = y
 
-        # Find the most common color in the text region
-        background_color = extract_background_color(image, x_min, y_min, x_max, y_max)
+        boxes.append((x_min, y_min, x_max, y_max, translated))
+
+    # Find the most common color around every text region in one pass over the image
+    metrics = get_metrics()
+    glyph_cache = get_default_glyph_cache()
+    with metrics.timer("background"):
+        edge_colors = estimate_background_colors(image, [box[:4] for box in boxes])
+
+    # Replace each text box with translated text
+    draw_time = 0.0
+    for (x_min, y_min, x_max, y_max, translated), edge_color in zip(boxes, edge_colors):
+
+        # Add a bit of discoloration to the background color
+        background_color = adjust_color_brightness(edge_color, 40)
 
         # Draw a rectangle to cover the text region with the original background color
+        start = time.perf_counter()
         draw.rectangle(((x_min, y_min), (x_max, y_max)), fill=background_color)
+        draw_time += time.perf_counter() - start
 
         # Calculate font size, box
         font, x, y = get_font(image, translated, x_max - x_min, y_max - y_min)
-
-        # Draw the translated text within the box
-        draw.text(
-            (x_min + x, y_min + y),
-            translated,
-            fill=determine_text_color(background_color),
-            font=font,
-        )
+        text_x, text_y = x_min + x, y_min + y
+
+        # Draw the translated text within the box, reusing its mask when it was already drawn at
+        # this size and subpixel position (draw.text handles the default font and negative positions)
+        start = time.perf_counter()
+        fill = determine_text_color(background_color)
+        if font is None or text_x < 0 or text_y < 0:
+            draw.text((text_x, text_y), translated, fill=fill, font=font)
+        else:
+            subpixel = (math.modf(text_x)[0], math.modf(text_y)[0])
+            glyphs = glyph_cache.get(translated, font, draw.fontmode, subpixel)
+            if glyphs is None:
+                glyphs = glyph_cache.put(translated, font, draw.fontmode, subpixel)
+            mask, x, y = glyphs
+            draw.bitmap((int(text_x) + x, int(text_y) + y), mask, fill=fill)
+        draw_time += time.perf_counter() - start
+
+    # Drawing is timed once per image, get_font once per box
+    metrics.observe("draw", draw_time)
 
     return image
 
 start_time = time.time()
 
 if __name__ == "__main__":
-    main()
+    output_folder = main()
     end_time = time.time()
     elapsed_time = end_time - start_time
     elapsed_minutes = elapsed_time / 60
     print(f"[INFO] Image processing completed in {elapsed_minutes:.2f} minutes.")
-    print("[INFO] Please check the 'TranslatedImages' folder for the processed images.")
+    if output_folder is not None:
+        print(f"[INFO] Please check the '{output_folder}' folder for the processed images.")
     print("[INFO] Thank you for using the image processing script!")
 
@@ -0,0 +1,255 @@
+'''
+This module translates texts with asyncio over one pooled HTTP session, so many requests are in
+flight at once without a thread per request.
+
+Requests go through a semaphore (concurrency) and a token bucket (requests per second), failed or
+throttled requests are retried with exponential backoff, and identical texts requested while a
+translation is already running wait for that request instead of sending another one.
+
+The HTTP protocol is pluggable: GoogleWebProtocol talks to the same endpoint as deep_translator's
+GoogleTranslator, and LibreTranslateProtocol to any LibreTranslate-compatible JSON API, such as
+the local stub server in benchmarks/stubTranslationServer.py.
+
+AsyncTranslator wraps the client for the synchronous code: it runs the event loop in a background
+thread and has the translate/translate_many methods used by batchTranslation.translate_texts.
+'''
+
+import asyncio
+import atexit
+import html
+import json
+import random
+import re
+import threading
+import time
+from metrics import get_metrics
+
+GOOGLE_WEB_URL = "https://translate.google.com/m"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TranslationRequestError(Exception):
+    """Raised when the service answers with an error status or an unreadable body."""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class GoogleWebProtocol:
+    """Requests and parses the mobile Google Translate page, like deep_translator.GoogleTranslator."""
+
+    _result = re.compile(r'<div class="result-container">(.*?)</div>', re.S)
+
+    def __init__(self, url=GOOGLE_WEB_URL):
+        self.url = url
+
+    def request(self, text, source, target):
+        return "GET", self.url, {"params": {"sl": source, "tl": target, "q": text}}
+
+    def parse(self, body, text):
+        match = self._result.search(body)
+        if match is None:
+            raise TranslationRequestError(f"No translation found in the response for '{text}'")
+        return html.unescape(match.group(1)).strip()
+
+
+class LibreTranslateProtocol:
+    """Posts {"q", "source", "target"} as JSON and reads "translatedText" from the JSON answer."""
+
+    def __init__(self, url, api_key=None):
+        self.url = url
+        self.api_key = api_key
+
+    def request(self, text, source, target):
+        payload = {"q": text, "source": source, "target": target, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+        return "POST", self.url, {"json": payload}
+
+    def parse(self, body, text):
+        try:
+            return json.loads(body)["translatedText"]
+        except (ValueError, KeyError) as e:
+            raise TranslationRequestError(f"Unexpected response for '{text}': {e}")
+
+
+class TokenBucket:
+    """
+    Allows rate requests per second on average, with bursts of up to capacity requests.
+
+    Args:
+        rate (float): Tokens added per second; None or 0 disables the limit.
+        capacity (float): Maximum number of tokens saved up, defaults to rate.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate or 1
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Callers queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncTranslationClient:
+    """
+    Translates texts over HTTP with pooling, rate limiting, retries and request coalescing.
+
+    Args:
+        source (str): Source language code.
+        target (str): Target language code.
+        protocol: Builds requests and parses answers (GoogleWebProtocol by default).
+        concurrency (int): Maximum number of requests in flight (also the connection pool size).
+        rate (float): Maximum requests per second (token bucket), None for no limit.
+        burst (float): Requests allowed at once before the rate limit applies, defaults to rate.
+        retries (int): Attempts after the first one for network errors, 429 and 5xx answers.
+        backoff (float): Delay before the first retry in seconds, doubled at every attempt.
+        max_backoff (float): Upper bound of the retry delay.
+        timeout (float): Timeout of one request in seconds.
+    """
+
+    def __init__(self, source="en", target="fr", protocol=None, concurrency=8, rate=None, burst=None,
+                 retries=4, backoff=0.5, max_backoff=8.0, timeout=10.0):
+        self.source = source
+        self.target = target
+        self.protocol = protocol or GoogleWebProtocol()
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._session = None
+        self._semaphore = None
+        self._in_flight = {}  # Text -> future of its translation, shared by identical requests
+
+    async def _get_session(self):
+        if self._session is None:
+            # Imported here so the synchronous code paths do not need aiohttp
+            import aiohttp
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _request(self, text):
+        session = await self._get_session()
+        method, url, options = self.protocol.request(text, self.source, self.target)
+        async with self._semaphore:
+            await self.bucket.acquire()
+            async with session.request(method, url, **options) as response:
+                body = await response.text()
+                if response.status != 200:
+                    retry_after = response.headers.get("Retry-After")
+                    raise TranslationRequestError(
+                        f"HTTP {response.status} for '{text}'", response.status,
+                        float(retry_after) if retry_after and retry_after.isdigit() else None)
+        return self.protocol.parse(body, text)
+
+    async def _translate_with_retries(self, text):
+        import aiohttp
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._request(text)
+            except (aiohttp.ClientError, asyncio.TimeoutError, TranslationRequestError) as e:
+                retryable = not isinstance(e, TranslationRequestError) or e.status in RETRY_STATUSES
+                if not retryable or attempt == self.retries:
+                    raise
+                get_metrics().count("translation_retries")
+                wait = getattr(e, "retry_after", None) or delay
+                # Jitter spreads the retries of many failed requests over time
+                await asyncio.sleep(min(self.max_backoff, wait) * random.uniform(0.5, 1.0))
+                delay = min(self.max_backoff, delay * 2)
+
+    async def translate(self, text):
+        """Translates one text; concurrent calls with the same text share one request."""
+        if not text or not text.strip():
+            return text
+        future = self._in_flight.get(text)
+        if future is None:
+            future = asyncio.ensure_future(self._translate_with_retries(text))
+            self._in_flight[text] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(text, None))
+        else:
+            get_metrics().count("translation_coalesced")
+        # Shielded so one caller being cancelled does not cancel the request of the others
+        return await asyncio.shield(future)
+
+    async def translate_many(self, texts):
+        """Translates texts concurrently; texts that still fail after the retries become None."""
+        async def translate_or_none(text):
+            try:
+                return await self.translate(text)
+            except Exception as e:
+                get_metrics().count("translation_errors")
+                print(f"[WARNING] Translation error for '{text}': {e}")
+                return None
+
+        return list(await asyncio.gather(*(translate_or_none(text) for text in texts)))
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncTranslator:
+    """
+    Synchronous facade over AsyncTranslationClient, running its event loop in a daemon thread.
+
+    Calls from several threads are all served by the same loop and session, so texts requested at
+    the same time by different images are coalesced too.
+
+    Args:
+        client (AsyncTranslationClient): The client to run; keyword arguments create one instead.
+    """
+
+    def __init__(self, client=None, **client_options):
+        self.client = client or AsyncTranslationClient(**client_options)
+        self.source = self.client.source
+        self.target = self.client.target
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._closed = False
+        # Close the HTTP session cleanly when the program ends without calling close()
+        atexit.register(self.close)
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def translate(self, text):
+        """Translates one text, raising the last error when every attempt failed."""
+        return self._run(self.client.translate(text))
+
+    def translate_many(self, texts):
+        """Translates a list of texts concurrently; failures become None."""
+        return self._run(self.client.translate_many(texts))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._run(self.client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
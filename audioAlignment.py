@@ -0,0 +1,206 @@
+'''
+This module finds the offset between two recordings of the same audio, e.g. the audio track of a
+video and its translated or re-recorded version.
+
+Only the needed windows of the files are decoded. The lag is first found by FFT correlation of
+onset (or RMS) envelopes at about 100 values per second, which is cheap even over long windows,
+then refined by correlating the samples at full rate in a small neighborhood of that lag.
+Several windows spread over the files can be aligned to detect drift, when the offset at the end
+differs from the offset at the start.
+'''
+
+import numpy as np
+from scipy.signal import correlate, resample_poly
+
+DEFAULT_ENVELOPE_RATE = 100  # Envelope values per second for the coarse correlation
+DEFAULT_REFINE_SECONDS = 5.0  # Length of the full-rate segment used to refine the lag
+
+
+def load_window(path, start=0.0, duration=None, sr=None):
+    """
+    Decodes a window of an audio file as mono float samples.
+
+    Args:
+        path (str): Audio file.
+        start (float): Start of the window, in seconds.
+        duration (float): Length of the window in seconds, None for the rest of the file.
+        sr (int): Sample rate to resample to, None to keep the file's.
+
+    Returns:
+        tuple: (samples, sample rate).
+    """
+    # Imported here so importing this module does not load librosa
+    import librosa
+
+    return librosa.load(path, sr=sr, mono=True, offset=max(0.0, start), duration=duration)
+
+
+def envelope(signal, hop, kind="onset"):
+    """
+    Reduces a signal to one value per hop samples.
+
+    Args:
+        signal (numpy.ndarray): Mono samples.
+        hop (int): Samples per envelope value.
+        kind (str): 'rms' for the loudness of each frame, 'onset' for its increase over the
+            previous frame, which has sharper peaks and ignores gain differences.
+
+    Returns:
+        numpy.ndarray: The envelope, with zero mean and unit variance.
+    """
+    frames = len(signal) // hop
+    blocks = np.asarray(signal[:frames * hop], dtype=np.float32).reshape(frames, hop)
+    values = np.sqrt(np.mean(blocks * blocks, axis=1))
+    if kind == "onset":
+        values = np.maximum(np.diff(values, prepend=values[:1]), 0.0)
+    values = values - values.mean()
+    std = values.std()
+    return values / std if std > 0 else values
+
+
+def best_lag(reference, other, min_lag, max_lag):
+    """
+    Returns the lag L in [min_lag, max_lag] maximizing the correlation of other[n + L] with
+    reference[n], computed with FFTs.
+    """
+    correlation = correlate(other, reference, mode="full", method="fft")
+    zero = len(reference) - 1  # Index of lag 0 in the full correlation
+    low = max(0, zero + min_lag)
+    high = min(len(correlation), zero + max_lag + 1)
+    return low + int(np.argmax(correlation[low:high])) - zero
+
+
+def refine_lag(reference, other, lag, radius, segment):
+    """
+    Refines a coarse lag at full rate, correlating a segment of reference with other around it.
+
+    Args:
+        reference (numpy.ndarray): Reference samples.
+        other (numpy.ndarray): Samples of the other recording.
+        lag (int): Coarse lag, in samples.
+        radius (int): Largest correction searched, in samples.
+        segment (int): Length of the reference segment correlated.
+
+    Returns:
+        int: The refined lag, or the coarse lag when the recordings overlap too little.
+    """
+    # The reference segment [start, start + length) must have other samples on both sides of the lag
+    first = max(0, radius - lag)
+    last = min(len(reference), len(other) - lag - radius)
+    length = min(segment, last - first)
+    if length < radius:
+        return lag
+    start = first + (last - first - length) // 2  # Middle of the overlap
+
+    reference_segment = reference[start:start + length]
+    other_segment = other[start + lag - radius:start + lag + length + radius]
+    correlation = correlate(other_segment, reference_segment, mode="valid", method="fft")
+    return lag + int(np.argmax(correlation)) - radius
+
+
+def estimate_offset(reference, other, sr, reference_start=0.0, other_start=0.0, envelope_rate=DEFAULT_ENVELOPE_RATE,
+                    kind="onset", refine_seconds=DEFAULT_REFINE_SECONDS, max_lag=None):
+    """
+    Finds the offset of other relative to reference, from windows of both recordings.
+
+    Args:
+        reference (numpy.ndarray): Window of the reference recording (the video's audio).
+        other (numpy.ndarray): Window of the other recording, at the same sample rate.
+        sr (int): Sample rate of both windows.
+        reference_start (float): Time of the reference window in its file, in seconds.
+        other_start (float): Time of the other window in its file, in seconds.
+        envelope_rate (int): Envelope values per second for the coarse search.
+        kind (str): Envelope kind, 'onset' or 'rms'.
+        refine_seconds (float): Length of the full-rate refinement segment, 0 to skip it.
+        max_lag (float): Largest offset returned, in seconds either way; None searches every overlap.
+
+    Returns:
+        float: Offset in seconds: what plays at time t of the reference plays at t + offset in other.
+    """
+    window_offset = other_start - reference_start
+    hop = max(1, int(sr // envelope_rate))
+    reference_envelope = envelope(reference, hop, kind)
+    other_envelope = envelope(other, hop, kind)
+    if not len(reference_envelope) or not len(other_envelope):
+        return window_offset
+
+    # Lags, in samples, whose offset is within max_lag
+    lowest, highest = -(len(reference) - 1), len(other) - 1
+    if max_lag is not None:
+        lowest = max(lowest, int(np.ceil((-max_lag - window_offset) * sr)))
+        highest = min(highest, int(np.floor((max_lag - window_offset) * sr)))
+        if lowest > highest:
+            return min(max(window_offset, -max_lag), max_lag)
+
+    min_lag = max(-(len(reference_envelope) - 1), -(-lowest // hop))
+    max_lag_hops = min(len(other_envelope) - 1, highest // hop)
+    coarse = best_lag(reference_envelope, other_envelope, min_lag, max(min_lag, max_lag_hops))
+    lag = coarse * hop
+    if refine_seconds:
+        lag = refine_lag(reference, other, lag, 2 * hop, int(refine_seconds * sr))
+    # The refinement can step past the bounds by up to its radius
+    lag = min(max(lag, lowest), highest)
+    return window_offset + lag / sr
+
+
+def match_rate(samples, sr, target_sr):
+    # Resamples only when the two files differ
+    if sr == target_sr:
+        return samples
+    divisor = np.gcd(int(sr), int(target_sr))
+    return resample_poly(samples, int(target_sr) // divisor, int(sr) // divisor).astype(np.float32)
+
+
+def align_files(reference_path, other_path, start=0.0, window=30.0, max_lag=10.0, envelope_rate=DEFAULT_ENVELOPE_RATE,
+                kind="onset", refine_seconds=DEFAULT_REFINE_SECONDS, loader=None):
+    """
+    Finds the offset of other_path relative to reference_path around one position.
+
+    Args:
+        reference_path (str): Reference audio file.
+        other_path (str): Audio file to align.
+        start (float): Start of the reference window, in seconds.
+        window (float): Length of the reference window, in seconds.
+        max_lag (float): Largest offset searched, in seconds; the other window is this much
+            longer on each side and no larger offset is returned.
+        envelope_rate (int): Envelope values per second for the coarse search.
+        kind (str): Envelope kind, 'onset' or 'rms'.
+        refine_seconds (float): Length of the full-rate refinement segment, 0 to skip it.
+        loader (callable): Decodes (path, start, duration) to (samples, sample rate), load_window
+            by default (mediaProbe.read_audio decodes video files with ffmpeg).
+
+    Returns:
+        float: Offset in seconds, positive when other_path plays later.
+    """
+    loader = loader or load_window
+    reference, sr = loader(reference_path, start, window)
+    other_start = max(0.0, start - max_lag)
+    other, other_sr = loader(other_path, other_start, window + start - other_start + max_lag)
+    return estimate_offset(reference, match_rate(other, other_sr, sr), sr, start, other_start, envelope_rate,
+                           kind, refine_seconds, max_lag)
+
+
+def measure_drift(reference_path, other_path, duration, windows=4, window=10.0, max_lag=10.0, **options):
+    """
+    Aligns several windows spread over the files, to detect an offset changing over time.
+
+    Args:
+        reference_path (str): Reference audio file.
+        other_path (str): Audio file to align.
+        duration (float): Duration of the reference, in seconds.
+        windows (int): Number of windows aligned.
+        window (float): Length of each window, in seconds.
+        max_lag (float): Largest offset searched, in seconds.
+        **options: envelope_rate, kind, refine_seconds and loader, passed to align_files.
+
+    Returns:
+        tuple: ([(window start, offset)], drift in seconds per second of the reference).
+    """
+    last_start = max(0.0, duration - window)
+    starts = np.linspace(0.0, last_start, windows) if windows > 1 else [0.0]
+    offsets = [(float(start), align_files(reference_path, other_path, start, window, max_lag, **options))
+               for start in starts]
+    if len(offsets) < 2 or last_start == 0.0:
+        return offsets, 0.0
+    slope = np.polyfit([start for start, _ in offsets], [offset for _, offset in offsets], 1)[0]
+    return offsets, float(slope)
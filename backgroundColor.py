@@ -0,0 +1,68 @@
+'''
+This module estimates the background color behind OCR text boxes with NumPy.
+
+Only the ring of pixels around each box (the margin, not the text itself) is sampled. Colors are
+quantized to 5 bits per channel and counted with np.bincount; the result is the average of the
+real colors falling in the most common bucket. The image is converted to an array once for all of
+its boxes, instead of building a Python list of every distinct color per box with getcolors.
+'''
+
+import numpy as np
+
+DEFAULT_MARGIN = 10
+QUANTIZATION_BITS = 5
+
+
+def ring_pixels(array, x_min, y_min, x_max, y_max, margin=DEFAULT_MARGIN):
+    """Returns the (N, 3) pixels of the margin ring around a box, or the whole box if there is no ring."""
+    height, width = array.shape[:2]
+    x_min, y_min = max(int(round(x_min)), 0), max(int(round(y_min)), 0)
+    x_max, y_max = min(int(round(x_max)), width), min(int(round(y_max)), height)
+    outer_x_min, outer_y_min = max(x_min - margin, 0), max(y_min - margin, 0)
+    outer_x_max, outer_y_max = min(x_max + margin, width), min(y_max + margin, height)
+
+    outer = array[outer_y_min:outer_y_max, outer_x_min:outer_x_max]
+    mask = np.ones(outer.shape[:2], dtype=bool)
+    mask[y_min - outer_y_min:y_max - outer_y_min, x_min - outer_x_min:x_max - outer_x_min] = False
+
+    pixels = outer[mask]
+    if len(pixels) == 0:
+        # The box covers the whole image, fall back to the box itself
+        pixels = outer.reshape(-1, array.shape[2])
+    return pixels
+
+
+def dominant_color(pixels, bits=QUANTIZATION_BITS):
+    """Returns the most common color of (N, 3) uint8 pixels as an (r, g, b) tuple."""
+    if len(pixels) == 0:
+        return (255, 255, 255)
+
+    shift = 8 - bits
+    quantized = (pixels >> shift).astype(np.int32)
+    index = (quantized[:, 0] << (2 * bits)) | (quantized[:, 1] << bits) | quantized[:, 2]
+    best = np.bincount(index, minlength=1 << (3 * bits)).argmax()
+
+    # Average the real colors of the winning bucket to undo the quantization
+    color = pixels[index == best].mean(axis=0).round().astype(int)
+    return tuple(int(channel) for channel in color[:3])
+
+
+def estimate_background_colors(image, boxes, margin=DEFAULT_MARGIN):
+    """
+    Estimates the background color around every box of an image.
+
+    Args:
+        image (PIL.Image.Image or numpy.ndarray): The image (an array must be RGB).
+        boxes (list): (x_min, y_min, x_max, y_max) tuples.
+        margin (int): Width of the ring sampled around each box.
+
+    Returns:
+        list: One (r, g, b) tuple per box.
+    """
+    if not boxes:
+        return []
+    if isinstance(image, np.ndarray):
+        array = image
+    else:
+        array = np.asarray(image.convert("RGB") if image.mode != "RGB" else image)
+    return [dominant_color(ring_pixels(array, *box, margin=margin)) for box in boxes]
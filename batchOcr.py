@@ -0,0 +1,85 @@
+'''
+This module runs OCR on many images at once, pooling the text crops of all images into large
+recognizer batches.
+
+easyocr's readtext recognizes every box on its own when running on CPU, with a batch of one crop.
+Here detection still runs per image, but the crops of all images are grouped by the padded width
+the recognizer would use for them alone, so each group runs as a few large batches and gives the
+same results as readtext, including its per-language handling (greedy decoding for Chinese,
+display order for Arabic).
+
+With detection_scale, detection runs on a downscaled copy of each image (see detectionScale.py)
+while the crops are still cut from the full-resolution image.
+'''
+
+from detectionScale import DEFAULT_MIN_TEXT_HEIGHT, detect_downscaled, resolve_scale
+from ocrInput import reformat_rgb
+
+DEFAULT_CONFIDENCE_THRESHOLD = 0.4
+DEFAULT_WIDTH_THS = 0.8
+DEFAULT_DECODER = "wordbeamsearch"
+
+
+def batch_ocr(images, reader, batch_size=64, confidence_threshold=DEFAULT_CONFIDENCE_THRESHOLD,
+              width_ths=DEFAULT_WIDTH_THS, decoder=DEFAULT_DECODER, detection_scale=None,
+              min_text_height=DEFAULT_MIN_TEXT_HEIGHT):
+    """
+    Performs OCR on several images, like perform_ocr on each of them.
+
+    Args:
+        images (list): Image paths, PIL images or RGB arrays.
+        reader (easyocr.Reader): The OCR reader.
+        batch_size (int): Maximum number of crops recognized in one forward pass.
+        confidence_threshold (float): Boxes at or below this confidence are dropped.
+        width_ths (float): Passed to the detector to merge close boxes.
+        decoder (str): Recognizer decoder ('greedy', 'beamsearch' or 'wordbeamsearch').
+        detection_scale: 'auto', a factor in (0, 1] applied to the images before detection, or
+            None to detect at full resolution.
+        min_text_height (int): Smallest text expected, bounding the 'auto' scale.
+
+    Returns:
+        list: For every image, its list of (bbox, text) boxes.
+    """
+    # Imported here so importing this module does not load torch
+    from easyocr.config import imgH
+    from easyocr.recognition import get_text
+    from easyocr.utils import get_image_list
+
+    ignore_char = "".join(set(reader.character) - set(reader.lang_char))
+    # Per-language handling of readtext (Reader.recognize)
+    if reader.model_lang in ("chinese_tra", "chinese_sim"):
+        decoder = "greedy"
+
+    # Detect text in every image and cut out its crops, keeping readtext's box order
+    groups = {}  # padded width -> [(image index, box order, box, crop)]
+    for image_index, image in enumerate(images):
+        img, img_cv_grey = reformat_rgb(image)
+        scale = resolve_scale(detection_scale, img.shape[1], img.shape[0], min_text_height)
+        horizontal_list, free_list = detect_downscaled(reader, img, scale, width_ths)
+        boxes = [([bbox], []) for bbox in horizontal_list] + [([], [bbox]) for bbox in free_list]
+
+        for order, (h_list, f_list) in enumerate(boxes):
+            image_list, max_width = get_image_list(h_list, f_list, img_cv_grey, model_height=imgH)
+            for box, crop in image_list:
+                groups.setdefault(int(max_width), []).append((image_index, order, box, crop))
+
+    # Recognize each group of equally padded crops in large batches
+    recognized = [[] for _ in images]
+    for max_width, items in groups.items():
+        results = get_text(reader.character, imgH, max_width, reader.recognizer, reader.converter,
+                           [(box, crop) for _, _, box, crop in items], ignore_char, decoder,
+                           batch_size=batch_size, workers=0, device=reader.device)
+        for (image_index, order, _, _), (box, text, confidence) in zip(items, results):
+            recognized[image_index].append((order, box, text, confidence))
+
+    if reader.model_lang == "arabic":
+        # Recognized right to left, put in display order like readtext does
+        from bidi import get_display
+        recognized = [[(order, box, get_display(text), confidence) for order, box, text, confidence in entries]
+                      for entries in recognized]
+
+    return [
+        [(box, text) for _, box, text, confidence in sorted(entries, key=lambda entry: entry[0])
+         if confidence > confidence_threshold]
+        for entries in recognized
+    ]
@@ -0,0 +1,112 @@
+'''
+This module translates many OCR strings with as few translation requests as possible.
+
+Strings are deduplicated, joined with a separator into size-bounded batches and each batch is
+sent as one request. Results are scattered back to the original positions; when a batch cannot be
+split back cleanly, its strings are retried one by one and failures become None, like before.
+'''
+
+import threading
+from metrics import get_metrics
+
+DEFAULT_MAX_BATCH_CHARS = 4500  # Google rejects requests of 5000 characters or more
+DEFAULT_SEPARATOR = "\n"
+
+
+def translate_one(translator, text):
+    """Translates a single text, returning None instead of raising on errors."""
+    try:
+        return translator.translate(text)
+    except Exception as e:
+        get_metrics().count("translation_errors")
+        print(f"[WARNING] Translation error for '{text}': {e}")
+        print(f"[WARNING] No translation found for: {text}")
+        return None
+
+
+def translate_texts(translator, texts):
+    """
+    Translates a list of texts, using the translator's batch path when it has one.
+
+    Args:
+        translator: Object with translate(text) and optionally translate_many(texts).
+        texts (list): Texts to translate.
+
+    Returns:
+        list: Translations in the same order as texts, None where translation failed.
+    """
+    if not texts:
+        return []
+    if hasattr(translator, "translate_many"):
+        return translator.translate_many(texts)
+    return [translate_one(translator, text) for text in texts]
+
+
+def chunk_texts(texts, max_chars, separator=DEFAULT_SEPARATOR):
+    """Groups texts so that each joined group stays within max_chars (single long texts stay alone)."""
+    batch = []
+    size = 0
+    for text in texts:
+        extra = len(text) + (len(separator) if batch else 0)
+        if batch and size + extra > max_chars:
+            yield batch
+            batch = []
+            extra = len(text)
+            size = 0
+        batch.append(text)
+        size += extra
+    if batch:
+        yield batch
+
+
+class BatchTranslator:
+    """
+    Sends several texts per request by joining them with a separator.
+
+    Requests go out one at a time: deep_translator's GoogleTranslator keeps the text of the current
+    request on the instance, so concurrent calls from several threads could swap their texts.
+
+    Args:
+        translator: Object with a translate(text) method, e.g. GoogleTranslator.
+        max_batch_chars (int): Maximum length of one joined request.
+        separator (str): Delimiter between texts; the service must keep it in its output.
+    """
+
+    def __init__(self, translator, max_batch_chars=DEFAULT_MAX_BATCH_CHARS, separator=DEFAULT_SEPARATOR):
+        self.translator = translator
+        self.max_batch_chars = max_batch_chars
+        self.separator = separator
+        self.source = getattr(translator, "source", "auto")
+        self.target = getattr(translator, "target", "en")
+        self._lock = threading.Lock()
+
+    def translate(self, text):
+        with self._lock:
+            return self.translator.translate(text)
+
+    def translate_many(self, texts):
+        unique_texts = list(dict.fromkeys(texts))
+
+        # Texts containing the separator cannot be split back, so they are sent on their own
+        joinable = [text for text in unique_texts if self.separator not in text]
+        results = {text: translate_one(self, text) for text in unique_texts if self.separator in text}
+
+        for batch in chunk_texts(joinable, self.max_batch_chars, self.separator):
+            results.update(self._translate_batch(batch))
+
+        return [results.get(text) for text in texts]
+
+    def _translate_batch(self, batch):
+        if len(batch) > 1:
+            try:
+                joined = self.translate(self.separator.join(batch))
+                parts = joined.split(self.separator) if joined else []
+                if len(parts) == len(batch):
+                    return {text: part.strip() for text, part in zip(batch, parts)}
+                get_metrics().count("translation_batch_retries")
+                print(f"[WARNING] Batch of {len(batch)} texts came back as {len(parts)} parts, retrying one by one.")
+            except Exception as e:
+                get_metrics().count("translation_batch_retries")
+                print(f"[WARNING] Batch translation failed, retrying {len(batch)} texts one by one: {e}")
+
+        return {text: translate_one(self, text) for text in batch}
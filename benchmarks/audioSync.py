@@ -0,0 +1,112 @@
+'''
+This script compares the audio alignment of SyncVideoWithAudio.py (audioAlignment.py) with the
+previous implementation, which loaded both files whole resampled to 44.1 kHz and correlated the
+first 30 seconds sample by sample, on synthetic audio with known offsets. The audio is written at
+48 kHz by default, the usual rate of video soundtracks.
+
+The reference is a speech-like signal (bursts of filtered noise and tones separated by pauses);
+the aligned file is the same signal shifted by the offset, with a different gain and added noise.
+A drift case stretches it slightly, so the offset grows along the file.
+
+Usage (from the repository root):
+    python -m benchmarks.audioSync --duration 600 --offsets -2.5,0.35,1.234
+'''
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import soundfile
+from scipy.signal import correlate, lfilter, resample
+from audioAlignment import align_files, load_window, measure_drift
+
+
+def speech_like(duration, sr, rng):
+    # Syllable-like bursts of 50-300 ms with pauses, filtered noise mixed with a tone
+    signal = np.zeros(int(duration * sr), dtype=np.float32)
+    position = 0
+    while position < len(signal):
+        length = int(rng.uniform(0.05, 0.3) * sr)
+        burst = rng.normal(0, 1, length) * 0.3 + np.sin(2 * np.pi * rng.uniform(100, 400) * np.arange(length) / sr)
+        burst *= np.hanning(length) * rng.uniform(0.2, 1.0)
+        signal[position:position + length] = burst[:len(signal) - position]
+        position += length + int(rng.uniform(0.02, 0.4) * sr)
+    return lfilter([1.0, 0.5], [1.0], signal).astype(np.float32)
+
+
+def shifted(signal, offset, sr, rng, stretch=1.0):
+    # The signal delayed by offset seconds (advanced when negative), re-gained, noisy, optionally stretched
+    shift = int(round(offset * sr))
+    if shift >= 0:
+        output = np.concatenate([np.zeros(shift, dtype=np.float32), signal])[:len(signal)]
+    else:
+        output = np.concatenate([signal[-shift:], np.zeros(-shift, dtype=np.float32)])
+    if stretch != 1.0:
+        output = resample(output, int(len(output) * stretch)).astype(np.float32)
+    return (output * 0.7 + rng.normal(0, 0.02, len(output))).astype(np.float32)
+
+
+def legacy_align(video_audio_path, external_audio_path):
+    """The previous align_audio_cross_correlation."""
+    import librosa
+
+    video_audio, sr_video = librosa.load(video_audio_path, sr=44100)
+    external_audio, _ = librosa.load(external_audio_path, sr=44100)
+    segment_length = min(len(video_audio), len(external_audio), sr_video * 30)
+    video_audio_segment = video_audio[:segment_length]
+    external_audio_segment = external_audio[:segment_length]
+    correlation = correlate(external_audio_segment, video_audio_segment, mode='full')
+    lag = np.argmax(correlation) - len(video_audio_segment) + 1
+    return lag / sr_video
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare audio alignment methods on synthetic offset audio.")
+    parser.add_argument("--duration", type=float, default=120.0, help="Length of the synthetic audio, in seconds")
+    parser.add_argument("--offsets", default="-2.5,0.35,1.234", help="Comma-separated offsets to recover, in seconds")
+    parser.add_argument("--sample-rate", type=int, default=48000, help="Sample rate of the synthetic files")
+    parser.add_argument("--stretch", type=float, default=1.0005, help="Speed ratio of the drift case")
+    parser.add_argument("--skip-legacy", action="store_true", help="Do not run the previous implementation")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic audio")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    sr = args.sample_rate
+    reference = speech_like(args.duration, sr, rng)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        reference_path = os.path.join(workdir, "reference.wav")
+        soundfile.write(reference_path, reference, sr)
+        print(f"{args.duration:.0f}s of synthetic audio at {sr} Hz")
+        # librosa's first call compiles and loads its decoders, keep that out of the timings
+        load_window(reference_path, 0.0, 1.0, sr=44100)
+        print(f"{'offset':>8} {'method':<8} {'found':>9} {'error ms':>9} {'seconds':>8}")
+
+        for offset in (float(value) for value in args.offsets.split(",")):
+            other_path = os.path.join(workdir, "other.wav")
+            soundfile.write(other_path, shifted(reference, offset, sr, rng), sr)
+            methods = [("envelope", align_files)] + ([] if args.skip_legacy else [("legacy", legacy_align)])
+            for name, method in methods:
+                found, seconds = timed(method, reference_path, other_path)
+                print(f"{offset:8.3f} {name:<8} {found:9.4f} {abs(found - offset) * 1000:9.2f} {seconds:8.2f}")
+
+        # Drift: the offset grows linearly, from 0.5s at the start
+        drift_path = os.path.join(workdir, "drift.wav")
+        soundfile.write(drift_path, shifted(reference, 0.5, sr, rng, args.stretch), sr)
+        (offsets, drift), seconds = timed(measure_drift, reference_path, drift_path, args.duration, windows=4)
+        expected = (args.stretch - 1.0) * args.duration
+        print(f"Drift over the file: found {drift * args.duration * 1000:.1f} ms, "
+              f"expected {expected * 1000:.1f} ms ({seconds:.2f}s for {len(offsets)} windows)")
+        for start, offset in offsets:
+            print(f"  offset at {start:6.1f}s: {offset:.4f}")
+
+
+if __name__ == "__main__":
+    main()
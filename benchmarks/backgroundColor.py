@@ -0,0 +1,75 @@
+'''
+This script compares the previous getcolors-based background color estimation with the NumPy one
+from backgroundColor.py on a synthetic photo-like image.
+
+Usage (from the repository root):
+    python -m benchmarks.backgroundColor --size 1920x1080 --boxes 40
+'''
+
+import argparse
+import time
+import numpy as np
+from PIL import Image
+from backgroundColor import estimate_background_colors
+
+
+def getcolors_background(image, x_min, y_min, x_max, y_max, margin=10):
+    # The estimation used before backgroundColor.py, kept here as the reference
+    region = image.crop((
+        max(x_min - margin, 0),
+        max(y_min - margin, 0),
+        min(x_max + margin, image.width),
+        min(y_max + margin, image.height),
+    ))
+    edge_colors = region.getcolors(region.size[0] * region.size[1])
+    return max(edge_colors, key=lambda x: x[0])[1][:3]
+
+
+def synthetic_image(width, height, seed=0):
+    # A smooth gradient with noise has many distinct colors, like a photo
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width)[None, :, None]
+    y = np.linspace(0, 255, height)[:, None, None]
+    array = (x * 0.6 + y * 0.4) * np.array([1.0, 0.8, 0.6]) + rng.normal(0, 6, (height, width, 3))
+    return Image.fromarray(np.clip(array, 0, 255).astype(np.uint8))
+
+
+def synthetic_boxes(width, height, count, seed=0):
+    rng = np.random.default_rng(seed)
+    boxes = []
+    for _ in range(count):
+        box_width, box_height = int(rng.integers(80, 600)), int(rng.integers(20, 120))
+        x_min, y_min = int(rng.integers(0, width - box_width)), int(rng.integers(0, height - box_height))
+        boxes.append((x_min, y_min, x_min + box_width, y_min + box_height))
+    return boxes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark background color estimation.")
+    parser.add_argument("--size", default="1920x1080", help="Image size as WIDTHxHEIGHT")
+    parser.add_argument("--boxes", type=int, default=40, help="Number of text boxes per image")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.split("x"))
+    image = synthetic_image(width, height)
+    boxes = synthetic_boxes(width, height, args.boxes)
+
+    timings = {}
+    for name, run in [
+        ("getcolors", lambda: [getcolors_background(image, *box) for box in boxes]),
+        ("numpy", lambda: estimate_background_colors(image, boxes)),
+    ]:
+        durations = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run()
+            durations.append(time.perf_counter() - start)
+        timings[name] = min(durations)
+        print(f"{name:>9}: {timings[name] * 1000:.1f} ms per image ({args.boxes} boxes, {width}x{height})")
+
+    print(f"  speedup: {timings['getcolors'] / timings['numpy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
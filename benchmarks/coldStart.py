@@ -0,0 +1,85 @@
+'''
+This script measures the cold start of the entry points: the time and peak memory of a fresh Python
+process that only imports them or prints their --help, and whether that already loaded torch.
+
+With --load-models it also times the first (and second, cached) call to get_reader and
+get_translator, which needs the easyocr models in the 'model' folder.
+
+Usage (from the repository root):
+    python -m benchmarks.coldStart --repeat 5
+'''
+
+import argparse
+import json
+import subprocess
+import sys
+
+# Each probe runs in a new interpreter and prints its own measurements as JSON
+PROBE = '''
+import json, resource, sys, time
+extra = {{}}
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps(dict(extra, seconds=elapsed, peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                      torch_loaded="torch" in sys.modules)))
+'''
+
+PROBES = {
+    "import main": "import main",
+    "import TranslateMultipleImage": "import TranslateMultipleImage",
+    "import videoStream": "import videoStream",
+    "TranslateMultipleImage --help": (
+        "sys.argv = ['TranslateMultipleImage.py', '--help']\n"
+        "import runpy\n"
+        "try:\n"
+        "    runpy.run_path('TranslateMultipleImage.py', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass"
+    ),
+}
+
+LOAD_MODELS = '''
+from translationModels import get_reader, get_translator
+first = time.perf_counter()
+get_reader("en", "fr"); get_translator("en", "fr")
+first = time.perf_counter() - first
+second = time.perf_counter()
+get_reader("en", "fr"); get_translator("en", "fr")
+second = time.perf_counter() - second
+extra.update(first_call_seconds=first, cached_call_seconds=second)
+'''
+
+
+def run_probe(statement):
+    # Output of the probed code (e.g. --help text) comes before the JSON line, which is the last one
+    output = subprocess.check_output([sys.executable, "-c", PROBE.format(statement=statement)],
+                                     stderr=subprocess.DEVNULL).decode("utf-8")
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cold start of the entry points.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of fresh processes per probe")
+    parser.add_argument("--load-models", action="store_true",
+                        help="Also time the first load of the OCR reader and translator")
+    args = parser.parse_args()
+
+    for name, statement in PROBES.items():
+        runs = [run_probe(statement) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run["seconds"])
+        print(f"{name:<32} {best['seconds'] * 1000:8.1f} ms  peak RSS {best['peak_rss_mb']:6.0f} MB  "
+              f"torch loaded: {best['torch_loaded']}")
+
+    if args.load_models:
+        try:
+            result = run_probe(LOAD_MODELS)
+        except subprocess.CalledProcessError:
+            print("[ERROR] Could not load the models, make sure easyocr can find them in the 'model' folder.")
+            return
+        print(f"{'first get_reader/get_translator':<32} {result['first_call_seconds'] * 1000:8.1f} ms  "
+              f"(cached: {result['cached_call_seconds'] * 1000:.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()
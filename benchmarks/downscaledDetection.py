@@ -0,0 +1,137 @@
+'''
+This script compares OCR accuracy and speed when text detection runs on downscaled copies of
+high-resolution images (detectionScale.py), on the synthetic fixtures of benchmarks/suite.py.
+
+For every scale it reports the detection and total OCR time per image, the share of the known
+text lines found (a detected box overlapping the line by IoU >= 0.5) and the share of their words
+recognized. Recognition always runs on full-resolution crops, so accuracy only drops once the
+smallest text is too short for the detector.
+
+With --detector-only, only the CRAFT detector is timed, with untrained weights, which needs no
+model download: its speed does not depend on the weights, but no accuracy is reported.
+
+Usage (from the repository root):
+    python -m benchmarks.downscaledDetection --size 3840x2160 --scales 1,0.75,0.5,0.33,auto
+    python -m benchmarks.downscaledDetection --detector-only
+'''
+
+import argparse
+import tempfile
+import time
+import numpy as np
+import cv2
+from detectionScale import detect_downscaled, resolve_scale
+from benchmarks.suite import make_images
+
+
+def box_iou(a, b):
+    # a and b are (x0, y0, x1, y1)
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    return intersection / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection)
+
+
+def bbox_rect(bbox):
+    xs = [point[0] for point in bbox]
+    ys = [point[1] for point in bbox]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def score(expected, found):
+    """Returns (lines found, words recognized) as shares of the expected (bbox, text) boxes."""
+    rects = [bbox_rect(bbox) for bbox, _ in found]
+    words = {word.lower() for _, text in found for word in text.split()}
+    lines = sum(any(box_iou(bbox_rect(bbox), rect) >= 0.5 for rect in rects) for bbox, _ in expected)
+    expected_words = [word for _, text in expected for word in text.split()]
+    recognized = sum(word.lower() in words for word in expected_words)
+    return lines / max(len(expected), 1), recognized / max(len(expected_words), 1)
+
+
+def parse_scales(text):
+    return [value if value == "auto" else float(value) for value in text.split(",")]
+
+
+def run_ocr(reader, boxes_by_path, detection_scale, min_text_height):
+    from easyocr.utils import reformat_input
+
+    detect_times, total_times, lines, words = [], [], [], []
+    for path, expected in boxes_by_path.items():
+        start = time.perf_counter()
+        img, img_cv_grey = reformat_input(path)
+        scale = resolve_scale(detection_scale, img.shape[1], img.shape[0], min_text_height)
+        horizontal_list, free_list = detect_downscaled(reader, img, scale, width_ths=0.8)
+        detect_times.append(time.perf_counter() - start)
+        result = reader.recognize(img_cv_grey, horizontal_list, free_list, decoder="greedy", reformat=False)
+        total_times.append(time.perf_counter() - start)
+
+        line_share, word_share = score(expected, [(entry[0], entry[1]) for entry in result if entry[2] > 0.4])
+        lines.append(line_share)
+        words.append(word_share)
+    return np.mean(detect_times), np.mean(total_times), np.mean(lines), np.mean(words)
+
+
+def run_detector_only(paths, detection_scale, min_text_height, repeat):
+    # Times the forward pass of an untrained CRAFT on the image sizes easyocr would feed it
+    import torch
+    from easyocr.craft import CRAFT
+    from easyocr.imgproc import normalizeMeanVariance, resize_aspect_ratio
+
+    net = CRAFT().eval()
+    times = []
+    with torch.no_grad():
+        for path in paths:
+            image = cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)
+            start = time.perf_counter()
+            scale = resolve_scale(detection_scale, image.shape[1], image.shape[0], min_text_height)
+            if scale < 1.0:
+                image = cv2.resize(image, (int(image.shape[1] * scale), int(image.shape[0] * scale)),
+                                   interpolation=cv2.INTER_AREA)
+            resized, _, _ = resize_aspect_ratio(image, 2560, interpolation=cv2.INTER_LINEAR, mag_ratio=1.0)
+            tensor = torch.from_numpy(normalizeMeanVariance(resized)).permute(2, 0, 1).unsqueeze(0)
+            for _ in range(repeat):
+                net(tensor)
+            times.append((time.perf_counter() - start) / repeat)
+    return np.mean(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR accuracy and speed by text detection scale.")
+    parser.add_argument("--images", type=int, default=5, help="Number of synthetic images")
+    parser.add_argument("--size", default="3840x2160", help="Image size as WIDTHxHEIGHT")
+    parser.add_argument("--scales", type=parse_scales, default="1,0.75,0.5,0.33,auto",
+                        help="Comma-separated detection scales, 'auto' included")
+    parser.add_argument("--min-text-height", type=int, default=20, help="Smallest text height for 'auto'")
+    parser.add_argument("--detector-only", action="store_true",
+                        help="Time the detector with untrained weights, without the easyocr models")
+    parser.add_argument("--repeat", type=int, default=1, help="Forward passes per image with --detector-only")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic fixtures")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.split("x"))
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        boxes_by_path = make_images(workdir, args.images, width, height, rng)
+        print(f"{args.images} images of {args.size}, smallest text {args.min_text_height} px for 'auto'")
+
+        if args.detector_only:
+            print(f"{'scale':>6} {'detect ms/image':>16}")
+            for detection_scale in args.scales:
+                seconds = run_detector_only(sorted(boxes_by_path), detection_scale, args.min_text_height, args.repeat)
+                print(f"{detection_scale!s:>6} {seconds * 1000:16.1f}")
+            return
+
+        from translationModels import get_reader
+        reader = get_reader("en", "en")
+        print(f"{'scale':>6} {'detect ms':>10} {'total ms':>10} {'lines found':>12} {'words read':>11}")
+        for detection_scale in args.scales:
+            scale = None if detection_scale == 1.0 else detection_scale
+            detect, total, lines, words = run_ocr(reader, boxes_by_path, scale, args.min_text_height)
+            print(f"{detection_scale!s:>6} {detect * 1000:10.1f} {total * 1000:10.1f} {lines:12.1%} {words:11.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+'''
+This script measures how fast videoToImage.video_to_images exports frames, compared with the
+previous implementation (decode, then cv2.imwrite with the default PNG settings, serially), on a
+synthetic video where every frame differs. The exported frames of every format are then assembled
+back into a video with imageToVideo.images_to_video, which checks the round trip.
+
+Usage (from the repository root):
+    python -m benchmarks.frameExport --frames 200 --size 1280x720
+'''
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import cv2
+from benchmarks.suite import synthetic_background, draw_text_lines
+from frameDedup import MANIFEST_FILENAME
+from imageToVideo import images_to_video
+from videoToImage import video_to_images
+
+
+def make_video(path, frames, width, height, rng):
+    # Text scrolling over a noisy background, so no frame is a duplicate
+    base = synthetic_background(width, height, rng)
+    draw_text_lines(base, rng, 6)
+    base = cv2.cvtColor(np.asarray(base), cv2.COLOR_RGB2BGR)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (width, height))
+    for index in range(frames):
+        writer.write(np.roll(base, index * 4, axis=1))
+    writer.release()
+
+
+def legacy_video_to_images(video_path, output_folder):
+    """The previous export loop, without the duplicate check."""
+    video = cv2.VideoCapture(video_path)
+    frame_count = 0
+    while True:
+        ret, frame = video.read()
+        if not ret:
+            break
+        cv2.imwrite(os.path.join(output_folder, f"frame_{frame_count:04d}.png"), frame)
+        frame_count += 1
+    video.release()
+    return frame_count
+
+
+def folder_size(folder):
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+
+
+def run(name, frames, function, output_folder, *args, **kwargs):
+    shutil.rmtree(output_folder, ignore_errors=True)
+    os.makedirs(output_folder)
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    # Rates are in frames of the source video, extracted or skipped
+    print(f"{name:<28} {frames / elapsed:8.1f} frames/sec {folder_size(output_folder) / 2 ** 20:9.1f} MB")
+
+
+def assemble(frames_folder, output_video, expected_frames):
+    # Round trip: the exported frames and their manifest must give back a video of every frame
+    start = time.perf_counter()
+    frames = images_to_video(frames_folder, output_video, 25, os.path.join(frames_folder, MANIFEST_FILENAME),
+                             codec="MJPG")
+    elapsed = time.perf_counter() - start
+    if frames != expected_frames:
+        raise RuntimeError(f"Assembled {frames} frames from {frames_folder}, expected {expected_frames}")
+    print(f"{'  assembled back':<28} {frames / elapsed:8.1f} frames/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the frames/sec of video_to_images.")
+    parser.add_argument("--frames", type=int, default=200, help="Number of synthetic video frames")
+    parser.add_argument("--size", default="1280x720", help="Frame size as WIDTHxHEIGHT")
+    parser.add_argument("--writers", type=int, default=4, help="Writer threads")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic video")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.split("x"))
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        video_path = os.path.join(workdir, "input.avi")
+        make_video(video_path, args.frames, width, height, rng)
+        output = os.path.join(workdir, "frames")
+        print(f"{args.frames} frames of {args.size}, {args.writers} writers")
+
+        run("before (png, serial)", args.frames, legacy_video_to_images, output, video_path, output)
+        for name, options in [("png default", {}), ("png compression 1", {"png_compression": 1}),
+                              ("png compression 0", {"png_compression": 0}),
+                              ("webp lossless", {"image_format": "webp"}), ("npy", {"image_format": "npy"}),
+                              ("every 5th, png compression 1", {"png_compression": 1, "every_nth": 5})]:
+            run(name, args.frames, video_to_images, output, video_path, output, similarity_threshold=-1,
+                writers=args.writers, **options)
+            assemble(output, os.path.join(workdir, "assembled.avi"), args.frames // options.get("every_nth", 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+'''
+This script compares the throughput of TranslateMultipleImage.py option 2 (threads sharing one
+easyocr.Reader) with option 3 (processes with one Reader each) on the same folder of images.
+
+Translation is replaced by an offline stub so only OCR and rendering are measured.
+
+Usage (from the repository root):
+    python -m benchmarks.ocrWorkers --input ExportedImages --limit 64 --workers 4
+'''
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import TranslateMultipleImage as tmi
+
+
+class EchoTranslator:
+    """Offline stand-in for GoogleTranslator that returns the text unchanged."""
+
+    source = tmi.source_lang
+    target = tmi.target_lang
+
+    def translate(self, text):
+        return text
+
+
+def create_echo_translator():
+    return EchoTranslator()
+
+
+def run_threads(filenames, input_folder, output_folder, num_workers):
+    reader = tmi.create_reader()
+    translator = create_echo_translator()
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        list(executor.map(lambda filename: tmi.process_image(filename, input_folder, output_folder, reader, translator),
+                          filenames))
+
+
+def run_processes(filenames, input_folder, output_folder, num_workers):
+    tmi.run_in_processes(filenames, input_folder, output_folder, num_workers,
+                         translator_factory=create_echo_translator)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare thread and process OCR modes.")
+    parser.add_argument("--input", default="ExportedImages", help="Folder of images to process")
+    parser.add_argument("--limit", type=int, default=32, help="Number of images to process")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 4),
+                        help="Worker processes for the process mode")
+    args = parser.parse_args()
+
+    filenames = sorted(filename for filename in os.listdir(args.input)
+                       if filename.lower().endswith((".jpg", ".jpeg", ".png")))[:args.limit]
+    if not filenames:
+        print(f"No images found in '{args.input}'.")
+        return
+
+    modes = [
+        ("threads", run_threads, os.cpu_count() or 1),
+        ("processes", run_processes, args.workers),
+    ]
+    for name, run, num_workers in modes:
+        with tempfile.TemporaryDirectory() as output_folder:
+            # Model loading is part of the measurement since every process mode worker pays for it
+            start = time.perf_counter()
+            run(filenames, args.input, output_folder, num_workers)
+            elapsed = time.perf_counter() - start
+        print(f"{name:>9} x{num_workers:<3} {len(filenames)} images in {elapsed:.1f}s "
+              f"({len(filenames) / elapsed:.2f} images/sec)")
+
+
+if __name__ == "__main__":
+    main()
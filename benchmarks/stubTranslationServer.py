@@ -0,0 +1,119 @@
+'''
+This script runs a local LibreTranslate-compatible translation server for benchmarks and manual
+testing, so the translation clients can be exercised without network access.
+
+POST /translate with {"q", "source", "target"} answers {"translatedText": q reversed} after a
+configurable latency; a share of the requests can fail with 503 and requests above a rate limit
+get 429, to exercise the retry and rate limiting code.
+
+Usage (from the repository root):
+    python -m benchmarks.stubTranslationServer --port 5000 --latency 0.05 --error-rate 0.1
+    python TranslateMultipleImage.py --translator libretranslate --translation-url http://127.0.0.1:5000/translate
+'''
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubTranslationServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering translation requests.
+
+    Args:
+        port (int): Port to listen on, 0 for any free port.
+        latency (float): Seconds waited before answering each request.
+        error_rate (float): Share of requests answered with 503.
+        max_rate (float): Requests per second above which requests get 429, None for no limit.
+        seed (int): Seed of the simulated errors.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128  # The default backlog of 5 drops connections opened at the same time
+
+    def __init__(self, port=0, latency=0.0, error_rate=0.0, max_rate=None, seed=0):
+        super().__init__(("127.0.0.1", port), StubTranslationHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_rate = max_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.request_times = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/translate"
+
+    def start(self):
+        """Serves requests in a daemon thread and returns the server."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def outcome(self):
+        # Decides the status of a request: 200, 503 (simulated error) or 429 (over the rate limit)
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            if self.max_rate:
+                self.request_times = [t for t in self.request_times if now - t < 1.0]
+                if len(self.request_times) >= self.max_rate:
+                    self.throttled += 1
+                    return 429
+                self.request_times.append(now)
+            if self.random.random() < self.error_rate:
+                self.errors += 1
+                return 503
+        return 200
+
+
+class StubTranslationHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status = self.server.outcome()
+        time.sleep(self.server.latency)
+
+        if status != 200:
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+
+        text = json.loads(body)["q"]
+        answer = json.dumps({"translatedText": text[::-1]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(answer)))
+        self.end_headers()
+        self.wfile.write(answer)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stub translation server.")
+    parser.add_argument("--port", type=int, default=5000, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 503")
+    parser.add_argument("--max-rate", type=float, default=None, help="Requests per second before answering 429")
+    args = parser.parse_args()
+
+    server = StubTranslationServer(args.port, args.latency, args.error_rate, args.max_rate)
+    print(f"[INFO] Stub translation server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+'''
+This script benchmarks the OCR -> translate -> render pipeline on synthetic fixtures, offline and
+on CPU only.
+
+It generates text images and a short video with known text boxes, translates them with a fake
+translator and (unless --real-ocr is given) a stub OCR returning the known boxes, then reports
+per-stage latency percentiles, images/sec, frames/sec and peak RSS. Results can be saved as JSON
+and compared with a previous run to spot regressions between commits.
+
+Usage (from the repository root):
+    python -m benchmarks.suite --output bench-before.json
+    python -m benchmarks.suite --compare bench-before.json
+'''
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import numpy as np
+import cv2
+from PIL import Image, ImageDraw
+from batchTranslation import translate_texts
+from fontFitting import get_default_fitter
+from TranslateMultipleImage import overlay_translated_text, perform_ocr, create_reader
+from videoStream import translate_video
+
+WORDS = ["hello", "world", "menu", "settings", "open", "file", "save", "the", "quick", "brown", "fox",
+         "subtitle", "welcome", "to", "our", "channel", "price", "total", "exit", "next"]
+STAGES = ["load", "ocr", "translate", "render", "save"]
+
+
+class FakeTranslator:
+    """Offline translator reversing each text, with an optional simulated network latency."""
+
+    source = "en"
+    target = "fr"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def translate(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return text[::-1]
+
+
+class StubOCR:
+    """Returns the boxes recorded when the fixtures were generated (a fixed layout for video frames)."""
+
+    def __init__(self, boxes_by_path, video_boxes):
+        self.boxes_by_path = boxes_by_path
+        self.video_boxes = video_boxes
+
+    def __call__(self, image):
+        if isinstance(image, str):
+            return self.boxes_by_path[image]
+        return self.video_boxes
+
+
+def draw_text_lines(image, rng, lines):
+    # Draws random lines of words and returns their (bbox, text) boxes
+    draw = ImageDraw.Draw(image)
+    boxes = []
+    for _ in range(lines):
+        text = " ".join(rng.choice(WORDS, size=int(rng.integers(1, 5))))
+        font = get_default_fitter().get(int(rng.integers(16, 48)))
+        x = int(rng.integers(0, max(1, image.width // 2)))
+        y = int(rng.integers(0, max(1, image.height - 60)))
+        color = tuple(int(channel) for channel in rng.integers(0, 256, 3))
+        draw.text((x, y), text, fill=color, font=font)
+        left, top, right, bottom = draw.textbbox((x, y), text, font=font)
+        boxes.append(([[left, top], [right, top], [right, bottom], [left, bottom]], text))
+    return boxes
+
+
+def synthetic_background(width, height, rng):
+    # A noisy gradient, so background color estimation sees many distinct colors
+    x = np.linspace(0, 255, width)[None, :, None]
+    y = np.linspace(0, 255, height)[:, None, None]
+    tint = rng.uniform(0.3, 1.0, 3)
+    array = (x * 0.5 + y * 0.5) * tint + rng.normal(0, 5, (height, width, 3))
+    return Image.fromarray(np.clip(array, 0, 255).astype(np.uint8))
+
+
+def make_images(folder, count, width, height, rng):
+    boxes_by_path = {}
+    for index in range(count):
+        image = synthetic_background(width, height, rng)
+        path = os.path.join(folder, f"frame_{index:04d}.png")
+        boxes_by_path[path] = draw_text_lines(image, rng, int(rng.integers(3, 9)))
+        image.save(path)
+    return boxes_by_path
+
+
+def make_video(path, frames, width, height, rng):
+    # Subtitles stay for 10 frames while the background drifts, like a talking-head video
+    base = synthetic_background(width, height, rng)
+    boxes = draw_text_lines(base, rng, 2)
+    base = cv2.cvtColor(np.asarray(base), cv2.COLOR_RGB2BGR)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (width, height))
+    for index in range(frames):
+        frame = np.roll(base, index // 10, axis=1)
+        writer.write(frame)
+    writer.release()
+    return boxes
+
+
+def percentiles(durations):
+    if not durations:
+        return {}
+    values = np.array(durations) * 1000
+    return {
+        "count": len(durations),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p90_ms": float(np.percentile(values, 90)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def run_images(paths, ocr, translator, output_folder):
+    timings = {stage: [] for stage in STAGES}
+    start = time.perf_counter()
+    for path in paths:
+        stage_start = time.perf_counter()
+        image = Image.open(path)
+        image.load()
+        timings["load"].append(time.perf_counter() - stage_start)
+
+        stage_start = time.perf_counter()
+        text_boxes = ocr(path)
+        timings["ocr"].append(time.perf_counter() - stage_start)
+
+        stage_start = time.perf_counter()
+        translated_texts = translate_texts(translator, [box[1] for box in text_boxes])
+        timings["translate"].append(time.perf_counter() - stage_start)
+
+        stage_start = time.perf_counter()
+        image = overlay_translated_text(image, translated_texts, text_boxes)
+        timings["render"].append(time.perf_counter() - stage_start)
+
+        stage_start = time.perf_counter()
+        image.save(os.path.join(output_folder, os.path.basename(path)))
+        timings["save"].append(time.perf_counter() - stage_start)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "images": len(paths),
+        "images_per_sec": len(paths) / elapsed,
+        "stages": {stage: percentiles(durations) for stage, durations in timings.items()},
+    }
+
+
+def run_video(video_path, output_video, ocr, translator):
+    start = time.perf_counter()
+    frames = translate_video(video_path, output_video, ocr, translator, overlay_translated_text, codec="MJPG")
+    elapsed = time.perf_counter() - start
+    return {"frames": frames, "frames_per_sec": frames / elapsed}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    print(f"Comparison with {baseline['meta'].get('commit')} (ratio > 1 means slower now):")
+    for stage in STAGES:
+        before = baseline["images"]["stages"].get(stage, {}).get("p50_ms")
+        now = results["images"]["stages"].get(stage, {}).get("p50_ms")
+        if before and now:
+            print(f"  {stage:<9} p50 {before:8.2f} ms -> {now:8.2f} ms  ({now / before:.2f}x)")
+    for section, key in [("images", "images_per_sec"), ("video", "frames_per_sec")]:
+        before = baseline.get(section, {}).get(key)
+        now = results.get(section, {}).get(key)
+        if before and now:
+            print(f"  {key:<15} {before:8.2f} -> {now:8.2f}  ({before / now:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image translation pipeline on synthetic data.")
+    parser.add_argument("--images", type=int, default=20, help="Number of synthetic images")
+    parser.add_argument("--size", default="1280x720", help="Image and video size as WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=100, help="Number of synthetic video frames (0 to skip)")
+    parser.add_argument("--real-ocr", action="store_true", help="Use easyocr instead of the stub OCR")
+    parser.add_argument("--translate-latency", type=float, default=0.0,
+                        help="Simulated seconds per translation request")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic fixtures")
+    parser.add_argument("--output", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="Compare the results with a previous JSON file")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.split("x"))
+    rng = np.random.default_rng(args.seed)
+    translator = FakeTranslator(args.translate_latency)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        input_folder = os.path.join(workdir, "input")
+        output_folder = os.path.join(workdir, "output")
+        os.makedirs(input_folder)
+        os.makedirs(output_folder)
+
+        boxes_by_path = make_images(input_folder, args.images, width, height, rng)
+        video_path = os.path.join(workdir, "input.avi")
+        video_boxes = make_video(video_path, args.frames, width, height, rng) if args.frames else []
+
+        ocr = StubOCR(boxes_by_path, video_boxes)
+        if args.real_ocr:
+            reader = create_reader()
+            ocr = lambda image: perform_ocr(image, reader)
+
+        results = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "size": args.size,
+                "ocr": "easyocr" if args.real_ocr else "stub",
+                "translate_latency": args.translate_latency,
+            },
+            "images": run_images(sorted(boxes_by_path), ocr, translator, output_folder),
+        }
+        if args.frames:
+            results["video"] = run_video(video_path, os.path.join(workdir, "output.avi"), ocr, translator)
+
+    # ru_maxrss is in kilobytes on Linux
+    results["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"{results['images']['images']} images at {results['images']['images_per_sec']:.2f} images/sec")
+    for stage, stage_stats in results["images"]["stages"].items():
+        print(f"  {stage:<9} p50={stage_stats['p50_ms']:.2f}ms p90={stage_stats['p90_ms']:.2f}ms "
+              f"p99={stage_stats['p99_ms']:.2f}ms")
+    if "video" in results:
+        print(f"{results['video']['frames']} video frames at {results['video']['frames_per_sec']:.2f} frames/sec")
+    print(f"Peak RSS: {results['peak_rss_mb']:.0f} MB")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(results, json.load(baseline_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+'''
+This script measures the throughput of the translation backends on identical inputs: OCR-like
+strings translated in batches of one image's worth of text, without the translation memory.
+
+The network backends talk to the local stub server (benchmarks/stubTranslationServer.py) with a
+simulated latency, so the numbers compare request patterns rather than a real service:
+    glossary        offline lookups (localTranslation.GlossaryTranslator)
+    blocking-batch  one blocking request per joined batch, like the default google backend
+    async           one concurrent request per distinct text (asyncTranslation.AsyncTranslator)
+
+Usage (from the repository root):
+    python -m benchmarks.translationBackends --texts 2000 --latency 0.1
+'''
+
+import argparse
+import random
+import time
+import requests
+from asyncTranslation import AsyncTranslator, LibreTranslateProtocol
+from batchTranslation import BatchTranslator, translate_texts
+from localTranslation import GlossaryTranslator
+from benchmarks.stubTranslationServer import StubTranslationServer
+from benchmarks.suite import WORDS
+
+
+class BlockingLibreTranslate:
+    """Blocking client of a LibreTranslate-compatible API, standing in for GoogleTranslator."""
+
+    source = "en"
+    target = "fr"
+
+    def __init__(self, url):
+        self.url = url
+        self.session = requests.Session()
+
+    def translate(self, text):
+        response = self.session.post(self.url, json={"q": text, "source": self.source, "target": self.target},
+                                     timeout=10)
+        response.raise_for_status()
+        return response.json()["translatedText"]
+
+
+def make_batches(count, batch_size, seed=0):
+    # Lines of 1 to 4 words, grouped like the text boxes of one image
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) for _ in range(count)]
+    return [texts[start:start + batch_size] for start in range(0, count, batch_size)]
+
+
+def run(name, translator, batches):
+    durations = []
+    start = time.perf_counter()
+    for batch in batches:
+        batch_start = time.perf_counter()
+        translate_texts(translator, batch)
+        durations.append(time.perf_counter() - batch_start)
+    elapsed = time.perf_counter() - start
+
+    texts = sum(len(batch) for batch in batches)
+    characters = sum(len(text) for batch in batches for text in batch)
+    durations.sort()
+    print(f"{name:<15} {texts / elapsed:10.1f} texts/sec {characters / elapsed:12.0f} chars/sec  "
+          f"batch p50 {durations[len(durations) // 2] * 1000:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare translation backends on identical inputs.")
+    parser.add_argument("--texts", type=int, default=2000, help="Number of texts")
+    parser.add_argument("--batch-size", type=int, default=20, help="Texts per batch (one image)")
+    parser.add_argument("--latency", type=float, default=0.1, help="Stub server latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight for the async backend")
+    args = parser.parse_args()
+
+    batches = make_batches(args.texts, args.batch_size)
+    server = StubTranslationServer(latency=args.latency).start()
+    print(f"{args.texts} texts in batches of {args.batch_size}, stub latency {args.latency * 1000:.0f} ms")
+
+    run("glossary", GlossaryTranslator({word: word[::-1] for word in WORDS}), batches)
+    run("blocking-batch", BatchTranslator(BlockingLibreTranslate(server.url)), batches)
+    translator = AsyncTranslator(protocol=LibreTranslateProtocol(server.url), concurrency=args.concurrency)
+    run("async", translator, batches)
+    translator.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+'''
+This script compares blocking translation requests with the asyncio client of asyncTranslation.py
+against the local stub server, with a simulated latency and error rate.
+
+The texts repeat like OCR strings of consecutive frames, so request coalescing has something to
+do. Blocking requests have no retry, like the previous code: a failed request leaves its text
+untranslated.
+
+Usage (from the repository root):
+    python -m benchmarks.translationClient --texts 400 --latency 0.05 --error-rate 0.05
+'''
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from asyncTranslation import AsyncTranslator, LibreTranslateProtocol
+from benchmarks.stubTranslationServer import StubTranslationServer
+
+
+def blocking_translate(session, url, text):
+    # One request per text and no retry; errors leave the text untranslated (None)
+    try:
+        response = session.post(url, json={"q": text, "source": "en", "target": "fr"}, timeout=10)
+        response.raise_for_status()
+        return response.json()["translatedText"]
+    except requests.RequestException:
+        return None
+
+
+def make_texts(count, unique, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"subtitle line number {index}" for index in range(unique)]
+    return [rng.choice(vocabulary) for _ in range(count)]
+
+
+def run(name, server, function, texts):
+    requests_before = server.requests
+    start = time.perf_counter()
+    results = function(texts)
+    elapsed = time.perf_counter() - start
+    failed = sum(result is None for result in results)
+    print(f"{name:<26} {len(texts) / elapsed:8.1f} texts/sec  {server.requests - requests_before:5d} requests  "
+          f"{failed:4d} untranslated")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark blocking vs asyncio translation requests.")
+    parser.add_argument("--texts", type=int, default=400, help="Number of texts to translate")
+    parser.add_argument("--unique", type=int, default=150, help="Number of distinct texts")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub server latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of requests failing with 503")
+    parser.add_argument("--concurrency", type=int, default=16, help="Threads or requests in flight")
+    args = parser.parse_args()
+
+    server = StubTranslationServer(latency=args.latency, error_rate=args.error_rate).start()
+    texts = make_texts(args.texts, args.unique)
+    print(f"{args.texts} texts ({args.unique} distinct), {args.latency * 1000:.0f} ms latency, "
+          f"{args.error_rate:.0%} errors")
+
+    with requests.Session() as session:
+        run("blocking, sequential", server,
+            lambda batch: [blocking_translate(session, server.url, text) for text in batch], texts)
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            run(f"blocking, {args.concurrency} threads", server,
+                lambda batch: list(executor.map(lambda text: blocking_translate(session, server.url, text), batch)),
+                texts)
+
+    translator = AsyncTranslator(protocol=LibreTranslateProtocol(server.url), concurrency=args.concurrency,
+                                 backoff=0.05)
+    run(f"asyncio, {args.concurrency} in flight", server, translator.translate_many, texts)
+    translator.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
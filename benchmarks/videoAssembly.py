@@ -0,0 +1,84 @@
+'''
+This script measures how fast imageToVideo.images_to_video assembles a video from a folder of
+frames, compared with the previous implementation (one cv2.imread and cv2.resize per frame in the
+main thread), on synthetic PNG frames.
+
+A manifest case repeats every image several times, like the manifest videoToImage.py writes for
+a video whose frames were deduplicated.
+
+Usage (from the repository root):
+    python -m benchmarks.videoAssembly --frames 300 --size 1280x720 --workers 1,4,8
+'''
+
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+import numpy as np
+import cv2
+from imageToVideo import images_to_video
+from benchmarks.suite import make_images
+
+
+def legacy_images_to_video(image_folder, output_video, frame_rate, images):
+    """The previous images_to_video loop, on an already listed timeline."""
+    images = sorted(images, key=lambda x: int(re.search(r'\d+', x).group()) if re.search(r'\d+', x) else float('inf'))
+    first_image = cv2.imread(os.path.join(image_folder, images[0]))
+    height, width, _ = first_image.shape
+    video_writer = cv2.VideoWriter(output_video, cv2.VideoWriter_fourcc(*'mp4v'), frame_rate, (width, height))
+    for image_file in images:
+        frame = cv2.imread(os.path.join(image_folder, image_file))
+        frame = cv2.resize(frame, (width, height))
+        video_writer.write(frame)
+    video_writer.release()
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the frames/sec of images_to_video.")
+    parser.add_argument("--frames", type=int, default=300, help="Number of synthetic frames")
+    parser.add_argument("--size", default="1280x720", help="Frame size as WIDTHxHEIGHT")
+    parser.add_argument("--workers", default="1,4,8", help="Comma-separated decoding thread counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Uses of every image in the manifest case")
+    parser.add_argument("--ffmpeg", action="store_true", help="Also time the ffmpeg encoder (libx264)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic frames")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.split("x"))
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        folder = os.path.join(workdir, "frames")
+        os.makedirs(folder)
+        images = sorted(os.path.basename(path) for path in make_images(folder, args.frames, width, height, rng))
+        output = os.path.join(workdir, "output.mp4")
+
+        # Manifest case: the same number of frames, from a third of the images
+        distinct = images[:max(1, args.frames // args.repeat)]
+        manifest_path = os.path.join(workdir, "manifest.json")
+        with open(manifest_path, "w") as manifest_file:
+            json.dump({"frames": [image for image in distinct for _ in range(args.repeat)][:args.frames],
+                       "frame_rate": 25}, manifest_file)
+
+        print(f"{args.frames} frames of {args.size}")
+        seconds = timed(legacy_images_to_video, folder, output, 25, images)
+        print(f"{'before':<22} {args.frames / seconds:8.1f} frames/sec")
+        for workers in (int(value) for value in args.workers.split(",")):
+            seconds = timed(images_to_video, folder, output, 25, workers=workers)
+            print(f"{f'after, {workers} workers':<22} {args.frames / seconds:8.1f} frames/sec")
+        seconds = timed(images_to_video, folder, output, 25, manifest_path, workers=4)
+        print(f"{'after, manifest x' + str(args.repeat):<22} {args.frames / seconds:8.1f} frames/sec")
+        if args.ffmpeg:
+            seconds = timed(images_to_video, folder, output, 25, workers=4, encoder="ffmpeg")
+            print(f"{'after, ffmpeg libx264':<22} {args.frames / seconds:8.1f} frames/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 '''
 This script can be used if we stop translation queue and we would like to continue from where we stoped
+
+TranslateMultipleImage.py now resumes by itself from its job manifest and can take a frame range
+(--first-frame / --last-frame) or a shard (--shard I/N) without copying files; this script is kept
+for existing workflows.
 '''
 
 import os
@@ -0,0 +1,100 @@
+'''
+This module runs easyocr's text detection on a downscaled copy of large images and its
+recognition on the full-resolution crops.
+
+Detection (CRAFT) cost and memory grow with the number of pixels, while recognition only sees the
+crops of the boxes. Detecting on a 4K frame scaled to 1280 pixels is about 9x fewer pixels; boxes
+are scaled back to full resolution, so recognition accuracy does not suffer as long as the smallest
+text stays tall enough to be detected once downscaled, which bounds the automatic scale.
+'''
+
+import cv2
+from ocrInput import reformat_rgb
+
+DEFAULT_MAX_SIDE = 1280  # Longest side of the image given to detection with the automatic scale
+DEFAULT_MIN_TEXT_HEIGHT = 20  # Smallest text expected in the input images, in pixels
+DETECTABLE_TEXT_HEIGHT = 10  # Text shorter than this once downscaled is often missed by CRAFT
+
+
+def choose_detection_scale(width, height, max_side=DEFAULT_MAX_SIDE, min_text_height=DEFAULT_MIN_TEXT_HEIGHT):
+    """
+    Chooses the factor applied to an image before detection.
+
+    The image is shrunk until its longest side is max_side, but never so much that text of
+    min_text_height pixels becomes shorter than DETECTABLE_TEXT_HEIGHT.
+
+    Args:
+        width (int): Image width.
+        height (int): Image height.
+        max_side (int): Target longest side for detection.
+        min_text_height (int): Height of the smallest text to detect, in input pixels.
+
+    Returns:
+        float: Scale factor in (0, 1], 1 meaning no downscaling.
+    """
+    scale = min(1.0, max_side / max(width, height))
+    return min(1.0, max(scale, DETECTABLE_TEXT_HEIGHT / max(min_text_height, 1)))
+
+
+def resolve_scale(detection_scale, width, height, min_text_height=DEFAULT_MIN_TEXT_HEIGHT):
+    # 'auto' picks the scale per image, a number is used as is, None disables downscaling
+    if detection_scale is None:
+        return 1.0
+    if detection_scale == "auto":
+        return choose_detection_scale(width, height, min_text_height=min_text_height)
+    return min(1.0, float(detection_scale))
+
+
+def scale_boxes(horizontal_list, free_list, factor):
+    """Scales easyocr detection boxes ([x_min, x_max, y_min, y_max] and 4-point polygons) by factor."""
+    horizontal = [[int(round(value * factor)) for value in box] for box in horizontal_list]
+    free = [[[int(round(x * factor)), int(round(y * factor))] for x, y in box] for box in free_list]
+    return horizontal, free
+
+
+def detect_downscaled(reader, img, scale, width_ths, min_size=20):
+    """
+    Runs reader.detect on img scaled by scale and returns the boxes in img coordinates.
+
+    Args:
+        reader (easyocr.Reader): The OCR reader.
+        img (numpy.ndarray): Full-resolution image, as given to reader.detect.
+        scale (float): Factor applied before detection (1 detects at full resolution).
+        width_ths (float): Passed to reader.detect to merge close boxes.
+        min_size (int): Smallest box kept, in full-resolution pixels.
+
+    Returns:
+        tuple: (horizontal_list, free_list) of the image.
+    """
+    if scale >= 1.0:
+        horizontal_list, free_list = reader.detect(img, width_ths=width_ths, min_size=min_size, reformat=False)
+        return horizontal_list[0], free_list[0]
+
+    height, width = img.shape[:2]
+    small = cv2.resize(img, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+    horizontal_list, free_list = reader.detect(small, width_ths=width_ths, min_size=max(1, int(min_size * scale)),
+                                               reformat=False)
+    return scale_boxes(horizontal_list[0], free_list[0], 1.0 / scale)
+
+
+def readtext_downscaled(reader, image, detection_scale="auto", min_text_height=DEFAULT_MIN_TEXT_HEIGHT,
+                        width_ths=0.8, decoder="wordbeamsearch"):
+    """
+    Like reader.readtext, with detection on a downscaled copy and recognition at full resolution.
+
+    Args:
+        reader (easyocr.Reader): The OCR reader.
+        image: Image path, PIL image or RGB array.
+        detection_scale: 'auto', a factor in (0, 1], or None for full-resolution detection.
+        min_text_height (int): Smallest text expected, bounding the automatic scale.
+        width_ths (float): Passed to detection to merge close boxes.
+        decoder (str): Recognizer decoder.
+
+    Returns:
+        list: (bbox, text, confidence) entries, like readtext.
+    """
+    img, img_cv_grey = reformat_rgb(image)
+    height, width = img.shape[:2]
+    scale = resolve_scale(detection_scale, width, height, min_text_height)
+    horizontal_list, free_list = detect_downscaled(reader, img, scale, width_ths)
+    return reader.recognize(img_cv_grey, horizontal_list, free_list, decoder=decoder, reformat=False)
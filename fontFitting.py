@@ -0,0 +1,114 @@
+'''
+This module finds the largest font size that lets a translated text fit inside an OCR bounding box.
+
+The font face is loaded from disk once, FreeTypeFont objects are cached per size in a bounded LRU,
+and the best size is found by bisection instead of trying every size from 1 to 499.
+'''
+
+import io
+import threading
+from collections import OrderedDict
+from PIL import ImageFont
+
+DEFAULT_FONT_PATH = "DejaVuSans-Bold.ttf"
+MIN_FONT_SIZE = 1
+MAX_FONT_SIZE = 499
+
+
+class FontFitter:
+    """
+    Fits text into boxes using a single font face.
+
+    Args:
+        font_path (str): Font file name or path (resolved like ImageFont.truetype does).
+        max_cached_fonts (int): Maximum number of FreeTypeFont objects kept in memory.
+        max_cached_fits (int): Maximum number of (text, width, height) results kept in memory.
+    """
+
+    def __init__(self, font_path=DEFAULT_FONT_PATH, max_cached_fonts=64, max_cached_fits=4096):
+        self.font_path = font_path
+        self.max_cached_fonts = max_cached_fonts
+        self.max_cached_fits = max_cached_fits
+        self._font_bytes = None
+        self._fonts = OrderedDict()
+        self._fits = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load_font_bytes(self):
+        # Resolve the font the same way ImageFont.truetype does, then keep its bytes in memory
+        if self._font_bytes is None:
+            resolved = ImageFont.truetype(self.font_path, size=MIN_FONT_SIZE)
+            with open(resolved.path, "rb") as font_file:
+                self._font_bytes = font_file.read()
+        return self._font_bytes
+
+    def get(self, size):
+        """Returns the FreeTypeFont for the given size, loading it at most once while cached."""
+        with self._lock:
+            font = self._fonts.get(size)
+            if font is not None:
+                self._fonts.move_to_end(size)
+                return font
+
+            font = ImageFont.truetype(io.BytesIO(self._load_font_bytes()), size=size)
+            self._fonts[size] = font
+            if len(self._fonts) > self.max_cached_fonts:
+                self._fonts.popitem(last=False)
+            return font
+
+    def fit(self, text, width, height):
+        """
+        Finds the largest font for which the text fits in a width x height box.
+
+        Returns:
+            tuple: (font, x, y) where x and y center the text in the box. font is None when
+            even the smallest size does not fit, like the original linear search.
+        """
+        key = (text, width, height)
+        with self._lock:
+            cached = self._fits.get(key)
+            if cached is not None:
+                self._fits.move_to_end(key)
+        if cached is not None:
+            size, x, y = cached
+            return (self.get(size) if size else None), x, y
+
+        best_size, best_box = None, None
+        low, high = MIN_FONT_SIZE, MAX_FONT_SIZE
+
+        # Text extent grows with the font size, so bisect for the last size that still fits
+        while low <= high:
+            size = (low + high) // 2
+            box = self.get(size).getbbox(text)
+            if box[2] - box[0] > width or box[3] - box[1] > height:
+                high = size - 1
+            else:
+                best_size, best_box = size, box
+                low = size + 1
+
+        x = y = 0
+        if best_size is not None:
+            w = best_box[2] - best_box[0]
+            h = best_box[3] - best_box[1]
+
+            # Calculate position (minus margins in box)
+            x = (width - w) // 2 - best_box[0]
+            y = (height - h) // 2 - best_box[1]
+
+        with self._lock:
+            self._fits[key] = (best_size, x, y)
+            if len(self._fits) > self.max_cached_fits:
+                self._fits.popitem(last=False)
+
+        return (self.get(best_size) if best_size else None), x, y
+
+
+_default_fitter = None
+
+
+def get_default_fitter():
+    """Returns the shared FontFitter for the default font."""
+    global _default_fitter
+    if _default_fitter is None:
+        _default_fitter = FontFitter()
+    return _default_fitter
@@ -0,0 +1,143 @@
+'''
+This module finds frames that look identical so they are OCR'd and translated only once.
+
+Each frame is reduced to a grayscale thumbnail and two frames match when no thumbnail pixel
+differs by more than a threshold. The thumbnail is 256 pixels wide so a one-character change in a
+subtitle survives the downsampling: on a 1080p frame with 32 px text, '?' -> '!' or '3' -> '8'
+changes a thumbnail pixel by 35 or more, whereas re-encoding noise stays under 5 (at 64 pixels
+the same edits differed by 3 to 10 and were merged).
+
+A frame is compared with the previous canonical frame, then with the frames sharing its average
+hash, and only then with every canonical frame in one vectorized pass (the hash is unstable on
+flat images, so it only serves as a fast path). Using the maximum difference (not the mean) keeps
+a changed subtitle from being averaged away, while the area downsampling removes compression noise.
+
+The frame -> canonical frame mapping is saved as a manifest so imageToVideo.py can rebuild the
+full timeline from the canonical frames only.
+'''
+
+import json
+import os
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class FrameIndex:
+    """
+    Maps near-identical frames to the first frame that looked like them.
+
+    Args:
+        threshold (int): Maximum per-pixel difference (0-255) between two matching thumbnails.
+        thumbnail_size (int): Side of the grayscale thumbnail used for comparisons.
+        hash_size (int): Side of the average hash used to bucket thumbnails.
+        max_entries (int): Maximum number of canonical frames remembered, None for unlimited.
+        on_evict (callable): Called with the canonical id of every evicted entry.
+    """
+
+    def __init__(self, threshold=12, thumbnail_size=256, hash_size=8, max_entries=None, on_evict=None):
+        self.threshold = threshold
+        self.thumbnail_size = thumbnail_size
+        self.hash_size = hash_size
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._entries = OrderedDict()  # canonical id -> (hash key, thumbnail)
+        self._buckets = {}  # hash key -> canonical ids
+        self._last_id = None
+        self._ids = []  # Canonical ids in the row order of _thumbnails
+        self._thumbnails = np.empty((64, thumbnail_size * thumbnail_size), dtype=np.int16)  # Grows by doubling
+
+    def thumbnail(self, frame):
+        """Returns the grayscale thumbnail of a BGR (or grayscale) frame as int16."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        small = cv2.resize(gray, (self.thumbnail_size, self.thumbnail_size), interpolation=cv2.INTER_AREA)
+        return small.astype(np.int16)
+
+    def _hash_key(self, thumbnail):
+        small = cv2.resize(thumbnail.astype(np.float32), (self.hash_size, self.hash_size),
+                           interpolation=cv2.INTER_AREA)
+        return np.packbits(small > small.mean()).tobytes()
+
+    def _matches(self, canonical_id, thumbnail):
+        entry = self._entries.get(canonical_id)
+        return entry is not None and np.abs(entry[1] - thumbnail).max() <= self.threshold
+
+    def lookup(self, frame, frame_id):
+        """
+        Finds the canonical frame for a frame, registering the frame as canonical if none matches.
+
+        Returns:
+            tuple: (canonical_id, is_new) where is_new is True when frame_id became canonical.
+        """
+        thumbnail = self.thumbnail(frame)
+        key = self._hash_key(thumbnail)
+
+        # Consecutive frames are the usual match, then frames sharing the same hash
+        candidates = [self._last_id] if self._last_id is not None else []
+        candidates += self._buckets.get(key, [])
+        matched_id = next((canonical_id for canonical_id in candidates if self._matches(canonical_id, thumbnail)), None)
+
+        if matched_id is None and self._ids:
+            differences = np.abs(self._thumbnails[:len(self._ids)] - thumbnail.reshape(1, -1)).max(axis=1)
+            best = int(differences.argmin())
+            if differences[best] <= self.threshold:
+                matched_id = self._ids[best]
+
+        if matched_id is not None:
+            self._entries.move_to_end(matched_id)
+            self._last_id = matched_id
+            return matched_id, False
+
+        self._entries[frame_id] = (key, thumbnail)
+        self._buckets.setdefault(key, []).append(frame_id)
+        if len(self._ids) == len(self._thumbnails):
+            self._thumbnails = np.concatenate([self._thumbnails, np.empty_like(self._thumbnails)])
+        self._thumbnails[len(self._ids)] = thumbnail.reshape(-1)
+        self._ids.append(frame_id)
+        self._last_id = frame_id
+
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            evicted_id, (evicted_key, _) = self._entries.popitem(last=False)
+            self._buckets[evicted_key].remove(evicted_id)
+            if not self._buckets[evicted_key]:
+                del self._buckets[evicted_key]
+            # Move the last row into the freed one so the rows stay packed
+            row = self._ids.index(evicted_id)
+            last_row = len(self._ids) - 1
+            self._thumbnails[row] = self._thumbnails[last_row]
+            self._ids[row] = self._ids[last_row]
+            del self._ids[last_row]
+            if self.on_evict is not None:
+                self.on_evict(evicted_id)
+
+        return frame_id, True
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def save_manifest(output_folder, frames, frame_rate=None):
+    """
+    Saves the frame timeline of an exported video.
+
+    Args:
+        output_folder (str): Folder containing the canonical frame images.
+        frames (list): For every frame of the video, the file name of its canonical image.
+        frame_rate (float): Frame rate of the source video.
+    """
+    manifest = {
+        "frame_count": len(frames),
+        "frame_rate": frame_rate,
+        "unique_frames": len(set(frames)),
+        "frames": frames,
+    }
+    with open(os.path.join(output_folder, MANIFEST_FILENAME), "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+
+
+def load_manifest(manifest_path):
+    """Loads a manifest saved by save_manifest."""
+    with open(manifest_path) as manifest_file:
+        return json.load(manifest_file)
@@ -0,0 +1,99 @@
+'''
+This module keeps video frames in a ring of shared memory slots so worker processes can read and
+write them by slot index, without pickling full-resolution arrays through queues.
+
+The process owning the ring (the decoder/writer) acquires a free slot, copies a decoded frame into
+it and hands the slot index to a worker. The worker attaches to the same shared memory block,
+translates the frame in place and returns the index; the owner writes the slot to the output video
+and releases it for the next frame.
+'''
+
+import sys
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+
+def attach_untracked(name):
+    """
+    Opens an existing shared memory block without registering it with the resource tracker.
+
+    Only the creator must be tracked: a tracked attachment makes the tracker unlink the block (and warn
+    about a leak) when the attaching process exits, and workers share the creator's tracker, so
+    unregistering after attaching would drop the creator's entry instead.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class FrameRing:
+    """
+    Fixed number of frame-sized slots in one shared memory block.
+
+    Args:
+        slots (int): Number of frames the ring can hold.
+        shape (tuple): Shape of one frame, e.g. (height, width, 3).
+        dtype: NumPy dtype of the frames.
+        name (str): Name of an existing block to attach to; a new block is created when None.
+    """
+
+    def __init__(self, slots, shape, dtype=np.uint8, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        frame_size = int(np.prod(self.shape)) * self.dtype.itemsize
+
+        self.owner = name is None
+        if self.owner:
+            self._memory = shared_memory.SharedMemory(create=True, size=frame_size * slots)
+        else:
+            self._memory = attach_untracked(name)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self._memory.buf)
+
+        # Only the owner hands out slots, so a plain deque is enough
+        self._free = deque(range(slots)) if self.owner else None
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    @classmethod
+    def attach(cls, name, slots, shape, dtype=np.uint8):
+        """Opens the ring created by another process."""
+        return cls(slots, shape, dtype, name=name)
+
+    def has_free_slot(self):
+        return bool(self._free)
+
+    def acquire(self):
+        """Returns the index of a free slot (the caller must release written slots to get more)."""
+        if not self._free:
+            raise RuntimeError("No free slot in the frame ring, release consumed frames first")
+        return self._free.popleft()
+
+    def release(self, slot):
+        """Gives a consumed slot back to the ring."""
+        self._free.append(slot)
+
+    def write(self, slot, frame):
+        """Copies a frame into a slot."""
+        self._frames[slot] = frame
+
+    def view(self, slot):
+        """Returns the frame of a slot as an array backed by the shared memory (no copy)."""
+        return self._frames[slot]
+
+    def close(self):
+        """Detaches from the shared memory, and frees it when called by the owner. Can be called twice."""
+        if self._frames is None:
+            return
+        self._frames = None
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
@@ -0,0 +1,127 @@
+'''
+This module caches rasterized translated text, so a string redrawn at the same size frame after
+frame (subtitles, UI labels) is rasterized by FreeType only once (fontFitting caches the fitting).
+
+Each entry holds the text as an alpha mask with its offset from the text position. FreeType
+places text at subpixel positions: draw.text renders it for the fractional part of its position
+and pastes it at the integer part, so the mask is rendered for that fractional part, which is
+part of the key, and drawn at the integer part. ImageDraw.bitmap then composites the fill color
+through the mask exactly like draw.text does, so the output is pixel-identical; the fill color is
+applied when drawing and is not part of the key.
+Entries are evicted least recently used first once the masks exceed a memory budget.
+'''
+
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageDraw
+from fontFitting import get_default_fitter
+from metrics import get_metrics
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class GlyphCache:
+    """
+    Bounded LRU of rasterized texts.
+
+    Args:
+        fitter (fontFitting.FontFitter): Fitter whose fonts are drawn; the default fitter when None.
+        max_bytes (int): Memory budget of the masks, in bytes.
+    """
+
+    def __init__(self, fitter=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.fitter = fitter or get_default_fitter()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()  # (text, font path, size, font mode, start) -> (mask, x, y)
+        self._lock = threading.Lock()
+
+    def get(self, text, font, fontmode="L", start=(0.0, 0.0)):
+        """
+        Returns the cached rendering of a text.
+
+        Args:
+            text (str): The text.
+            font (PIL.ImageFont.FreeTypeFont): Font of the fitter at the size fitted to the box.
+            fontmode (str): Font mode of the ImageDraw the text is drawn with.
+            start (tuple): Fractional parts of the text position, as math.modf gives them.
+
+        Returns:
+            tuple: (mask, x, y) where mask is an 'L' image to draw at (x, y) from the integer parts
+            of the text position; None when the text was not rendered at this size and position yet.
+        """
+        key = (text, self.fitter.font_path, font.size, fontmode, start)
+        metrics = get_metrics()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.count("glyph_cache_hits")
+                return entry
+            self.misses += 1
+        metrics.count("glyph_cache_misses")
+        return None
+
+    def put(self, text, font, fontmode="L", start=(0.0, 0.0)):
+        """
+        Rasterizes a text like draw.text at a position with the given fractional parts, and caches it.
+
+        Returns:
+            tuple: The new entry, as returned by get.
+        """
+        key = (text, self.fitter.font_path, font.size, fontmode, start)
+        # Drawn at a margin plus start, which draw.text splits back into the margin and start, so
+        # FreeType renders the same bitmap and no glyph is clipped
+        left, top, right, bottom = font.getbbox(text, fontmode)
+        pad_x, pad_y = 2 + max(0, -left), 2 + max(0, -top)
+        mask = Image.new("L", (right + pad_x + 2, bottom + pad_y + 2))
+        mask_draw = ImageDraw.Draw(mask)
+        mask_draw.fontmode = fontmode
+        mask_draw.text((pad_x + start[0], pad_y + start[1]), text, fill=255, font=font)
+        x, y = -pad_x, -pad_y
+        ink = mask.getbbox()
+        if ink is not None:
+            mask = mask.crop(ink)
+            x, y = x + ink[0], y + ink[1]
+        entry = (mask, x, y)
+        size = mask.width * mask.height
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[0].width * previous[0].height
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (evicted_mask, _, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_mask.width * evicted_mask.height
+                self.evictions += 1
+        return entry
+
+    def stats(self):
+        """Returns hit/miss/eviction counters and the current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+_default_cache = None
+
+
+def get_default_glyph_cache():
+    """Returns the shared GlyphCache for the default font."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = GlyphCache()
+    return _default_cache
@@ -1,14 +1,97 @@
 '''
 This script is used to convert a list of images to a video respecting the order by image name / number
+
+Frames are decoded on a thread pool, a bounded number of frames ahead of the encoder, and images
+the manifest repeats are kept in a bounded LRU, so repeats are not decoded again unless they come
+back after many other images. The video is encoded by OpenCV,
+or by an ffmpeg subprocess fed raw frames through a pipe (multi-threaded, any codec and CRF).
 '''
 
 import cv2
 import os
 import re
+import shutil
+import subprocess
+import time
 import numpy as np
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from frameDedup import MANIFEST_FILENAME, load_manifest
+
+FRAME_NUMBER = re.compile(r'\d+')
+
+
+def frame_number(filename):
+    # Numeric index in the file name, files without one go last
+    match = FRAME_NUMBER.search(filename)
+    return int(match.group()) if match else float('inf')
 
-def images_to_video(image_folder, output_video, frame_rate=30):
+
+def read_frame(image_path, width, height):
+    """
+    Decodes an image and resizes it to the video size when needed, None when it can't be read.
+    Without a width and height (for the first image, which sets the video size) no resize is done.
+    """
+    frame = np.load(image_path) if image_path.endswith(".npy") else cv2.imread(image_path)
+    if frame is not None and width is not None and frame.shape[:2] != (height, width):
+        frame = cv2.resize(frame, (width, height))
+    return frame
+
+
+class OpenCVWriter:
+    """Encodes frames with cv2.VideoWriter."""
+
+    def __init__(self, output_video, frame_rate, width, height, codec='mp4v'):
+        fourcc = cv2.VideoWriter_fourcc(*codec)
+        self.video_writer = cv2.VideoWriter(output_video, fourcc, frame_rate, (width, height))
+
+    def write(self, frame):
+        self.video_writer.write(frame)
+
+    def release(self):
+        self.video_writer.release()
+
+
+class FfmpegWriter:
+    """
+    Encodes frames with an ffmpeg subprocess reading raw BGR frames on its standard input.
+
+    Args:
+        output_video (str): Path of the video file.
+        frame_rate (float): Frame rate of the video.
+        width (int): Frame width.
+        height (int): Frame height.
+        codec (str): ffmpeg video encoder, e.g. 'libx264', 'libx265' or 'libvpx-vp9'.
+        crf (int): Constant rate factor, lower is better quality.
+        preset (str): Encoder speed preset, for the encoders that have one.
+    """
+
+    def __init__(self, output_video, frame_rate, width, height, codec='libx264', crf=23, preset='veryfast'):
+        if shutil.which('ffmpeg') is None:
+            raise RuntimeError("ffmpeg was not found, use the opencv encoder instead")
+        command = [
+            'ffmpeg', '-y', '-v', 'error', '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}',
+            '-r', str(frame_rate), '-i', '-', '-c:v', codec, '-crf', str(crf), '-pix_fmt', 'yuv420p', '-threads', '0'
+        ]
+        if codec in ('libx264', 'libx265'):
+            command += ['-preset', preset]
+        self.process = subprocess.Popen(command + [output_video], stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        self.process.stdin.write(np.ascontiguousarray(frame).tobytes())
+
+    def release(self):
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass  # ffmpeg already exited, its exit code tells why
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed with exit code {self.process.returncode}")
+
+
+def images_to_video(image_folder, output_video, frame_rate=30, manifest_path=None, workers=4, lookahead=16,
+                    encoder="opencv", codec=None, crf=23, max_cached_frames=32):
     """
     Converts all images in a folder to a video file, adapting invalid frames when necessary.
 
@@ -16,52 +99,98 @@ def images_to_video(image_folder, output_video, frame_rate=30):
         image_folder (str): Path to the folder containing images.
         output_video (str): Path to save the output video file.
         frame_rate (int): Frame rate of the output video.
+        manifest_path (str): Optional manifest written by videoToImage.py; when given, every frame of
+            the original timeline is written, repeating the image of its canonical frame.
+        workers (int): Threads decoding images.
+        lookahead (int): Images decoded ahead of the encoder at most.
+        encoder (str): 'opencv' (cv2.VideoWriter) or 'ffmpeg' (ffmpeg subprocess).
+        codec (str): FourCC for opencv (default 'mp4v') or ffmpeg encoder (default 'libx264').
+        crf (int): Constant rate factor of the ffmpeg encoder.
+        max_cached_frames (int): Decoded images kept for later repeats; an image repeated after
+            more distinct images than this is decoded again.
 
     Returns:
-        None
+        int: Number of frames written.
     """
-    # Get all image files in the folder
-    images = [img for img in os.listdir(image_folder) if img.endswith((".png", ".jpg", ".jpeg"))]
-    
-    # Extract and sort by numeric index in filenames
-    images.sort(key=lambda x: int(re.search(r'\d+', x).group()) if re.search(r'\d+', x) else float('inf'))
-    
+    if manifest_path is not None:
+        # Rebuild the full timeline, canonical frames stand in for the frames they replaced
+        images = load_manifest(manifest_path)["frames"]
+    else:
+        # Get all image files in the folder
+        images = [img for img in os.listdir(image_folder) if img.endswith((".png", ".jpg", ".jpeg", ".webp", ".npy"))]
+
+        # Extract and sort by numeric index in filenames
+        images.sort(key=frame_number)
+
     if not images:
         print("No images found in the folder.")
-        return
+        return 0
 
     # Read the first image to determine video dimensions
     first_image_path = os.path.join(image_folder, images[0])
-    first_image = cv2.imread(first_image_path)
+    first_image = read_frame(first_image_path, None, None)
     if first_image is None:
         print(f"Error: Unable to read the first image: {first_image_path}")
-        return
+        return 0
     height, width, _ = first_image.shape
 
-    # Define the codec and create VideoWriter object
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec for .mp4 format
-    video_writer = cv2.VideoWriter(output_video, fourcc, frame_rate, (width, height))
+    # Create the encoder
+    if encoder == "ffmpeg":
+        video_writer = FfmpegWriter(output_video, frame_rate, width, height, codec or 'libx264', crf)
+    else:
+        video_writer = OpenCVWriter(output_video, frame_rate, width, height, codec or 'mp4v')
 
     # Placeholder frame for invalid images (black frame)
     placeholder_frame = np.zeros((height, width, 3), dtype=np.uint8)
 
-    # Process each image
-    for image_file in images:
-        image_path = os.path.join(image_folder, image_file)
-        frame = cv2.imread(image_path)
-
-        if frame is None:
-            print(f"Warning: Couldn't read image {image_path}. Using placeholder frame.")
-            frame = placeholder_frame.copy()  # Use the placeholder frame
-        else:
-            # Resize frame to match the video dimensions
-            frame = cv2.resize(frame, (width, height))
-        
-        video_writer.write(frame)
-
-    # Release the VideoWriter object
-    video_writer.release()
+    # Images are decoded ahead in order of first use; repeated ones are kept in a bounded LRU
+    remaining_uses = Counter(images)
+    to_decode = deque(list(dict.fromkeys(images))[1:])
+    decoded = OrderedDict([(images[0], first_image)])
+    seen = {images[0]}  # Images already taken from the decode queue
+    pending = deque()  # (image file, future), in order of first use
+    decode_count = 1
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # Process each image
+            for image_file in images:
+                while to_decode and len(pending) < lookahead:
+                    next_file = to_decode.popleft()
+                    pending.append((next_file, executor.submit(read_frame, os.path.join(image_folder, next_file),
+                                                               width, height)))
+
+                if image_file in decoded:
+                    frame = decoded.pop(image_file)
+                else:
+                    if image_file in seen:
+                        # Evicted since its last use, decode it again
+                        frame = read_frame(os.path.join(image_folder, image_file), width, height)
+                    else:
+                        _, future = pending.popleft()
+                        frame = future.result()
+                        seen.add(image_file)
+                    decode_count += 1
+                    if frame is None:
+                        print(f"Warning: Couldn't read image {os.path.join(image_folder, image_file)}. "
+                              f"Using placeholder frame.")
+                        frame = placeholder_frame
+
+                video_writer.write(frame)
+                remaining_uses[image_file] -= 1
+                if remaining_uses[image_file]:
+                    decoded[image_file] = frame
+                    if len(decoded) > max_cached_frames:
+                        decoded.popitem(last=False)
+    finally:
+        # Release the encoder, also when writing failed, so the file is finalized and ffmpeg reaped
+        video_writer.release()
+    elapsed = time.perf_counter() - start
     print(f"Video saved at {output_video}")
+    print(f"[INFO] {len(images)} frames ({decode_count} decoded) in {elapsed:.2f}s, "
+          f"{len(images) / elapsed if elapsed else 0:.1f} frames/sec")
+    return len(images)
 
 # Example usage
 if __name__ == "__main__":
@@ -70,4 +199,13 @@ if __name__ == "__main__":
     output_video_path = f"output_video_{current_datetime}.mp4"  # Replace with your desired output file name
     frame_rate = 12  # Optional: Adjust the frame rate as needed
 
-    images_to_video(image_folder_path, output_video_path, frame_rate)
+    # Use the manifest written by videoToImage.py to restore the original frame count
+    manifest_path = os.path.join("ExportedImages", MANIFEST_FILENAME)
+    if os.path.exists(manifest_path):
+        frame_rate = load_manifest(manifest_path)["frame_rate"] or frame_rate
+    else:
+        manifest_path = None
+
+    # ffmpeg encodes H.264 on several threads when it is installed
+    encoder = "ffmpeg" if shutil.which("ffmpeg") else "opencv"
+    images_to_video(image_folder_path, output_video_path, frame_rate, manifest_path, encoder=encoder)
@@ -0,0 +1,165 @@
+'''
+This module records the progress of a translation job so an interrupted run can be resumed.
+
+Every processed file gets a row in a SQLite manifest with its status, a hash of its input, the
+path of its output and the settings it was translated with. A restarted run loads the completed files once and skips them with a set
+lookup, and a job can be split between machines by frame range or by shard number without copying
+any file (each machine keeping its own manifest).
+'''
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_MANIFEST_FILENAME = "job_manifest.sqlite"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def file_hash(path):
+    """Returns the BLAKE2b hex digest of a file's content."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as input_file:
+        for chunk in iter(lambda: input_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def frame_number(filename):
+    """Returns the first number in a file name (frame_0042.png -> 42), or None."""
+    match = re.search(r'\d+', filename)
+    return int(match.group()) if match else None
+
+
+def select_frames(filenames, first_frame=None, last_frame=None, shard_index=0, shard_count=1):
+    """
+    Selects the files of one part of a job.
+
+    Args:
+        filenames (list): All file names of the job.
+        first_frame (int): Smallest frame number to keep, None for no lower bound.
+        last_frame (int): Largest frame number to keep, None for no upper bound.
+        shard_index (int): Index of this machine's shard, from 0 to shard_count - 1.
+        shard_count (int): Number of machines sharing the job; frames are dealt round robin.
+            Files without a frame number all go to shard 0.
+
+    Returns:
+        list: The selected file names, sorted by frame number.
+    """
+    selected = []
+    unnumbered = 0  # Files left out because a frame range was set
+    for filename in filenames:
+        number = frame_number(filename)
+        if number is None:
+            # Without a number a file is in no range, and is processed once by the first shard
+            if first_frame is not None or last_frame is not None:
+                unnumbered += 1
+            elif shard_index == 0:
+                selected.append(filename)
+            continue
+        if first_frame is not None and number < first_frame:
+            continue
+        if last_frame is not None and number > last_frame:
+            continue
+        if number % shard_count != shard_index:
+            continue
+        selected.append(filename)
+
+    if unnumbered:
+        print(f"[WARNING] Skipped {unnumbered} files without a frame number in their name, "
+              f"which are outside any frame range.")
+    selected.sort(key=lambda filename: (frame_number(filename) is None, frame_number(filename) or 0, filename))
+    return selected
+
+
+class JobManifest:
+    """
+    Per-file status of a job, stored in SQLite.
+
+    Args:
+        path (str): Path of the manifest file.
+        settings (dict): Options that change the output (languages, format, ...), recorded with
+            every completed file; a file completed with other settings is processed again.
+    """
+
+    def __init__(self, path, settings=None):
+        self.path = path
+        self.settings = json.dumps(settings or {}, sort_keys=True)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "filename TEXT PRIMARY KEY, status TEXT NOT NULL, input_hash TEXT, "
+            "output_path TEXT, settings TEXT, error TEXT, updated_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def completed(self):
+        """Returns {filename: (input_hash, output_path)} for every file completed with this manifest's settings."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT filename, input_hash, output_path FROM files WHERE status = ? AND settings = ?",
+                (STATUS_DONE, self.settings),
+            ).fetchall()
+        return {filename: (input_hash, output_path) for filename, input_hash, output_path in rows}
+
+    def pending(self, filenames, input_folder=None, verify_inputs=False, output_path=None):
+        """
+        Returns the file names that still have to be processed.
+
+        A file is skipped when it was completed with the same settings and its output still exists;
+        with output_path (a function of the file name), the output must also be the one this run
+        would write. With verify_inputs, its input must also still have the recorded hash (this
+        reads every completed input).
+        """
+        completed = self.completed()
+        pending = []
+        for filename in filenames:
+            entry = completed.get(filename)
+            if entry is None or not entry[1] or not os.path.exists(entry[1]):
+                pending.append(filename)
+            elif output_path is not None and os.path.abspath(output_path(filename)) != os.path.abspath(entry[1]):
+                pending.append(filename)
+            elif verify_inputs and file_hash(os.path.join(input_folder, filename)) != entry[0]:
+                pending.append(filename)
+        return pending
+
+    def mark_done(self, filename, input_path, output_path):
+        """Records a file as completed, with the hash of its input and the manifest's settings."""
+        input_hash = file_hash(input_path)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO files (filename, status, input_hash, output_path, settings, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, NULL, ?)",
+                (filename, STATUS_DONE, input_hash, output_path, self.settings, time.time()),
+            )
+            self._connection.commit()
+
+    def mark_failed(self, filename, error):
+        """Records a failure, unless the file was already completed."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO files (filename, status, error, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(filename) DO UPDATE SET status = excluded.status, error = excluded.error, "
+                "updated_at = excluded.updated_at WHERE files.status != ?",
+                (filename, STATUS_FAILED, str(error), time.time(), STATUS_DONE),
+            )
+            self._connection.commit()
+
+    def summary(self):
+        """Returns the number of files per status."""
+        with self._lock:
+            rows = self._connection.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,119 @@
+'''
+This module translates texts offline from a glossary file, for air-gapped machines and for jobs
+whose vocabulary is known in advance (UI strings, recurring subtitles, product names).
+
+A glossary maps source phrases to their translation. Whole texts found in it are translated as a
+unit; other texts are translated phrase by phrase, the longest known phrase first, and unknown
+words are kept as they are. Lookups are case-insensitive and the capitalization of the source is
+applied to the translation.
+
+Glossary files are JSON objects ({"source phrase": "translation"}) or two-column TSV/CSV files.
+'''
+
+import csv
+import json
+import re
+
+_TOKEN = re.compile(r"\w+(?:['’]\w+)*|\s+|[^\w\s]", re.UNICODE)
+
+
+def load_glossary(path):
+    """
+    Reads a glossary file.
+
+    Args:
+        path (str): .json file holding one object, or .tsv/.csv file with two columns
+            (lines starting with '#' are ignored).
+
+    Returns:
+        dict: Source phrase -> translation.
+    """
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as glossary_file:
+            return dict(json.load(glossary_file))
+
+    delimiter = "\t" if path.lower().endswith((".tsv", ".txt")) else ","
+    glossary = {}
+    with open(path, encoding="utf-8", newline="") as glossary_file:
+        for row in csv.reader(glossary_file, delimiter=delimiter):
+            if len(row) >= 2 and row[0] and not row[0].startswith("#"):
+                glossary[row[0]] = row[1]
+    return glossary
+
+
+def _is_word(token):
+    return token[0].isalnum() or token[0] == "_"
+
+
+def match_case(source, translation):
+    # Applies the capitalization of the source word or phrase to its translation
+    if source.isupper() and len(source) > 1:
+        return translation.upper()
+    if source[:1].isupper():
+        return translation[:1].upper() + translation[1:]
+    return translation
+
+
+class GlossaryTranslator:
+    """
+    Offline translator looking texts and phrases up in a glossary.
+
+    Args:
+        glossary (dict): Source phrase -> translation.
+        source (str): Source language code.
+        target (str): Target language code.
+        max_phrase_words (int): Longest phrase, in words, looked up inside a text.
+    """
+
+    def __init__(self, glossary, source="en", target="fr", max_phrase_words=None):
+        self.source = source
+        self.target = target
+        self.entries = {self._key(phrase): translation for phrase, translation in glossary.items()}
+        longest = max((len(key.split()) for key in self.entries), default=1)
+        self.max_phrase_words = max_phrase_words or longest
+
+    @classmethod
+    def from_file(cls, path, source="en", target="fr", max_phrase_words=None):
+        return cls(load_glossary(path), source, target, max_phrase_words)
+
+    @staticmethod
+    def _key(text):
+        return " ".join(text.lower().split())
+
+    def translate(self, text):
+        whole = self.entries.get(self._key(text))
+        if whole is not None:
+            return match_case(text.strip(), whole)
+
+        tokens = _TOKEN.findall(text)
+        output = []
+        index = 0
+        while index < len(tokens):
+            if not _is_word(tokens[index]):
+                output.append(tokens[index])
+                index += 1
+                continue
+
+            # Ends of the phrases starting at this word: words separated by whitespace only
+            ends = [index]
+            while (len(ends) < self.max_phrase_words and ends[-1] + 2 < len(tokens)
+                   and tokens[ends[-1] + 1].isspace() and _is_word(tokens[ends[-1] + 2])):
+                ends.append(ends[-1] + 2)
+
+            # Translate the longest known phrase, or keep the word when none is known
+            for end in reversed(ends):
+                phrase = "".join(tokens[index:end + 1])
+                translation = self.entries.get(self._key(phrase))
+                if translation is not None:
+                    output.append(match_case(phrase, translation))
+                    index = end + 1
+                    break
+            else:
+                output.append(tokens[index])
+                index += 1
+        return "".join(output)
+
+    def translate_many(self, texts):
+        """Translates a list of texts, each distinct text once."""
+        translations = {text: self.translate(text) for text in dict.fromkeys(texts)}
+        return [translations[text] for text in texts]
@@ -1,58 +1,26 @@
-from PIL import Image, ImageDraw, ImageFont
-from deep_translator import GoogleTranslator
-import os, easyocr
+from PIL import Image, ImageDraw
+import argparse
+import os
+from fontFitting import get_default_fitter
+from backgroundColor import estimate_background_colors
+from ocrInput import readtext_rgb
+from translationModels import get_reader, get_translator
+from pipeline import translate_images
 
 
-def perform_ocr(image_path, reader):
+def perform_ocr(image_path, reader, confidence_threshold=0.4, width_ths=0.8, decoder='wordbeamsearch'):
     # Perform OCR on the image
-    result = reader.readtext(image_path, width_ths = 0.8,  decoder = 'wordbeamsearch')
+    result = readtext_rgb(reader, image_path, width_ths = width_ths,  decoder = decoder)
 
     # Extract text and bounding boxes from the OCR result
-    extracted_text_boxes = [(entry[0], entry[1]) for entry in result if entry[2] > 0.4]
+    extracted_text_boxes = [(entry[0], entry[1]) for entry in result if entry[2] > confidence_threshold]
 
     return extracted_text_boxes
 
 
 def get_font(image, text, width, height):
-
-    # Default values at start
-    font_size = None  # For font size
-    font = None  # For object truetype with correct font size
-    box = None  # For version 8.0.0
-    x = 0
-    y = 0
-
-    draw = ImageDraw.Draw(image)  # Create a draw object
-
-    # Test for different font sizes
-    for size in range(1, 500):
-
-        # Create new font
-        new_font = ImageFont.truetype("DejaVuSans-Bold.ttf", size=size)
-
-        # Calculate bbox for version 8.0.0
-        new_box = draw.textbbox((0, 0), text, font=new_font)
-
-        # Calculate width and height
-        new_w = new_box[2] - new_box[0]  # Bottom - Top
-        new_h = new_box[3] - new_box[1]  # Right - Left
-
-        # If too big then exit with previous values
-        if new_w > width or new_h > height:
-            break
-
-        # Set new current values as current values
-        font_size = size
-        font = new_font
-        box = new_box
-        w = new_w
-        h = new_h
-
-        # Calculate position (minus margins in box)
-        x = (width - w) // 2 - box[0]  # Minus left margin
-        y = (height - h) // 2 - box[1]  # Minus top margin
-
-    return font, x, y
+    # Find the largest cached font that fits the box (bisection instead of trying every size)
+    return get_default_fitter().fit(text, width, height)
 
 
 def add_discoloration(color, strength):
@@ -68,30 +36,6 @@ def add_discoloration(color, strength):
     return (r, g, b)
 
 
-def get_background_color(image, x_min, y_min, x_max, y_max):
-    # Define the margin for the edges
-    margin = 10
-
-    # Crop a small region around the edges of the bounding box
-    edge_region = image.crop(
-        (
-            max(x_min - margin, 0),
-            max(y_min - margin, 0),
-            min(x_max + margin, image.width),
-            min(y_max + margin, image.height),
-        )
-    )
-
-    # Find the most common color in the cropped region
-    edge_colors = edge_region.getcolors(edge_region.size[0] * edge_region.size[1])
-    background_color = max(edge_colors, key=lambda x: x[0])[1][:3]
-
-    # Add a bit of discoloration to the background color
-    background_color = add_discoloration(background_color, 40)
-
-    return background_color
-
-
 def get_text_fill_color(background_color):
     # Calculate the luminance of the background color
     luminance = (
@@ -108,14 +52,12 @@ def get_text_fill_color(background_color):
 
 
 def replace_text_with_translation(image_path, translated_texts, text_boxes):
-    # Open the image
-    image = Image.open(image_path)
+    # Open the image (or draw directly on an already decoded one)
+    image = image_path if isinstance(image_path, Image.Image) else Image.open(image_path)
     draw = ImageDraw.Draw(image)
 
-    # Load a font that supports French accent marks
-    font = ImageFont.truetype("DejaVuSans-Bold.ttf", size=20)
-
-    # Replace each text box with translated text
+    # Find the bounds of every box that has a translation
+    boxes = []
     for text_box, translated in zip(text_boxes, translated_texts):
 
         if translated is None:
@@ -138,8 +80,16 @@ def replace_text_with_translation(image_path, translated_texts, text_boxes):
             elif y > y_max:
                 y_max = y
 
-        # Find the most common color in the text region
-        background_color = get_background_color(image, x_min, y_min, x_max, y_max)
+        boxes.append((x_min, y_min, x_max, y_max, translated))
+
+    # Find the most common color around every text region in one pass over the image
+    edge_colors = estimate_background_colors(image, [box[:4] for box in boxes])
+
+    # Replace each text box with translated text
+    for (x_min, y_min, x_max, y_max, translated), edge_color in zip(boxes, edge_colors):
+
+        # Add a bit of discoloration to the background color
+        background_color = add_discoloration(edge_color, 40)
 
         # Draw a rectangle to cover the text region with the original background color
         draw.rectangle(((x_min, y_min), (x_max, y_max)), fill=background_color)
@@ -158,40 +108,77 @@ def replace_text_with_translation(image_path, translated_texts, text_boxes):
     return image
 
 
-# Initialize the OCR reader
-reader = easyocr.Reader(["en", "fr"], model_storage_directory = 'model')
-
-# Initialize the Translator
-translator = GoogleTranslator(source="en", target="fr")
-
-# Define input and output location
-input_folder = "input"
-output_folder = "output"
-
-# Process each image file from input
-files = os.listdir(input_folder)
-image_files = [file for file in files if file.endswith((".jpg", ".jpeg", ".png"))]
-for filename in image_files:
-    
-    print(f'[INFO] Processing {filename}...')
-
-    image_path = os.path.join(input_folder, filename)
-
-    # Extract text and location
-    extracted_text_boxes = perform_ocr(image_path, reader)
-
-    # Translate texts
-    translated_texts = []
-    for text_box, text in extracted_text_boxes:
-        translated_texts.append(translator.translate(text).encode('utf-8').decode('utf-8'))
-
-    # Replace text with translated text
-    image = replace_text_with_translation(image_path, translated_texts, extracted_text_boxes)
-
-    # Save modified image
+def output_name(filename, image_format=None):
     base_filename, extension = os.path.splitext(filename)
-    output_filename = f"{base_filename}-translated{extension}"
-    output_path = os.path.join(output_folder, output_filename)
-    image.save(output_path)
+    if image_format is not None:
+        extension = "." + image_format
+    return f"{base_filename}-translated{extension}"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Translate the text inside the images of the input folder.")
+    parser.add_argument("--source", default="en", help="Language of the text in the images")
+    parser.add_argument("--target", default="fr", help="Language to translate the text to")
+    parser.add_argument("--translator", choices=["google", "google-async", "libretranslate", "glossary"],
+                        default="google",
+                        help="Translation backend: google (blocking, batched requests), google-async (concurrent "
+                             "requests with retries), libretranslate (a LibreTranslate-compatible API) or "
+                             "glossary (offline, from --glossary)")
+    parser.add_argument("--glossary", default=None,
+                        help="Glossary file (.json, .tsv or .csv) of the glossary backend")
+    parser.add_argument("--translation-url", default=None,
+                        help="Endpoint of the translation service (required for libretranslate)")
+    parser.add_argument("--translation-concurrency", type=int, default=8,
+                        help="Translation requests in flight at once (asyncio backends)")
+    parser.add_argument("--translation-rate", type=float, default=None,
+                        help="Maximum translation requests per second (asyncio backends)")
+    parser.add_argument("--confidence-threshold", type=float, default=0.4,
+                        help="Drop OCR boxes at or below this confidence")
+    parser.add_argument("--width-ths", type=float, default=0.8,
+                        help="easyocr width_ths: maximum horizontal distance for boxes to be merged")
+    parser.add_argument("--decoder", choices=["greedy", "beamsearch", "wordbeamsearch"], default="wordbeamsearch",
+                        help="easyocr recognizer decoder")
+    parser.add_argument("--input-folder", default="input", help="Folder containing the images")
+    parser.add_argument("--output-folder", default="output", help="Folder where translated images are saved")
+    parser.add_argument("--output-format", choices=["same", "png", "jpg", "webp"], default="same",
+                        help="Format of the saved images (same keeps the input format)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Initialize the OCR reader (loaded here, so importing this module stays cheap)
+    reader = get_reader(args.source, args.target)
+
+    # Initialize the Translator
+    # Repeated strings are answered from the on-disk translation memory, the rest go out in batches
+    translator = get_translator(args.source, args.target, args.translator, url=args.translation_url,
+                                concurrency=args.translation_concurrency, rate=args.translation_rate,
+                                glossary=args.glossary)
+
+    # Define input and output location
+    input_folder = args.input_folder
+    output_folder = args.output_folder
+    image_format = None if args.output_format == "same" else args.output_format
+
+    # Process each image file from input
+    files = os.listdir(input_folder)
+    image_files = [file for file in files if file.endswith((".jpg", ".jpeg", ".png"))]
+
+    # OCR, translation, drawing and saving run as overlapping pipeline stages, all in this process
+    # (the folder and worker options of a whole job are in TranslateMultipleImage.py)
+    pipeline = translate_images(
+        image_files,
+        input_folder,
+        output_folder,
+        lambda image: perform_ocr(image, reader, args.confidence_threshold, args.width_ths, args.decoder),
+        translator,
+        replace_text_with_translation,
+        output_name=lambda filename: output_name(filename, image_format),
+    )
+    pipeline.print_stats()
+
 
-    print(f'[INFO] Saved as {output_filename}...')
+if __name__ == "__main__":
+    main()
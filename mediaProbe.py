@@ -0,0 +1,93 @@
+'''
+This module gets media information with ffprobe and decodes audio with ffmpeg, without shared
+temporary files.
+
+Each file is probed once, with a single JSON ffprobe call returning its duration and streams;
+results are cached by path, size and modification time. Audio is decoded by ffmpeg to raw float
+samples on its standard output and read straight into numpy, so several sync jobs can run at the
+same time on one host without colliding on temporary files.
+'''
+
+import json
+import os
+import subprocess
+from functools import lru_cache
+import numpy as np
+
+PROBE_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=PROBE_CACHE_SIZE)
+def _probe(path, size, mtime_ns):
+    # size and mtime_ns are only part of the cache key, so a replaced file is probed again
+    try:
+        output = subprocess.check_output(
+            ['ffprobe', '-v', 'error', '-show_entries',
+             'format=duration:stream=index,codec_type,codec_name,sample_rate,channels,duration',
+             '-of', 'json', path]
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise RuntimeError(f"FFprobe failed on {path}: {e}")
+
+    info = json.loads(output.decode('utf-8'))
+    streams = info.get('streams', [])
+    audio = [stream for stream in streams if stream.get('codec_type') == 'audio']
+    duration = info.get('format', {}).get('duration')
+    if duration is None:
+        # Some containers only give the duration of their streams
+        durations = [float(stream['duration']) for stream in streams if stream.get('duration')]
+        duration = max(durations) if durations else None
+    return {
+        'duration': float(duration) if duration is not None else None,
+        'streams': streams,
+        'has_audio': bool(audio),
+        'has_video': any(stream.get('codec_type') == 'video' for stream in streams),
+        'sample_rate': int(audio[0]['sample_rate']) if audio and audio[0].get('sample_rate') else None,
+    }
+
+
+def probe(path):
+    """
+    Returns the duration and streams of a media file, running ffprobe only on the first call.
+
+    Args:
+        path (str): Video or audio file.
+
+    Returns:
+        dict: duration (seconds), streams (as given by ffprobe), has_audio, has_video and
+        sample_rate (of the first audio stream, None without audio).
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _probe(path, stat.st_size, stat.st_mtime_ns)
+
+
+def read_audio(path, start=0.0, duration=None, sr=None):
+    """
+    Decodes a window of the first audio stream of a file as mono float samples, through a pipe.
+
+    Args:
+        path (str): Video or audio file.
+        start (float): Start of the window, in seconds.
+        duration (float): Length of the window in seconds, None for the rest of the file.
+        sr (int): Sample rate to decode to, None to keep the stream's.
+
+    Returns:
+        tuple: (samples, sample rate), like audioAlignment.load_window.
+    """
+    sr = sr or probe(path)['sample_rate'] or 44100
+    command = ['ffmpeg', '-v', 'error', '-nostdin']
+    if start > 0:
+        # Before -i, ffmpeg seeks in the input instead of decoding up to the start
+        command += ['-ss', str(start)]
+    command += ['-i', path]
+    if duration is not None:
+        command += ['-t', str(duration)]
+    command += ['-map', '0:a:0', '-vn', '-ac', '1', '-ar', str(sr), '-f', 'f32le', '-']
+
+    try:
+        result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise RuntimeError(f"FFmpeg failed to decode audio from {path}: {e}")
+    return np.frombuffer(result.stdout, dtype=np.float32), sr
+
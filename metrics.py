@@ -0,0 +1,187 @@
+'''
+This module collects per-stage timings and counters of a translation job and writes them out as a
+JSON summary or a Prometheus textfile (for node_exporter's textfile collector).
+
+Stages are timed with `with get_metrics().timer("ocr"):` around the code of each step; every
+duration goes into a histogram with fixed buckets, so runs can be compared stage by stage and a
+regression shows up in the stage that caused it. Counters record events such as translation
+errors, and gauges hold values read at the end of a job, such as cache sizes, worker counts and the
+peak queue depth of each pipeline stage.
+
+Worker processes have their own Metrics; they send snapshot() back to the parent, which merge()s
+it. profile() wraps a block in cProfile for a function-level view of the same run.
+'''
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds of the histogram buckets, in seconds (the last bucket is +Inf)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = "image_translator"
+
+
+class Metrics:
+    """Thread-safe stage timings, counters and gauges of one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._durations = {}  # Stage name -> list of durations in seconds
+            self._counters = {}
+            self._gauges = {}
+
+    def observe(self, stage, seconds):
+        """Records one duration of a stage."""
+        with self._lock:
+            self._durations.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """Times the enclosed block as one run of a stage (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def count(self, name, value=1):
+        """Adds value to a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        """Sets a value read at a point in time, such as a cache size; merged gauges keep the latest value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self, reset=False):
+        """
+        Returns the raw data as plain containers, e.g. to send it from a worker process.
+
+        Args:
+            reset (bool): Also clear the data, so the next snapshot only holds what came after.
+        """
+        with self._lock:
+            data = {
+                "durations": {stage: list(durations) for stage, durations in self._durations.items()},
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+            }
+            if reset:
+                self._durations, self._counters, self._gauges = {}, {}, {}
+            return data
+
+    def merge(self, snapshot):
+        """Adds the data of a snapshot taken in another process."""
+        with self._lock:
+            for stage, durations in snapshot["durations"].items():
+                self._durations.setdefault(stage, []).extend(durations)
+            for name, value in snapshot["counters"].items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            self._gauges.update(snapshot["gauges"])
+
+    def summary(self):
+        """
+        Returns the stage statistics, histograms, counters and gauges.
+
+        Returns:
+            dict: {"stages": {stage: {count, total, mean, p50, p95, p99, max, buckets}},
+                   "counters": {...}, "gauges": {...}}, durations in seconds and buckets
+                   as cumulative counts per upper bound.
+        """
+        data = self.snapshot()
+        stages = {}
+        for stage, durations in data["durations"].items():
+            ordered = sorted(durations)
+            count = len(ordered)
+            stages[stage] = {
+                "count": count,
+                "total": sum(ordered),
+                "mean": sum(ordered) / count if count else 0.0,
+                "p50": ordered[count // 2] if count else 0.0,
+                "p95": ordered[min(count - 1, int(count * 0.95))] if count else 0.0,
+                "p99": ordered[min(count - 1, int(count * 0.99))] if count else 0.0,
+                "max": ordered[-1] if count else 0.0,
+                "buckets": {str(bound): sum(1 for duration in ordered if duration <= bound) for bound in BUCKETS},
+            }
+        return {"stages": stages, "counters": data["counters"], "gauges": data["gauges"]}
+
+    def write_json(self, path):
+        with open(path, "w") as output_file:
+            json.dump(dict(self.summary(), timestamp=time.time()), output_file, indent=2)
+
+    def prometheus_text(self, labels=None):
+        """Returns the metrics in the Prometheus text exposition format."""
+        summary = self.summary()
+        base_labels = "".join(f',{key}="{value}"' for key, value in sorted((labels or {}).items()))
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [f"# HELP {name} Duration of each processing stage per image.", f"# TYPE {name} histogram"]
+        for stage, stage_stats in sorted(summary["stages"].items()):
+            for bound in BUCKETS:
+                lines.append(f'{name}_bucket{{stage="{stage}"{base_labels},le="{bound}"}} {stage_stats["buckets"][str(bound)]}')
+            lines.append(f'{name}_bucket{{stage="{stage}"{base_labels},le="+Inf"}} {stage_stats["count"]}')
+            lines.append(f'{name}_sum{{stage="{stage}"{base_labels}}} {stage_stats["total"]}')
+            lines.append(f'{name}_count{{stage="{stage}"{base_labels}}} {stage_stats["count"]}')
+
+        label_text = "{" + base_labels[1:] + "}" if base_labels else ""
+        for counter, value in sorted(summary["counters"].items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{counter}_total counter")
+            lines.append(f"{METRIC_PREFIX}_{counter}_total{label_text} {value}")
+        for gauge, value in sorted(summary["gauges"].items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{gauge} gauge")
+            lines.append(f"{METRIC_PREFIX}_{gauge}{label_text} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, labels=None):
+        """Writes a Prometheus textfile, through a temporary file so the collector never reads half of it."""
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as output_file:
+            output_file.write(self.prometheus_text(labels))
+        os.replace(temporary_path, path)
+
+    def print_summary(self):
+        summary = self.summary()
+        for stage, stage_stats in summary["stages"].items():
+            print(f"[INFO]   {stage:<10} n={stage_stats['count']:<6} total={stage_stats['total']:.2f}s "
+                  f"p50={stage_stats['p50'] * 1000:.1f}ms p95={stage_stats['p95'] * 1000:.1f}ms "
+                  f"max={stage_stats['max'] * 1000:.1f}ms")
+        for name, value in {**summary["counters"], **summary["gauges"]}.items():
+            print(f"[INFO]   {name}: {value}")
+
+
+_default_metrics = Metrics()
+
+
+def get_metrics():
+    """Returns the Metrics shared by the whole process."""
+    return _default_metrics
+
+
+@contextmanager
+def profile(path=None, top=25):
+    """
+    Runs the enclosed block under cProfile.
+
+    Args:
+        path (str): Where to dump the profile (readable with pstats or snakeviz); not saved when None.
+        top (int): Number of functions printed, sorted by cumulative time (0 to print nothing).
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+            print(f"[INFO] Profile saved to {path}.")
+        if top:
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
@@ -0,0 +1,52 @@
+'''
+This module hands images to easyocr the way readtext prepares an image file.
+
+Given a path, readtext detects text on the RGB image and recognizes it on the file's grayscale.
+Given a 3-channel array, it assumes BGR and converts it with COLOR_BGR2GRAY, so the RGB arrays used
+throughout this project (decoded images, video frames converted to RGB, crops of both) would be
+recognized with the red and blue weights swapped. reformat_rgb builds the grayscale from RGB
+instead, and readtext_rgb runs detection and recognition on the pair like readtext does.
+'''
+
+import numpy as np
+from PIL import Image
+
+
+def reformat_rgb(image):
+    """
+    Returns the (RGB image, grayscale image) pair easyocr detects and recognizes on.
+
+    Args:
+        image: Image path, PIL image, RGB or RGBA array, or grayscale array.
+
+    Returns:
+        tuple: (img, img_cv_grey) as returned by easyocr.utils.reformat_input for an image file.
+    """
+    # Imported here so importing this module does not load torch
+    import cv2
+    from easyocr.utils import reformat_input
+
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert("RGB"))
+    if isinstance(image, np.ndarray) and image.ndim == 3 and image.shape[2] in (3, 4):
+        rgb = np.ascontiguousarray(image[:, :, :3])
+        return rgb, cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    return reformat_input(image)
+
+
+def readtext_rgb(reader, image, width_ths=0.8, decoder="wordbeamsearch"):
+    """
+    Like reader.readtext, for images given as RGB arrays as well as paths.
+
+    Args:
+        reader (easyocr.Reader): The OCR reader.
+        image: Image path, PIL image or RGB array.
+        width_ths (float): Passed to detection to merge close boxes.
+        decoder (str): Recognizer decoder.
+
+    Returns:
+        list: (bbox, text, confidence) entries, like readtext.
+    """
+    img, img_cv_grey = reformat_rgb(image)
+    horizontal_list, free_list = reader.detect(img, width_ths=width_ths, reformat=False)
+    return reader.recognize(img_cv_grey, horizontal_list[0], free_list[0], decoder=decoder, reformat=False)
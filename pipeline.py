@@ -0,0 +1,238 @@
+'''
+This module runs image translation as a pipeline of stages connected by bounded queues:
+
+    decode -> OCR -> translate -> render -> save
+
+Every stage has its own pool of worker threads, so the CPU keeps doing OCR while translations wait
+on the network and PNG encoding overlaps with both. OCR can be handed to a process pool, in which
+case the OCR threads only wait for the worker processes. Bounded queues provide backpressure: a
+slow stage blocks the stages feeding it instead of letting decoded images pile up in memory.
+'''
+
+import os
+import queue
+import threading
+import time
+import numpy as np
+from PIL import Image
+from batchTranslation import translate_texts
+from metrics import get_metrics
+
+_END = object()  # Marks the end of the stream between two stages
+JPEG_QUALITY = 95
+
+
+def save_image(image, output_path):
+    """Saves an image in the format of its extension, dropping the alpha channel for JPEG."""
+    if output_path.lower().endswith((".jpg", ".jpeg")):
+        image.convert("RGB").save(output_path, quality=JPEG_QUALITY)
+    else:
+        image.save(output_path)
+
+
+class Stage:
+    """
+    One pipeline step.
+
+    Args:
+        name (str): Name used in timings and error messages.
+        function (callable): Takes a job dict and returns it (or None to drop the job).
+        workers (int): Number of threads running the function.
+    """
+
+    def __init__(self, name, function, workers=1):
+        self.name = name
+        self.function = function
+        self.workers = max(1, workers)
+
+
+class Pipeline:
+    """
+    Runs jobs through stages, each stage reading from a bounded queue and writing to the next one.
+
+    Args:
+        stages (list): Stage objects in execution order.
+        queue_size (int): Maximum number of jobs waiting in front of each stage.
+        metrics (metrics.Metrics): Also records stage durations there, as 'pipeline_<stage>'.
+    """
+
+    def __init__(self, stages, queue_size=8, metrics=None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.metrics = metrics
+        self.timings = {stage.name: [] for stage in stages}
+        self.queue_peaks = {stage.name: 0 for stage in stages}  # Longest queue seen in front of each stage
+        self.errors = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+
+    def _run_worker(self, stage, input_queue, output_queue, remaining):
+        while True:
+            job = input_queue.get()
+            if job is _END:
+                break
+            depth = input_queue.qsize() + 1
+            if depth > self.queue_peaks[stage.name]:
+                with self._lock:
+                    self.queue_peaks[stage.name] = max(self.queue_peaks[stage.name], depth)
+
+            start = time.perf_counter()
+            try:
+                job = stage.function(job)
+            except Exception as e:
+                print(f"[ERROR] {stage.name} failed for {job.get('filename')}: {e}")
+                job = None
+                with self._lock:
+                    self.errors += 1
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self.timings[stage.name].append(elapsed)
+            if self.metrics is not None:
+                self.metrics.observe(f"pipeline_{stage.name}", elapsed)
+            if job is not None:
+                if output_queue is not None:
+                    output_queue.put(job)
+                else:
+                    with self._lock:
+                        self.completed += 1
+
+        # The last worker of a stage to finish closes the stream for the next stage
+        with self._lock:
+            remaining[stage.name] -= 1
+            last = remaining[stage.name] == 0
+        if last and output_queue is not None:
+            for _ in range(self.stages[self.stages.index(stage) + 1].workers):
+                output_queue.put(_END)
+
+    def run(self, jobs):
+        """Feeds jobs (dicts) through all stages and blocks until every job is done or dropped."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = {stage.name: stage.workers for stage in self.stages}
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            output_queue = queues[index + 1] if index + 1 < len(self.stages) else None
+            for _ in range(stage.workers):
+                thread = threading.Thread(target=self._run_worker,
+                                          args=(stage, queues[index], output_queue, remaining),
+                                          daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        # Feeding blocks when the first stage falls behind
+        for job in jobs:
+            queues[0].put(job)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_END)
+
+        for thread in threads:
+            thread.join()
+
+        # A stage whose queue stays full is the bottleneck of the stages feeding it
+        if self.metrics is not None:
+            for stage in self.stages:
+                self.metrics.set_gauge(f"pipeline_{stage.name}_queue_peak", self.queue_peaks[stage.name])
+                self.metrics.set_gauge(f"pipeline_{stage.name}_workers", stage.workers)
+
+    def stats(self):
+        """Returns per-stage job count, total, mean, p50, p95 and max durations in seconds."""
+        summary = {}
+        with self._lock:
+            for name, durations in self.timings.items():
+                ordered = sorted(durations)
+                count = len(ordered)
+                summary[name] = {
+                    "count": count,
+                    "total": sum(ordered),
+                    "mean": sum(ordered) / count if count else 0.0,
+                    "p50": ordered[count // 2] if count else 0.0,
+                    "p95": ordered[min(count - 1, int(count * 0.95))] if count else 0.0,
+                    "max": ordered[-1] if count else 0.0,
+                }
+        return summary
+
+    def print_stats(self):
+        print(f"[INFO] Pipeline finished: {self.completed} images saved, {self.errors} errors.")
+        for name, stage_stats in self.stats().items():
+            print(f"[INFO]   {name:<9} n={stage_stats['count']:<6} total={stage_stats['total']:.2f}s "
+                  f"mean={stage_stats['mean'] * 1000:.1f}ms p95={stage_stats['p95'] * 1000:.1f}ms")
+
+
+def translate_images(filenames, input_folder, output_folder, ocr, translator, render,
+                     ocr_workers=1, ocr_executor=None, translate_workers=4, save_workers=2,
+                     queue_size=8, output_name=None, on_saved=None):
+    """
+    Translates images through a decode -> OCR -> translate -> render -> save pipeline.
+
+    Args:
+        filenames (list): Image file names inside input_folder.
+        input_folder (str): Folder containing the images.
+        output_folder (str): Folder where the translated images are saved.
+        ocr (callable): Takes the decoded image as an RGB array and returns a list of (bbox, text) boxes.
+            easyocr's readtext takes 3-channel arrays for BGR, so pass it through
+            ocrInput.readtext_rgb. With ocr_executor,
+            it must be picklable and return (boxes, metrics.Metrics.snapshot()) so the timings of the
+            worker processes are merged into this process's metrics.
+        translator: Translator passed to batchTranslation.translate_texts.
+        render (callable): Takes (image, translated_texts, text_boxes) and returns the rendered image.
+        ocr_workers (int): Number of concurrent OCR calls.
+        ocr_executor (Executor): Optional process pool running ocr, e.g. with one easyocr.Reader per process.
+        translate_workers (int): Number of concurrent translation requests.
+        save_workers (int): Number of threads encoding and writing images.
+        queue_size (int): Maximum number of images waiting in front of each stage.
+        output_name (callable): Maps an input file name to its output file name (default: unchanged).
+        on_saved (callable): Called with the job dict (filename, image_path, output_path, ...) after
+            each image is saved, e.g. to record progress in a jobManifest.JobManifest.
+
+    Returns:
+        Pipeline: The finished pipeline, for its stats().
+    """
+    os.makedirs(output_folder, exist_ok=True)
+
+    def decode(job):
+        print(f"[INFO] Processing {job['filename']}...")
+        image = Image.open(job["image_path"])
+        image.load()
+        job["image"] = image
+        # OCR reads these pixels instead of decoding the file a second time
+        job["pixels"] = np.asarray(image.convert("RGB"))
+        return job
+
+    def run_ocr(job):
+        pixels = job.pop("pixels")
+        if ocr_executor is not None:
+            job["text_boxes"], worker_metrics = ocr_executor.submit(ocr, pixels).result()
+            get_metrics().merge(worker_metrics)
+        else:
+            job["text_boxes"] = ocr(pixels)
+        return job
+
+    def translate(job):
+        job["translated_texts"] = translate_texts(translator, [box[1] for box in job["text_boxes"]])
+        return job
+
+    def draw(job):
+        job["image"] = render(job["image"], job["translated_texts"], job["text_boxes"])
+        return job
+
+    def save(job):
+        output_filename = output_name(job["filename"]) if output_name else job["filename"]
+        job["output_path"] = os.path.join(output_folder, output_filename)
+        save_image(job["image"], job["output_path"])
+        if on_saved is not None:
+            on_saved(job)
+        print(f"[INFO] Saved {output_filename} to {output_folder}.")
+        return job
+
+    pipeline = Pipeline([
+        Stage("decode", decode, workers=2),
+        Stage("ocr", run_ocr, workers=ocr_workers),
+        Stage("translate", translate, workers=translate_workers),
+        Stage("render", draw, workers=2),
+        Stage("save", save, workers=save_workers),
+    ], queue_size=queue_size, metrics=get_metrics())
+
+    jobs = ({"filename": filename, "image_path": os.path.join(input_folder, filename)} for filename in filenames)
+    pipeline.run(jobs)
+    return pipeline
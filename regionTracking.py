@@ -0,0 +1,122 @@
+'''
+This module avoids running OCR again on text that did not change between video frames.
+
+The boxes found on the last OCR'd frame are tracked: for each box the crop of the new frame is
+compared with the crop that was recognized. Unchanged boxes reuse their previous text (and so hit
+the translation memory instead of the network), changed boxes are OCR'd again on a padded crop
+only, and a full-frame OCR runs every keyframe_interval frames to pick up text appearing elsewhere.
+
+Frames must be given in video order.
+'''
+
+import cv2
+import numpy as np
+
+
+def box_bounds(bbox, width, height, padding=0):
+    """Returns the (x_min, y_min, x_max, y_max) integer bounds of an OCR box, padded and clipped to the frame."""
+    xs = [point[0] for point in bbox]
+    ys = [point[1] for point in bbox]
+    return (
+        max(int(min(xs)) - padding, 0),
+        max(int(min(ys)) - padding, 0),
+        min(int(max(xs)) + padding, width),
+        min(int(max(ys)) + padding, height),
+    )
+
+
+def offset_bbox(bbox, x_offset, y_offset):
+    """Moves an OCR box found on a crop back to frame coordinates."""
+    return [[point[0] + x_offset, point[1] + y_offset] for point in bbox]
+
+
+class RegionTracker:
+    """
+    Incremental OCR over consecutive frames.
+
+    Args:
+        ocr (callable): Takes an RGB array and returns a list of (bbox, text) boxes; with easyocr, use
+            ocrInput.readtext_rgb, as readtext takes arrays for BGR.
+        keyframe_interval (int): Run a full-frame OCR at least every this many frames.
+        change_threshold (float): Mean grayscale difference (0-255) above which a box region is
+            considered changed.
+    """
+
+    def __init__(self, ocr, keyframe_interval=15, change_threshold=8.0):
+        self.ocr = ocr
+        self.keyframe_interval = keyframe_interval
+        self.change_threshold = change_threshold
+        self.full_ocr_count = 0
+        self.region_ocr_count = 0
+        self.reused_box_count = 0
+        self._tracked = []  # (bbox, text, grayscale crop at recognition time)
+        self._frames_since_keyframe = None
+
+    def _track(self, gray, text_boxes):
+        height, width = gray.shape
+        tracked = []
+        for bbox, text in text_boxes:
+            x_min, y_min, x_max, y_max = box_bounds(bbox, width, height)
+            tracked.append((bbox, text, gray[y_min:y_max, x_min:x_max].copy()))
+        return tracked
+
+    def _changed(self, gray, bbox, reference):
+        height, width = gray.shape
+        x_min, y_min, x_max, y_max = box_bounds(bbox, width, height)
+        crop = gray[y_min:y_max, x_min:x_max]
+        if crop.shape != reference.shape or crop.size == 0:
+            return True
+        return np.abs(crop.astype(np.int16) - reference).mean() > self.change_threshold
+
+    def update(self, frame):
+        """
+        Returns the (bbox, text) boxes of the next frame, like perform_ocr.
+
+        Args:
+            frame (numpy.ndarray): RGB frame.
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        height, width = gray.shape
+
+        if self._frames_since_keyframe is None or self._frames_since_keyframe >= self.keyframe_interval:
+            text_boxes = self.ocr(frame)
+            self.full_ocr_count += 1
+            self._frames_since_keyframe = 1
+            self._tracked = self._track(gray, text_boxes)
+            return text_boxes
+
+        self._frames_since_keyframe += 1
+        tracked = []
+        for bbox, text, reference in self._tracked:
+            # Keep comparing against the recognized crop so slow fades still count as a change
+            if not self._changed(gray, bbox, reference):
+                tracked.append((bbox, text, reference))
+                self.reused_box_count += 1
+                continue
+
+            # Text may have grown, so look at a crop padded by one text height on each side
+            y_min, y_max = box_bounds(bbox, width, height)[1::2]
+            x_min, y_min, x_max, y_max = box_bounds(bbox, width, height, padding=max(y_max - y_min, 4))
+            self.region_ocr_count += 1
+            region_boxes = self.ocr(np.ascontiguousarray(frame[y_min:y_max, x_min:x_max]))
+            region_boxes = [(offset_bbox(region_bbox, x_min, y_min), region_text)
+                            for region_bbox, region_text in region_boxes]
+            tracked += self._track(gray, region_boxes)
+
+        # Boxes re-read on overlapping crops can repeat, keep the first of each text at a position
+        self._tracked = []
+        seen = set()
+        for bbox, text, reference in tracked:
+            key = (text, box_bounds(bbox, width, height))
+            if key not in seen:
+                seen.add(key)
+                self._tracked.append((bbox, text, reference))
+
+        return [(bbox, text) for bbox, text, _ in self._tracked]
+
+    def stats(self):
+        return {
+            "full_ocr": self.full_ocr_count,
+            "region_ocr": self.region_ocr_count,
+            "reused_boxes": self.reused_box_count,
+        }
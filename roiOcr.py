@@ -0,0 +1,204 @@
+'''
+This module runs OCR on regions of interest only, such as the subtitle strip at the bottom of a
+video or a title bar at the top, instead of the whole frame.
+
+Bands can be configured, or learned: the first frames are OCR'd whole and the rows where text
+appeared become the bands used for the following frames. Text detection cost grows with the number
+of pixels, so OCR'ing a 20% band is several times faster than the full frame. Boxes found on a
+crop are moved back to frame coordinates, so rendering is unchanged.
+'''
+
+import argparse
+import threading
+import numpy as np
+from PIL import Image
+from regionTracking import offset_bbox
+
+
+def parse_band(text):
+    """
+    Parses a band given on the command line, as fractions of the frame size (argparse type of --roi).
+
+    Args:
+        text (str): 'Y0:Y1' for a full-width band between two heights (e.g. '0.75:1' for the bottom
+            quarter), or 'X0,Y0,X1,Y1' for a rectangle.
+
+    Returns:
+        tuple: (x0, y0, x1, y1) fractions.
+
+    Raises:
+        argparse.ArgumentTypeError: If the band is malformed or empty.
+    """
+    try:
+        if ":" in text:
+            y0, y1 = (float(value) for value in text.split(":"))
+            band = (0.0, y0, 1.0, y1)
+        else:
+            x0, y0, x1, y1 = (float(value) for value in text.split(","))
+            band = (x0, y0, x1, y1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid band '{text}', expected Y0:Y1 or X0,Y0,X1,Y1")
+    if not all(0.0 <= value <= 1.0 for value in band) or band[0] >= band[2] or band[1] >= band[3]:
+        raise argparse.ArgumentTypeError(f"invalid band '{text}', values must be fractions with X0 < X1 and Y0 < Y1")
+    return band
+
+
+def merge_bands(bands):
+    """Merges overlapping (x0, y0, x1, y1) bands into their bounding box, so no region is OCR'd twice."""
+    merged = []
+    for band in sorted(bands, key=lambda band: band[1]):
+        # A grown band can overlap bands merged earlier, so keep absorbing them (there are only a few)
+        index = 0
+        while index < len(merged):
+            x0, y0, x1, y1 = merged[index]
+            if y0 <= band[3] and band[1] <= y1 and x0 <= band[2] and band[0] <= x1:
+                band = (min(x0, band[0]), min(y0, band[1]), max(x1, band[2]), max(y1, band[3]))
+                del merged[index]
+                index = 0
+            else:
+                index += 1
+        merged.append(band)
+    return sorted(merged, key=lambda band: band[1])
+
+
+def load_rgb(image):
+    # Image paths are decoded here, to know the frame size and cut the crops
+    if isinstance(image, str):
+        return np.asarray(Image.open(image).convert("RGB"))
+    if isinstance(image, Image.Image):
+        return np.asarray(image.convert("RGB"))
+    return image
+
+
+class RegionOfInterest:
+    """
+    Where to run OCR in each frame.
+
+    Args:
+        bands (list): (x0, y0, x1, y1) fractions of the frame to OCR; learned when None.
+        learn_frames (int): Number of frames OCR'd whole to learn the bands.
+        padding (float): Margin added above and below learned text, as a fraction of the height.
+        refresh_interval (int): OCR every this many frames whole and add the rows where text
+            appeared to the bands (0 never does).
+    """
+
+    def __init__(self, bands=None, learn_frames=0, padding=0.05, refresh_interval=0):
+        self.bands = list(bands) if bands else None
+        self.configured_bands = list(bands) if bands else []
+        self.learn_frames = learn_frames
+        self.padding = padding
+        self.refresh_interval = refresh_interval
+        self.full_frames = 0
+        self.roi_frames = 0
+        self._learned = []  # Full-width bands around the text seen so far
+        self._learned_frames = 0
+        self._frames_seen = 0
+        self._pixel_share = 0.0  # Sum over ROI frames of the share of pixels OCR'd
+        self._lock = threading.Lock()
+
+    def regions(self, width, height):
+        """
+        Returns the pixel rectangles (x0, y0, x1, y1) to OCR in the next frame, or None when the
+        whole frame must be OCR'd (while learning and on refresh frames).
+        """
+        with self._lock:
+            self._frames_seen += 1
+            refresh = self.refresh_interval and self._frames_seen % self.refresh_interval == 0
+            if self.bands is None or refresh:
+                self.full_frames += 1
+                return None
+
+            self.roi_frames += 1
+            regions = [(int(x0 * width), int(y0 * height), int(np.ceil(x1 * width)), int(np.ceil(y1 * height)))
+                       for x0, y0, x1, y1 in self.bands]
+            self._pixel_share += sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions) / (width * height)
+            return regions
+
+    def learn(self, text_boxes, width, height):
+        """Records the rows of the boxes found on a whole frame, and sets the bands once enough frames were seen."""
+        with self._lock:
+            for bbox, _ in text_boxes:
+                ys = [point[1] for point in bbox]
+                self._learned.append((0.0, max(0.0, min(ys) / height - self.padding),
+                                      1.0, min(1.0, max(ys) / height + self.padding)))
+            self._learned = merge_bands(self._learned)
+            self._learned_frames += 1
+
+            if self.bands is None and self._learned_frames >= self.learn_frames and self.learn_frames:
+                # Without any text yet, keep OCR'ing whole frames until some appears
+                if self._learned:
+                    self.bands = list(self._learned)
+                    print(f"[INFO] Learned OCR bands from {self._learned_frames} frames: {self.describe()}")
+            elif self.bands is not None and self._learned:
+                # Refresh frames add the rows where new text appeared
+                self.bands = merge_bands(self.configured_bands + self._learned)
+
+    def describe(self):
+        return ", ".join(f"{y0:.2f}-{y1:.2f}" if (x0, x1) == (0.0, 1.0) else f"({x0:.2f},{y0:.2f},{x1:.2f},{y1:.2f})"
+                         for x0, y0, x1, y1 in self.bands or [])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "full_frames": self.full_frames,
+                "roi_frames": self.roi_frames,
+                "bands": self.describe(),
+                "pixel_share": self._pixel_share / self.roi_frames if self.roi_frames else 1.0,
+            }
+
+
+def roi_ocr(image, roi, ocr):
+    """
+    OCRs one image within the regions of interest.
+
+    Args:
+        image: Image path, PIL image or RGB array.
+        roi (RegionOfInterest): The regions to OCR, learned from the whole-frame results.
+        ocr (callable): Takes an image (the original or an RGB crop) and returns (bbox, text) boxes;
+            with easyocr, use ocrInput.readtext_rgb, as readtext takes arrays for BGR.
+
+    Returns:
+        list: The (bbox, text) boxes in frame coordinates.
+    """
+    return roi_batch_ocr([image], roi, lambda images: [ocr(item) for item in images])[0]
+
+
+def roi_batch_ocr(images, roi, batch_ocr):
+    """
+    OCRs several images within the regions of interest, with one call to batch_ocr.
+
+    Args:
+        images (list): Image paths, PIL images or RGB arrays.
+        roi (RegionOfInterest): The regions to OCR.
+        batch_ocr (callable): Takes a list of images (originals or RGB crops) and returns a list
+            of (bbox, text) box lists, e.g. batchOcr.batch_ocr with its reader.
+
+    Returns:
+        list: For every image, its (bbox, text) boxes in frame coordinates.
+    """
+    # Whole frames (while learning) are passed as given, other frames as crops of their regions
+    inputs = []
+    plans = []  # (regions or None, index of the first input, width, height)
+    for image in images:
+        array = load_rgb(image)
+        height, width = array.shape[:2]
+        regions = roi.regions(width, height)
+        plans.append((regions, len(inputs), width, height))
+        if regions is None:
+            inputs.append(image)
+        else:
+            inputs.extend(np.ascontiguousarray(array[y0:y1, x0:x1]) for x0, y0, x1, y1 in regions)
+
+    results = batch_ocr(inputs) if inputs else []
+
+    text_boxes = []
+    for regions, first, width, height in plans:
+        if regions is None:
+            boxes = results[first]
+            roi.learn(boxes, width, height)
+        else:
+            boxes = [(offset_bbox(bbox, x0, y0), text)
+                     for (x0, y0, _, _), region_boxes in zip(regions, results[first:first + len(regions)])
+                     for bbox, text in region_boxes]
+        text_boxes.append(boxes)
+    return text_boxes
@@ -0,0 +1,63 @@
+'''
+Tests of estimate_offset on synthetic speech-like audio shifted by known offsets.
+
+Usage (from the repository root):
+    python -m unittest discover tests
+'''
+
+import unittest
+import numpy as np
+from audioAlignment import estimate_offset
+
+SR = 16000
+
+
+def speech_like(duration, rng):
+    # Bursts of noise and tones of 50-300 ms separated by pauses
+    signal = np.zeros(int(duration * SR), dtype=np.float32)
+    position = 0
+    while position < len(signal):
+        length = int(rng.uniform(0.05, 0.3) * SR)
+        burst = rng.normal(0, 0.3, length) + np.sin(2 * np.pi * rng.uniform(100, 400) * np.arange(length) / SR)
+        burst *= np.hanning(length) * rng.uniform(0.2, 1.0)
+        signal[position:position + length] = burst[:len(signal) - position]
+        position += length + int(rng.uniform(0.02, 0.4) * SR)
+    return signal
+
+
+def shifted(signal, offset, rng):
+    # The signal delayed by offset seconds (advanced when negative), quieter and noisy
+    shift = int(round(offset * SR))
+    if shift >= 0:
+        output = np.concatenate([np.zeros(shift, dtype=np.float32), signal])[:len(signal)]
+    else:
+        output = np.concatenate([signal[-shift:], np.zeros(-shift, dtype=np.float32)])
+    return (output * 0.7 + rng.normal(0, 0.02, len(output))).astype(np.float32)
+
+
+class EstimateOffsetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.reference = speech_like(20.0, self.rng)
+
+    def test_known_offsets(self):
+        for offset in (-2.5, 0.0, 0.35, 1.234):
+            other = shifted(self.reference, offset, self.rng)
+            self.assertAlmostEqual(estimate_offset(self.reference, other, SR), offset, delta=2.0 / SR)
+
+    def test_window_positions(self):
+        # Windows cut at different times of their files add their start difference
+        other = shifted(self.reference, 0.5, self.rng)
+        offset = estimate_offset(self.reference[SR:], other[3 * SR:], SR, reference_start=1.0, other_start=3.0)
+        self.assertAlmostEqual(offset, 0.5, delta=2.0 / SR)
+
+    def test_max_lag_bounds_result(self):
+        other = shifted(self.reference, 3.0, self.rng)
+        self.assertAlmostEqual(estimate_offset(self.reference, other, SR), 3.0, delta=2.0 / SR)
+        offset = estimate_offset(self.reference, other, SR, max_lag=1.0)
+        self.assertLessEqual(abs(offset), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+'''
+Tests of FrameIndex on synthetic 1080p frames: re-encoded copies must match, while a frame whose
+subtitle changed by one character must not.
+
+Usage (from the repository root):
+    python -m unittest discover tests
+'''
+
+import unittest
+import cv2
+import numpy as np
+from frameDedup import FrameIndex
+
+
+def subtitle_frame(text):
+    # A gradient 1080p frame with a thin subtitle at the bottom
+    frame = np.tile(np.linspace(40, 120, 1920, dtype=np.uint8)[None, :, None], (1080, 1, 3))
+    cv2.putText(frame, text, (700, 1000), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 1, cv2.LINE_AA)
+    return frame
+
+
+def reencoded(frame):
+    # The frame after a lossy JPEG round trip
+    _, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+class FrameIndexTest(unittest.TestCase):
+
+    def test_reencoded_frame_matches(self):
+        index = FrameIndex()
+        frame = subtitle_frame("Where is the station?")
+        self.assertEqual(index.lookup(frame, 0), (0, True))
+        self.assertEqual(index.lookup(reencoded(frame), 1), (0, False))
+        self.assertEqual(len(index), 1)
+
+    def test_one_character_change_is_kept(self):
+        index = FrameIndex()
+        index.lookup(subtitle_frame("Where is the station?"), 0)
+        self.assertEqual(index.lookup(subtitle_frame("Where is the station!"), 1), (1, True))
+        self.assertEqual(index.lookup(subtitle_frame("It costs 3 euros"), 2), (2, True))
+        self.assertEqual(index.lookup(subtitle_frame("It costs 8 euros"), 3), (3, True))
+
+    def test_earlier_frame_is_found_again(self):
+        index = FrameIndex()
+        first, second = subtitle_frame("First line"), subtitle_frame("Second line")
+        index.lookup(first, 0)
+        index.lookup(second, 1)
+        self.assertEqual(index.lookup(reencoded(first), 2), (0, False))
+
+    def test_eviction(self):
+        evicted = []
+        index = FrameIndex(max_entries=2, on_evict=evicted.append)
+        for frame_id, text in enumerate(["One", "Two", "Three"]):
+            index.lookup(subtitle_frame(text), frame_id)
+        self.assertEqual(evicted, [0])
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.lookup(subtitle_frame("One"), 3), (3, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+'''
+Tests of the glyph cache: cached masks must draw exactly what draw.text draws, including at
+fractional box corners, and the cache must stay within its memory budget.
+
+Usage (from the repository root):
+    python -m unittest discover tests
+'''
+
+import math
+import unittest
+import numpy as np
+from PIL import Image, ImageDraw
+from fontFitting import FontFitter
+from glyphCache import GlyphCache
+
+
+def has_font():
+    try:
+        FontFitter().get(12)
+    except OSError:
+        return False
+    return True
+
+
+@unittest.skipUnless(has_font(), "the default font is not installed")
+class GlyphCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fitter = FontFitter()
+        self.cache = GlyphCache(self.fitter)
+
+    def draw_both(self, text, x_min, y_min, width, height):
+        # Draws the text with draw.text and through the cache, returning both images as arrays
+        font, x, y = self.fitter.fit(text, width, height)
+        text_x, text_y = x_min + x, y_min + y
+        expected = Image.new("RGB", (400, 120), (30, 60, 90))
+        ImageDraw.Draw(expected).text((text_x, text_y), text, fill=(250, 240, 10), font=font)
+
+        subpixel = (math.modf(text_x)[0], math.modf(text_y)[0])
+        entry = self.cache.get(text, font, "L", subpixel)
+        if entry is None:
+            entry = self.cache.put(text, font, "L", subpixel)
+        mask, x, y = entry
+        actual = Image.new("RGB", (400, 120), (30, 60, 90))
+        ImageDraw.Draw(actual).bitmap((int(text_x) + x, int(text_y) + y), mask, fill=(250, 240, 10))
+        return np.asarray(expected), np.asarray(actual)
+
+    def test_same_pixels_as_draw_text(self):
+        for x_min, y_min in [(10, 20), (10.25, 20.5), (37.8, 15.1), (120.5, 40.75)]:
+            for text in ["Bonjour le monde", "Où est la gare ?", "jQy"]:
+                expected, actual = self.draw_both(text, x_min, y_min, 250, 40)
+                np.testing.assert_array_equal(expected, actual, err_msg=f"{text} at ({x_min}, {y_min})")
+
+    def test_hits_per_subpixel_position(self):
+        self.draw_both("Hello", 10, 10, 100, 30)
+        self.draw_both("Hello", 50, 60, 100, 30)
+        self.draw_both("Hello", 10.5, 10, 100, 30)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 2, 2))
+
+    def test_memory_budget(self):
+        cache = GlyphCache(self.fitter, max_bytes=20000)
+        font = self.fitter.get(30)
+        for index in range(20):
+            cache.put(f"Subtitle number {index}", font)
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], 20000)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIsNone(cache.get("Subtitle number 0", font))
+        self.assertIsNotNone(cache.get("Subtitle number 19", font))
+
+
+if __name__ == "__main__":
+    unittest.main()
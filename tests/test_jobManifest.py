@@ -0,0 +1,106 @@
+'''
+Tests of the job manifest used to resume translation jobs, and of the frame selection of shards.
+
+Usage (from the repository root):
+    python -m unittest discover tests
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+from jobManifest import JobManifest, select_frames
+
+SETTINGS = {"source": "en", "target": "fr", "output_format": "same", "output_suffix": ""}
+
+
+class JobManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.input_folder = os.path.join(self.workdir, "input")
+        self.output_folder = os.path.join(self.workdir, "output")
+        os.makedirs(self.input_folder)
+        os.makedirs(self.output_folder)
+        self.manifest_path = os.path.join(self.workdir, "manifest.sqlite")
+        self.filenames = ["frame_1.png", "frame_2.png", "frame_3.png"]
+        for filename in self.filenames:
+            with open(os.path.join(self.input_folder, filename), "wb") as input_file:
+                input_file.write(filename.encode())
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def output_path(self, filename):
+        return os.path.join(self.output_folder, filename)
+
+    def complete(self, manifest, filename, output_path=None):
+        output_path = output_path or self.output_path(filename)
+        with open(output_path, "wb") as output_file:
+            output_file.write(b"translated")
+        manifest.mark_done(filename, os.path.join(self.input_folder, filename), output_path)
+
+    def test_completed_files_are_skipped(self):
+        manifest = JobManifest(self.manifest_path, SETTINGS)
+        self.complete(manifest, "frame_1.png")
+        self.assertEqual(manifest.pending(self.filenames, self.input_folder, output_path=self.output_path),
+                         ["frame_2.png", "frame_3.png"])
+        manifest.close()
+
+    def test_missing_output_is_processed_again(self):
+        manifest = JobManifest(self.manifest_path, SETTINGS)
+        self.complete(manifest, "frame_1.png")
+        os.remove(self.output_path("frame_1.png"))
+        self.assertEqual(manifest.pending(self.filenames), self.filenames)
+        manifest.close()
+
+    def test_changed_settings_are_processed_again(self):
+        manifest = JobManifest(self.manifest_path, SETTINGS)
+        self.complete(manifest, "frame_1.png")
+        manifest.close()
+        manifest = JobManifest(self.manifest_path, dict(SETTINGS, target="de"))
+        self.assertEqual(manifest.pending(self.filenames), self.filenames)
+        manifest.close()
+
+    def test_other_output_path_is_processed_again(self):
+        manifest = JobManifest(self.manifest_path, SETTINGS)
+        self.complete(manifest, "frame_1.png")
+        other_path = lambda filename: os.path.join(self.output_folder, "other", filename)
+        self.assertEqual(manifest.pending(self.filenames, output_path=other_path), self.filenames)
+        manifest.close()
+
+    def test_changed_input_is_processed_again_when_verified(self):
+        manifest = JobManifest(self.manifest_path, SETTINGS)
+        self.complete(manifest, "frame_1.png")
+        with open(os.path.join(self.input_folder, "frame_1.png"), "wb") as input_file:
+            input_file.write(b"new content")
+        self.assertNotIn("frame_1.png", manifest.pending(self.filenames, self.input_folder))
+        self.assertIn("frame_1.png", manifest.pending(self.filenames, self.input_folder, verify_inputs=True))
+        manifest.close()
+
+    def test_failure_does_not_undo_completion(self):
+        manifest = JobManifest(self.manifest_path, SETTINGS)
+        self.complete(manifest, "frame_1.png")
+        manifest.mark_failed("frame_1.png", "error")
+        manifest.mark_failed("frame_2.png", "error")
+        self.assertEqual(manifest.summary(), {"done": 1, "failed": 1})
+        manifest.close()
+
+
+class SelectFramesTest(unittest.TestCase):
+
+    def test_range_and_shards(self):
+        filenames = [f"frame_{number}.png" for number in range(10)]
+        self.assertEqual(select_frames(filenames, first_frame=3, last_frame=5), ["frame_3.png", "frame_4.png", "frame_5.png"])
+        shards = [select_frames(filenames, shard_index=index, shard_count=3) for index in range(3)]
+        self.assertEqual(sorted(sum(shards, [])), sorted(filenames))
+        self.assertEqual(shards[1], ["frame_1.png", "frame_4.png", "frame_7.png"])
+
+    def test_unnumbered_files_go_to_first_shard(self):
+        filenames = ["frame_2.png", "cover.png", "frame_1.png"]
+        self.assertEqual(select_frames(filenames, shard_index=0, shard_count=2), ["frame_2.png", "cover.png"])
+        self.assertEqual(select_frames(filenames, shard_index=1, shard_count=2), ["frame_1.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
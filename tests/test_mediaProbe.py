@@ -0,0 +1,83 @@
+'''
+Tests of mediaProbe and of the no-audio path of SyncVideoWithAudio, on small files generated with
+ffmpeg. They are skipped when ffmpeg or ffprobe is not installed.
+
+Usage (from the repository root):
+    python -m unittest discover tests
+'''
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+import numpy as np
+from mediaProbe import _probe, probe, read_audio
+from SyncVideoWithAudio import sync_audio_to_video
+
+HAS_FFMPEG = shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+def ffmpeg(*arguments):
+    subprocess.run(["ffmpeg", "-v", "error", "-y", "-nostdin"] + list(arguments), check=True)
+
+
+@unittest.skipUnless(HAS_FFMPEG, "ffmpeg and ffprobe are required")
+class MediaProbeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.mkdtemp()
+        cls.tone = os.path.join(cls.workdir, "tone.wav")
+        cls.video = os.path.join(cls.workdir, "video.mkv")
+        cls.silent_video = os.path.join(cls.workdir, "silent.mkv")
+        ffmpeg("-f", "lavfi", "-i", "sine=frequency=440:sample_rate=16000:duration=2", cls.tone)
+        ffmpeg("-f", "lavfi", "-i", "testsrc=size=64x48:rate=10:duration=2",
+               "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=22050:duration=2",
+               "-c:v", "mpeg4", "-c:a", "pcm_s16le", "-shortest", cls.video)
+        ffmpeg("-f", "lavfi", "-i", "testsrc=size=64x48:rate=10:duration=2", "-c:v", "mpeg4", cls.silent_video)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def test_probe_reports_streams(self):
+        info = probe(self.video)
+        self.assertTrue(info["has_audio"])
+        self.assertTrue(info["has_video"])
+        self.assertEqual(info["sample_rate"], 22050)
+        self.assertAlmostEqual(info["duration"], 2.0, delta=0.2)
+
+    def test_probe_runs_ffprobe_once(self):
+        probe(self.tone)
+        hits = _probe.cache_info().hits
+        self.assertEqual(probe(self.tone)["sample_rate"], 16000)
+        self.assertEqual(_probe.cache_info().hits, hits + 1)
+
+    def test_read_audio_window(self):
+        samples, sr = read_audio(self.tone, start=0.5, duration=1.0, sr=8000)
+        self.assertEqual(sr, 8000)
+        self.assertEqual(samples.dtype, np.float32)
+        self.assertAlmostEqual(len(samples), 8000, delta=80)
+        self.assertGreater(np.abs(samples).max(), 0.1)
+
+    def test_read_audio_of_video(self):
+        samples, sr = read_audio(self.video)
+        self.assertEqual(sr, 22050)
+        self.assertAlmostEqual(len(samples) / sr, 2.0, delta=0.1)
+
+    def test_video_without_audio(self):
+        info = probe(self.silent_video)
+        self.assertFalse(info["has_audio"])
+        self.assertIsNone(info["sample_rate"])
+        with self.assertRaises(RuntimeError):
+            read_audio(self.silent_video)
+
+        # Nothing to align to: the audio is muxed in without an offset
+        output = os.path.join(self.workdir, "synced.mkv")
+        sync_audio_to_video(self.silent_video, self.tone, output)
+        self.assertTrue(probe(output)["has_audio"])
+
+
+if __name__ == "__main__":
+    unittest.main()
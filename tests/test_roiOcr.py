@@ -0,0 +1,80 @@
+'''
+Tests of the region of interest OCR with a stub OCR function: band parsing and merging, learned
+bands, and boxes found on crops moved back to frame coordinates.
+
+Usage (from the repository root):
+    python -m unittest discover tests
+'''
+
+import argparse
+import contextlib
+import io
+import unittest
+import numpy as np
+from roiOcr import RegionOfInterest, merge_bands, parse_band, roi_batch_ocr, roi_ocr
+
+
+def box(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+class BandTest(unittest.TestCase):
+
+    def test_parse_band(self):
+        self.assertEqual(parse_band("0.75:1"), (0.0, 0.75, 1.0, 1.0))
+        self.assertEqual(parse_band("0,0,0.5,0.2"), (0.0, 0.0, 0.5, 0.2))
+        for text in ("0.9:0.1", "0.5", "1,2,3", "a:b", "0,0,1.5,1"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_band(text)
+
+    def test_merge_overlapping_bands(self):
+        self.assertEqual(merge_bands([(0.0, 0.8, 1.0, 1.0), (0.0, 0.0, 1.0, 0.1), (0.0, 0.7, 1.0, 0.85)]),
+                         [(0.0, 0.0, 1.0, 0.1), (0.0, 0.7, 1.0, 1.0)])
+
+    def test_merge_is_transitive(self):
+        # The last band joins the first two, which did not overlap each other
+        bands = [(0.0, 0.0, 0.2, 0.2), (0.5, 0.0, 0.7, 0.2), (0.1, 0.1, 0.6, 0.3)]
+        self.assertEqual(merge_bands(bands), [(0.0, 0.0, 0.7, 0.3)])
+
+    def test_disjoint_bands_are_kept(self):
+        bands = [(0.0, 0.1, 0.3, 0.2), (0.5, 0.1, 0.9, 0.2)]
+        self.assertEqual(merge_bands(bands), bands)
+
+
+class RegionOfInterestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = np.zeros((100, 200, 3), dtype=np.uint8)
+        self.calls = []
+
+    def ocr(self, image):
+        # Finds one box in the top-left corner of whatever it is given
+        self.calls.append(image.shape[:2])
+        return [(box(10, 5, 50, 15), "text")]
+
+    def test_configured_band_is_cropped_and_offset(self):
+        roi = RegionOfInterest(bands=[(0.0, 0.8, 1.0, 1.0)])
+        boxes = roi_ocr(self.frame, roi, self.ocr)
+        self.assertEqual(self.calls, [(20, 200)])
+        self.assertEqual(boxes, [(box(10, 85, 50, 95), "text")])
+        self.assertAlmostEqual(roi.stats()["pixel_share"], 0.2)
+
+    def test_bands_are_learned_from_whole_frames(self):
+        roi = RegionOfInterest(learn_frames=2, padding=0.0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            roi_batch_ocr([self.frame, self.frame], roi, lambda images: [self.ocr(image) for image in images])
+        self.assertEqual(self.calls, [(100, 200), (100, 200)])
+        self.assertEqual(roi.bands, [(0.0, 0.05, 1.0, 0.15)])
+        roi_ocr(self.frame, roi, self.ocr)
+        self.assertEqual(self.calls[-1], (10, 200))
+        self.assertEqual(roi.stats()["full_frames"], 2)
+
+    def test_refresh_frames_add_bands(self):
+        roi = RegionOfInterest(bands=[(0.0, 0.8, 1.0, 1.0)], refresh_interval=2, padding=0.0)
+        roi_ocr(self.frame, roi, self.ocr)
+        roi_ocr(self.frame, roi, self.ocr)  # Whole frame, finding text at the top
+        self.assertEqual(roi.bands, [(0.0, 0.05, 1.0, 0.15), (0.0, 0.8, 1.0, 1.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
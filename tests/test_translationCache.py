@@ -0,0 +1,103 @@
+'''
+Tests of the translation memory and of CachedTranslator, with a stub translator counting its calls.
+
+Usage (from the repository root):
+    python -m unittest discover tests
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+from translationCache import CachedTranslator, TranslationMemory
+
+
+class StubTranslator:
+    # Upper-cases texts and records every text it was asked to translate
+    def __init__(self, source="en", target="fr"):
+        self.source = source
+        self.target = target
+        self.requests = []
+
+    def translate(self, text):
+        self.requests.append(text)
+        return text.upper()
+
+
+class TranslationMemoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.workdir, "memory.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_normalized_text_hits(self):
+        memory = TranslationMemory(self.db_path)
+        memory.put("en", "fr", "Hello  world ", "Bonjour le monde")
+        self.assertEqual(memory.get("en", "fr", " Hello world"), "Bonjour le monde")
+        self.assertIsNone(memory.get("en", "de", "Hello world"))
+        self.assertEqual(memory.stats()["hits"], 1)
+        self.assertEqual(memory.stats()["misses"], 1)
+        memory.close()
+
+    def test_persists_across_instances(self):
+        memory = TranslationMemory(self.db_path)
+        memory.put("en", "fr", "Hello", "Bonjour")
+        memory.close()
+        memory = TranslationMemory(self.db_path)
+        self.assertEqual(memory.get("en", "fr", "Hello"), "Bonjour")
+        memory.close()
+
+    def test_namespaces_are_separate(self):
+        memory = TranslationMemory(self.db_path)
+        memory.put("en", "fr", "Hello", "Bonjour", namespace="google")
+        memory.put("en", "fr", "Hello", "Salut", namespace="glossary")
+        self.assertEqual(memory.get("en", "fr", "Hello", namespace="google"), "Bonjour")
+        self.assertEqual(memory.get("en", "fr", "Hello", namespace="glossary"), "Salut")
+        self.assertIsNone(memory.get("en", "fr", "Hello", namespace="libretranslate"))
+        memory.close()
+
+    def test_none_is_not_stored(self):
+        memory = TranslationMemory(db_path=None)
+        memory.put("en", "fr", "Hello", None)
+        self.assertIsNone(memory.get("en", "fr", "Hello"))
+
+    def test_in_process_lru_evicts_oldest(self):
+        memory = TranslationMemory(db_path=None, max_memory_entries=2)
+        for text in ("a", "b", "c"):
+            memory.put("en", "fr", text, text.upper())
+        self.assertIsNone(memory.get("en", "fr", "a"))
+        self.assertEqual(memory.get("en", "fr", "c"), "C")
+        self.assertEqual(memory.stats()["evictions"], 1)
+        self.assertEqual(memory.stats()["memory_entries"], 2)
+
+
+class CachedTranslatorTest(unittest.TestCase):
+
+    def test_translate_sends_each_text_once(self):
+        stub = StubTranslator()
+        translator = CachedTranslator(stub, TranslationMemory(db_path=None))
+        self.assertEqual(translator.translate("hello"), "HELLO")
+        self.assertEqual(translator.translate("hello"), "HELLO")
+        self.assertEqual(stub.requests, ["hello"])
+
+    def test_translate_many_sends_only_missing_texts(self):
+        stub = StubTranslator()
+        translator = CachedTranslator(stub, TranslationMemory(db_path=None))
+        translator.translate("known")
+        self.assertEqual(translator.translate_many(["known", "new", "new", "other"]), ["KNOWN", "NEW", "NEW", "OTHER"])
+        self.assertEqual(sorted(stub.requests), ["known", "new", "other"])
+
+    def test_namespace_is_used_for_lookups(self):
+        memory = TranslationMemory(db_path=None)
+        memory.put("en", "fr", "hello", "from glossary", namespace="glossary")
+        stub = StubTranslator()
+        translator = CachedTranslator(stub, memory, namespace="google")
+        self.assertEqual(translator.translate("hello"), "HELLO")
+        self.assertEqual(stub.requests, ["hello"])
+
+
+if __name__ == "__main__":
+    unittest.main()
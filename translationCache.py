@@ -0,0 +1,213 @@
+'''
+This module keeps a translation memory in front of a translator (GoogleTranslator or any object
+with a translate(text) method), so repeated strings such as subtitles and UI labels are only
+sent over the network once.
+
+Entries are keyed by (namespace, source language, target language, normalized text), stored on disk
+in SQLite and mirrored in an in-process LRU. The namespace names the translation backend, so the
+output of one service (or of a partial glossary lookup) is never served in place of another's.
+'''
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from batchTranslation import translate_texts
+from metrics import get_metrics
+
+DEFAULT_DB_PATH = "translation_memory.sqlite"
+DEFAULT_NAMESPACE = "google"  # Namespace of the default backend (see translationModels.memory_namespace)
+BUSY_TIMEOUT = 30  # Seconds a write waits for another process holding the database lock
+
+
+def memory_stats(hits, misses, evictions, memory_entries):
+    """Returns the statistics reported by TranslationMemory.stats, e.g. for counters merged from workers."""
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "evictions": evictions,
+        "hit_rate": hits / total if total else 0.0,
+        "memory_entries": memory_entries,
+    }
+
+
+def normalize_text(text):
+    """Collapses runs of whitespace and strips the ends so OCR spacing noise maps to the same key."""
+    return " ".join(text.split())
+
+
+class TranslationMemory:
+    """
+    Two-level translation store: an in-process LRU on top of a SQLite table.
+
+    Args:
+        db_path (str): Path to the SQLite file, or None to keep everything in memory only.
+        max_memory_entries (int): Maximum number of entries kept in the in-process LRU.
+        max_disk_entries (int): Maximum number of rows kept on disk; the least recently used rows
+            are evicted once the limit is exceeded. None disables disk eviction.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, max_memory_entries=10000, max_disk_entries=1000000):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._puts_since_trim = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+
+        if db_path is not None:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Worker processes share the file, so a writer waits for the others' locks instead of failing
+            self._connection = sqlite3.connect(db_path, check_same_thread=False, timeout=BUSY_TIMEOUT)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "namespace TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, text TEXT NOT NULL, "
+                "translation TEXT NOT NULL, last_used REAL NOT NULL, "
+                "PRIMARY KEY (namespace, source, target, text))"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)"
+            )
+            self._connection.commit()
+
+    def _remember(self, key, translation):
+        # Store in the in-process LRU, dropping the least recently used entry if full
+        self._entries[key] = translation
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_memory_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            get_metrics().count("translation_memory_evictions")
+
+    def get(self, source, target, text, namespace=DEFAULT_NAMESPACE):
+        """Returns the stored translation, or None if the text was never translated in this namespace."""
+        key = (namespace, source, target, normalize_text(text))
+        with self._lock:
+            translation = self._entries.get(key)
+            if translation is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                get_metrics().count("translation_memory_hits")
+                return translation
+
+            if self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT translation FROM translations "
+                    "WHERE namespace = ? AND source = ? AND target = ? AND text = ?",
+                    key,
+                ).fetchone()
+                if row is not None:
+                    self._connection.execute(
+                        "UPDATE translations SET last_used = ? "
+                        "WHERE namespace = ? AND source = ? AND target = ? AND text = ?",
+                        (time.time(),) + key,
+                    )
+                    self._connection.commit()
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    get_metrics().count("translation_memory_hits")
+                    return row[0]
+
+            self.misses += 1
+            get_metrics().count("translation_memory_misses")
+            return None
+
+    def put(self, source, target, text, translation, namespace=DEFAULT_NAMESPACE):
+        """Stores a translation. None translations are not stored so they are retried later."""
+        if translation is None:
+            return
+        key = (namespace, source, target, normalize_text(text))
+        with self._lock:
+            self._remember(key, translation)
+            if self._connection is None:
+                return
+            self._connection.execute(
+                "INSERT OR REPLACE INTO translations (namespace, source, target, text, translation, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                key + (translation, time.time()),
+            )
+            self._puts_since_trim += 1
+
+            # Counting rows is not free, so only trim the table every few hundred writes
+            if self.max_disk_entries is not None and self._puts_since_trim >= 256:
+                self._puts_since_trim = 0
+                count = self._connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                excess = count - self.max_disk_entries
+                if excess > 0:
+                    self._connection.execute(
+                        "DELETE FROM translations WHERE rowid IN "
+                        "(SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    )
+                    self.evictions += excess
+                    get_metrics().count("translation_memory_evictions", excess)
+            self._connection.commit()
+
+    def stats(self):
+        """Returns hit/miss/eviction counters and the current in-memory size."""
+        with self._lock:
+            return memory_stats(self.hits, self.misses, self.evictions, len(self._entries))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class CachedTranslator:
+    """
+    Wraps a translator so translate(text) is answered from a TranslationMemory when possible.
+
+    Args:
+        translator: Object with a translate(text) method, e.g. GoogleTranslator or a stub.
+        memory (TranslationMemory): Store shared by all lookups.
+        source (str): Source language code, defaults to translator.source.
+        target (str): Target language code, defaults to translator.target.
+        namespace (str): Name of the backend, separating its translations from other backends'.
+    """
+
+    def __init__(self, translator, memory, source=None, target=None, namespace=DEFAULT_NAMESPACE):
+        self.translator = translator
+        self.memory = memory
+        self.namespace = namespace
+        self.source = source or getattr(translator, "source", "auto")
+        self.target = target or getattr(translator, "target", "en")
+
+    def translate(self, text):
+        translation = self.memory.get(self.source, self.target, text, self.namespace)
+        if translation is not None:
+            return translation
+
+        # Errors propagate to the caller and nothing is cached, so the text is retried next time
+        translation = self.translator.translate(text)
+        self.memory.put(self.source, self.target, text, translation, self.namespace)
+        return translation
+
+    def translate_many(self, texts):
+        """Translates a list of texts, sending only the ones missing from memory; failures become None."""
+        translations = [self.memory.get(self.source, self.target, text, self.namespace) for text in texts]
+        missing = list(dict.fromkeys(text for text, translation in zip(texts, translations) if translation is None))
+        if not missing:
+            return translations
+
+        fetched = dict(zip(missing, translate_texts(self.translator, missing)))
+        for text, translation in fetched.items():
+            self.memory.put(self.source, self.target, text, translation, self.namespace)
+
+        return [
+            translation if translation is not None else fetched.get(text)
+            for text, translation in zip(texts, translations)
+        ]
+
+    def stats(self):
+        return self.memory.stats()
@@ -0,0 +1,133 @@
+'''
+This module creates the OCR reader and the translator on first use and keeps them for the rest of
+the process, one per language pair.
+
+Importing easyocr loads torch and building a Reader loads its models from disk, which takes seconds
+and hundreds of MB, so nothing heavy is imported until a reader or translator is actually needed.
+Scripts can import the processing functions (or only print their --help) without paying for it.
+'''
+
+import threading
+
+DEFAULT_MODEL_DIRECTORY = "model"
+
+_lock = threading.Lock()
+_readers = {}  # (source, target, model directory) -> easyocr.Reader
+_translators = {}  # (source, target, backend, options) -> CachedTranslator
+_memory = None  # Translation memory shared by every language pair
+
+
+def get_reader(source="en", target="fr", model_storage_directory=DEFAULT_MODEL_DIRECTORY):
+    """
+    Returns the easyocr reader for a language pair, creating it on the first call.
+
+    Args:
+        source (str): Language of the text in the images.
+        target (str): Language the text is translated to, also recognized by the reader.
+        model_storage_directory (str): Folder holding the easyocr models.
+
+    Returns:
+        easyocr.Reader: The reader shared by every caller of this process.
+    """
+    key = (source, target, model_storage_directory)
+    with _lock:
+        if key not in _readers:
+            import easyocr
+            languages = [source] if source == target else [source, target]
+            _readers[key] = easyocr.Reader(languages, model_storage_directory=model_storage_directory)
+        return _readers[key]
+
+
+def set_torch_threads(threads):
+    """Limits the torch thread pool of this process, when torch is installed (stub OCR does not need it)."""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+
+def get_translation_memory():
+    """Returns the translation memory shared by every translator, opening it on the first call."""
+    global _memory
+    with _lock:
+        if _memory is None:
+            from translationCache import TranslationMemory
+            _memory = TranslationMemory()
+        return _memory
+
+
+def create_backend(backend, source, target, url=None, concurrency=8, rate=None, glossary=None):
+    """
+    Creates the object sending texts to a translation service.
+
+    Args:
+        backend (str): 'google' (deep_translator, one blocking request per batch of texts),
+            'google-async' (asyncio client on the same endpoint) or 'libretranslate' (asyncio
+            client on a LibreTranslate-compatible API at url) or 'glossary' (offline, from the
+            glossary file).
+        source (str): Source language code.
+        target (str): Target language code.
+        url (str): Endpoint of the service, for the asyncio backends.
+        concurrency (int): Requests in flight at once, for the asyncio backends.
+        rate (float): Maximum requests per second, for the asyncio backends (None for no limit).
+        glossary (str): Path of the glossary file, for the glossary backend.
+    """
+    if backend == "google":
+        from deep_translator import GoogleTranslator
+        from batchTranslation import BatchTranslator
+        return BatchTranslator(GoogleTranslator(source=source, target=target))
+
+    if backend in ("google-async", "libretranslate"):
+        from asyncTranslation import AsyncTranslator, GoogleWebProtocol, LibreTranslateProtocol
+        if backend == "google-async":
+            protocol = GoogleWebProtocol(url) if url else GoogleWebProtocol()
+        else:
+            if not url:
+                raise ValueError("The libretranslate backend needs the url of the service.")
+            protocol = LibreTranslateProtocol(url)
+        return AsyncTranslator(source=source, target=target, protocol=protocol, concurrency=concurrency, rate=rate)
+
+    if backend == "glossary":
+        from localTranslation import GlossaryTranslator
+        if not glossary:
+            raise ValueError("The glossary backend needs the path of a glossary file.")
+        return GlossaryTranslator.from_file(glossary, source, target)
+
+    raise ValueError(f"Unknown translation backend '{backend}'.")
+
+
+def get_translator(source="en", target="fr", backend="google", url=None, concurrency=8, rate=None, glossary=None):
+    """
+    Returns the translator for a language pair and backend, creating it on the first call.
+
+    Repeated strings are answered from the on-disk translation memory, the rest go to the backend
+    (see create_backend for the arguments). Each service has its own namespace in the memory; the
+    glossary backend only uses an in-process memory, as its partial lookups must not outlive the
+    glossary file they came from.
+
+    Returns:
+        CachedTranslator: The translator shared by every caller of this process.
+    """
+    memory = get_translation_memory() if backend != "glossary" else None
+    key = (source, target, backend, url, concurrency, rate, glossary)
+    with _lock:
+        if key not in _translators:
+            from translationCache import CachedTranslator, TranslationMemory
+            _translators[key] = CachedTranslator(create_backend(backend, source, target, url, concurrency, rate, glossary),
+                                                  memory or TranslationMemory(db_path=None), source, target,
+                                                  memory_namespace(backend, url))
+        return _translators[key]
+
+
+def memory_namespace(backend, url=None):
+    # Both Google backends give the same translations; other services are told apart by their url
+    if backend in ("google", "google-async"):
+        return "google"
+    return f"{backend}:{url}" if url else backend
+
+
+def loaded_models():
+    """Returns the keys of the readers and translators created so far."""
+    with _lock:
+        return {"readers": sorted(_readers), "translators": sorted(_translators)}
@@ -0,0 +1,317 @@
+'''
+This script translates a video straight into another video, without writing frames to disk.
+
+Frames are read with cv2.VideoCapture, translated in memory by a pool of threads and written in
+order with cv2.VideoWriter. Only a bounded window of frames is in flight at any time, so memory use
+does not grow with the length of the video. Results of the last few unique frames are kept so
+frames that look like them (see frameDedup.py) are written again without being translated.
+
+translate_video_processes does the same with worker processes: frames are decoded straight into a
+shared memory ring (see frameRing.py), workers translate them in place by slot index and a slot is
+recycled once its frame has been written, so no frame is pickled between processes.
+'''
+
+import os
+import time
+from multiprocessing import util
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import cv2
+import numpy as np
+from PIL import Image
+from batchTranslation import translate_texts
+from frameDedup import FrameIndex
+from frameRing import FrameRing
+from metrics import get_metrics
+from regionTracking import RegionTracker
+from translationModels import set_torch_threads
+
+
+def translate_frame(frame, ocr, translator, render, text_boxes=None):
+    """
+    Translates the text of one BGR frame.
+
+    Args:
+        frame (numpy.ndarray): BGR frame as returned by cv2.VideoCapture.read.
+        ocr (callable): Takes an RGB array and returns a list of (bbox, text) boxes; with easyocr, use
+            ocrInput.readtext_rgb, as readtext takes arrays for BGR.
+        translator: Translator passed to batchTranslation.translate_texts.
+        render (callable): Takes (image, translated_texts, text_boxes) and returns the rendered PIL image.
+        text_boxes (list): Boxes already found for this frame, in which case ocr is not called.
+
+    Returns:
+        numpy.ndarray: The translated BGR frame.
+    """
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    if text_boxes is None:
+        text_boxes = ocr(rgb_frame)
+    if not text_boxes:
+        return frame
+
+    translated_texts = translate_texts(translator, [box[1] for box in text_boxes])
+    image = render(Image.fromarray(rgb_frame), translated_texts, text_boxes)
+    return cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2BGR)
+
+
+def translate_frame_or_source(frame, ocr, translator, render, text_boxes=None):
+    # A frame that fails to translate is written untranslated rather than stopping the whole video
+    try:
+        return translate_frame(frame, ocr, translator, render, text_boxes)
+    except Exception as e:
+        get_metrics().count("failed_frames")
+        print(f"[WARNING] Couldn't translate a frame, writing it untranslated: {e}")
+        return frame
+
+
+def translate_video(video_path, output_video, ocr, translator, render, workers=4, window=16, codec="mp4v",
+                    reuse_frames=32, track_regions=False, keyframe_interval=15):
+    """
+    Translates every frame of a video and writes the result to a new video.
+    Frames whose translation fails are written untranslated.
+
+    Args:
+        video_path (str): Path to the input video.
+        output_video (str): Path to save the output video file.
+        ocr (callable): Takes an RGB array and returns a list of (bbox, text) boxes; with easyocr, use
+            ocrInput.readtext_rgb, as readtext takes arrays for BGR.
+        translator: Translator passed to batchTranslation.translate_texts.
+        render (callable): Takes (image, translated_texts, text_boxes) and returns the rendered PIL image.
+        workers (int): Number of frames translated concurrently.
+        window (int): Maximum number of frames held in memory (read but not yet written).
+        codec (str): FourCC code of the output video.
+        reuse_frames (int): Number of recent unique frames whose translated result is kept, so a
+            frame that looks like one of them is not translated again.
+        track_regions (bool): OCR frames in reading order with regionTracking.RegionTracker, so
+            unchanged text boxes are not recognized again.
+        keyframe_interval (int): With track_regions, frames between two full-frame OCRs.
+
+    Returns:
+        int: Number of frames written.
+    """
+    if not os.path.isfile(video_path):
+        print(f"Error: Video file '{video_path}' not found.")
+        return 0
+
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        print(f"Error: Unable to open video file '{video_path}'.")
+        return 0
+
+    frame_rate = video.get(cv2.CAP_PROP_FPS) or 30
+    width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    video_writer = cv2.VideoWriter(output_video, cv2.VideoWriter_fourcc(*codec), frame_rate, (width, height))
+
+    pending = deque()  # Futures of frames in reading order
+    results = {}  # Canonical frame number -> future of its translated frame
+    frame_index = FrameIndex(max_entries=reuse_frames, on_evict=lambda frame_id: results.pop(frame_id, None))
+    tracker = RegionTracker(ocr, keyframe_interval) if track_regions else None
+    frame_number = 0
+    written = 0
+    start_time = time.time()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                ret, frame = video.read()
+                if not ret:
+                    break
+
+                # Frames looking like a recent unique frame reuse its result instead of being translated again
+                canonical_id, is_new = frame_index.lookup(frame, frame_number)
+                if is_new:
+                    # Tracking needs frames in order, so its OCR runs here rather than in the pool
+                    text_boxes = None
+                    if tracker is not None:
+                        try:
+                            text_boxes = tracker.update(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                        except Exception as e:
+                            get_metrics().count("failed_frames")
+                            print(f"[WARNING] Couldn't OCR frame {frame_number}, writing it untranslated: {e}")
+                            text_boxes = []  # No boxes: the frame is written as it is
+                    results[canonical_id] = executor.submit(translate_frame_or_source, frame, ocr, translator,
+                                                            render, text_boxes)
+                pending.append(results[canonical_id])
+                frame_number += 1
+
+                # Write finished frames in order once the window is full
+                while len(pending) >= window:
+                    video_writer.write(pending.popleft().result())
+                    written += 1
+
+            while pending:
+                video_writer.write(pending.popleft().result())
+                written += 1
+    finally:
+        # Release the capture and finalize the output, also when reading or writing failed
+        video.release()
+        video_writer.release()
+
+    elapsed = time.time() - start_time
+    print(f"Translated {written} frames to '{output_video}' in {elapsed:.1f}s ({written / max(elapsed, 1e-9):.2f} frames/sec).")
+    if tracker is not None:
+        print(f"Region tracking: {tracker.stats()}")
+    return written
+
+
+def create_ocr():
+    """Default OCR factory of the worker processes: easyocr through TranslateMultipleImage.perform_ocr."""
+    from TranslateMultipleImage import create_reader, perform_ocr
+    reader = create_reader()
+    return lambda frame: perform_ocr(frame, reader)
+
+
+def create_translator():
+    from TranslateMultipleImage import create_translator
+    return create_translator()
+
+
+def create_render():
+    from TranslateMultipleImage import overlay_translated_text
+    return overlay_translated_text
+
+
+worker_ring = None
+worker_ocr = None
+worker_translator = None
+worker_render = None
+
+def init_frame_worker(ring_name, slots, shape, torch_threads, ocr_factory, translator_factory, render_factory):
+    global worker_ring, worker_ocr, worker_translator, worker_render
+
+    # Split the cores between workers instead of letting every torch pool use all of them
+    set_torch_threads(torch_threads)
+
+    # Detach from the ring when the worker exits (the pool has no hook of its own for that)
+    worker_ring = FrameRing.attach(ring_name, slots, shape)
+    util.Finalize(worker_ring, worker_ring.close, exitpriority=10)
+    worker_ocr = ocr_factory()
+    worker_translator = translator_factory()
+    worker_render = render_factory()
+
+def translate_slot_in_worker(slot):
+    # The frame is read from and written back to shared memory, only the slot index is pickled
+    frame = worker_ring.view(slot)
+    translated = translate_frame_or_source(frame, worker_ocr, worker_translator, worker_render)
+    if translated is not frame:
+        frame[...] = translated
+    return slot
+
+
+def translate_video_processes(video_path, output_video, workers=4, slots=None, codec="mp4v", reuse_frames=32,
+                              ocr_factory=create_ocr, translator_factory=create_translator,
+                              render_factory=create_render):
+    """
+    Translates every frame of a video with worker processes and writes the result to a new video.
+
+    Args:
+        video_path (str): Path to the input video.
+        output_video (str): Path to save the output video file.
+        workers (int): Number of worker processes.
+        slots (int): Number of frames in the shared memory ring (read but not yet written),
+            2 per worker by default.
+        codec (str): FourCC code of the output video.
+        reuse_frames (int): Number of recent unique frames remembered by the frame index; a frame
+            looking like one of them reuses its result while that result is still in the ring.
+        ocr_factory (callable): Called once in each worker, returns the OCR callable.
+        translator_factory (callable): Called once in each worker, returns the translator.
+        render_factory (callable): Called once in each worker, returns the render function.
+            The factories must be module-level functions so they can be sent to the workers.
+
+    Returns:
+        int: Number of frames written.
+    """
+    if not os.path.isfile(video_path):
+        print(f"Error: Video file '{video_path}' not found.")
+        return 0
+
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        print(f"Error: Unable to open video file '{video_path}'.")
+        return 0
+
+    frame_rate = video.get(cv2.CAP_PROP_FPS) or 30
+    width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    video_writer = cv2.VideoWriter(output_video, cv2.VideoWriter_fourcc(*codec), frame_rate, (width, height))
+
+    slots = slots or workers * 2
+    ring = FrameRing(slots, (height, width, 3))
+    pending = deque()  # (future, slot) of frames in reading order
+    results = {}  # Canonical frame number -> (future, slot) while its slot is still in the ring
+    references = {}  # Slot -> number of pending frames to be written from it
+    slot_frames = {}  # Slot -> canonical frame number translated in it
+    frame_index = FrameIndex(max_entries=reuse_frames, on_evict=lambda frame_id: results.pop(frame_id, None))
+    frame_number = 0
+    written = 0
+    start_time = time.time()
+
+    def write_oldest():
+        # Write the oldest frame and recycle its slot once no pending frame refers to it
+        future, slot = pending.popleft()
+        future.result()
+        video_writer.write(ring.view(slot))
+        references[slot] -= 1
+        if references[slot] == 0:
+            if results.get(slot_frames[slot], (None, None))[1] == slot:
+                del results[slot_frames[slot]]
+            ring.release(slot)
+        return 1
+
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_frame_worker,
+                                 initargs=(ring.name, slots, ring.shape, torch_threads,
+                                           ocr_factory, translator_factory, render_factory)) as executor:
+            while True:
+                while not ring.has_free_slot():
+                    written += write_oldest()
+
+                # Decode straight into the slot; cv2 returns a new array if it cannot reuse it
+                slot = ring.acquire()
+                slot_frame = ring.view(slot)
+                ret, frame = video.read(slot_frame)
+                if not ret:
+                    ring.release(slot)
+                    break
+                if frame.ctypes.data != slot_frame.ctypes.data:
+                    ring.write(slot, frame)
+
+                canonical_id, _ = frame_index.lookup(slot_frame, frame_number)
+                if canonical_id in results:
+                    # A recent frame looks the same and its result is still in the ring
+                    ring.release(slot)
+                else:
+                    results[canonical_id] = (executor.submit(translate_slot_in_worker, slot), slot)
+                    references[slot] = 0
+                    slot_frames[slot] = canonical_id
+                future, result_slot = results[canonical_id]
+                references[result_slot] += 1
+                pending.append((future, result_slot))
+                frame_number += 1
+
+            while pending:
+                written += write_oldest()
+    finally:
+        video.release()
+        video_writer.release()
+        ring.close()
+
+    elapsed = time.time() - start_time
+    print(f"Translated {written} frames to '{output_video}' in {elapsed:.1f}s ({written / max(elapsed, 1e-9):.2f} frames/sec).")
+    return written
+
+
+if __name__ == "__main__":
+    from TranslateMultipleImage import create_reader, perform_ocr, overlay_translated_text
+
+    # Example usage
+    video_path = "canada.mp4"
+    output_video_path = "canada-translated.mp4"
+
+    reader = create_reader()
+    translate_video(video_path, output_video_path, lambda frame: perform_ocr(frame, reader),
+                    create_translator(), overlay_translated_text)
+
+    # On a machine with many cores, worker processes scale further than threads:
+    # translate_video_processes(video_path, output_video_path, workers=os.cpu_count())
@@ -1,15 +1,80 @@
 '''
 This script convert an input video to frames / a list of images
+
+Images are written by a thread pool while the next frames are decoded (cv2.imwrite releases the
+GIL, and PNG encoding is most of the export time). PNG compression is configurable, and frames can
+be saved as lossless WebP or as raw .npy arrays instead. A time range or every Nth frame can be
+extracted, seeking to the start of the range.
 '''
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
+from frameDedup import FrameIndex, save_manifest
+
+IMAGE_FORMATS = ("png", "webp", "npy")
+MAX_PENDING_WRITES_PER_WRITER = 4  # Frames waiting to be written per writer thread, bounds memory
+
+
+def write_frame(path, frame, params):
+    # Returns False when the image could not be written
+    if path.endswith(".npy"):
+        np.save(path, frame)
+        return True
+    return cv2.imwrite(path, frame, params)
+
+
+def image_params(image_format, png_compression=None):
+    """Returns the cv2.imwrite parameters of an image format ('png', 'webp' or 'npy')."""
+    if image_format == "png" and png_compression is not None:
+        return [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+    if image_format == "webp":
+        # OpenCV encodes WebP losslessly above quality 100
+        return [cv2.IMWRITE_WEBP_QUALITY, 101]
+    return []
+
+
+def check_written(frame_filename, future):
+    if not future.result():
+        print(f"Warning: Couldn't write image {frame_filename}.")
+
+
+def video_to_images(video_path, output_folder, similarity_threshold=12, image_format="png", png_compression=None,
+                    writers=4, start_time=None, end_time=None, every_nth=1, max_unique_frames=256):
+    '''
+    Exports the unique frames of a video and a manifest mapping every frame to its unique image.
+
+    Frames that look like one of the last max_unique_frames unique frames (not only the previous one) are
+    not exported again; see frameDedup.FrameIndex for the similarity_threshold (0 only merges frames whose
+    thumbnails are identical).
+
+    Args:
+        video_path (str): Path of the video.
+        output_folder (str): Folder receiving the images and the manifest.
+        similarity_threshold (int): See frameDedup.FrameIndex, -1 exports every frame.
+        image_format (str): 'png', 'webp' (lossless) or 'npy' (raw arrays, fastest to write and read
+            back, but not read by TranslateMultipleImage.py).
+        png_compression (int): PNG compression level from 0 (largest files) to 9 (smallest, slowest), None
+            for OpenCV's default, which uses a fast run-length strategy and is usually as fast as 0.
+        writers (int): Threads writing images.
+        start_time (float): First second of the video to extract, None for the start.
+        end_time (float): Second of the video where extraction stops, None for the end.
+        every_nth (int): Extract one frame out of every_nth; the manifest frame rate is divided accordingly.
+            The frames in between are grabbed without being converted to images.
+        max_unique_frames (int): Recent unique frames a frame is compared with, which bounds the cost of
+            each comparison; a frame looking like an older one is exported again. None compares with all.
+
+    Returns:
+        int: Number of frames extracted.
+    '''
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format '{image_format}', expected one of {IMAGE_FORMATS}")
 
-def video_to_images(video_path, output_folder):
     # Check if the video file exists
     if not os.path.isfile(video_path):
         print(f"Error: Video file '{video_path}' not found.")
-        return
+        return 0
 
     # Create the output folder if it doesn't exist
     if not os.path.exists(output_folder):
@@ -21,40 +86,70 @@ def video_to_images(video_path, output_folder):
     # Check if the video was opened successfully
     if not video.isOpened():
         print(f"Error: Unable to open video file '{video_path}'.")
-        return
+        return 0
 
+    source_frame_rate = video.get(cv2.CAP_PROP_FPS) or None
+
+    # Seek to the start of the range instead of decoding the frames before it
     frame_count = 0
+    if start_time:
+        video.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
+        frame_count = int(video.get(cv2.CAP_PROP_POS_FRAMES))
+    end_frame = int(round(end_time * source_frame_rate)) if end_time is not None and source_frame_rate else None
+
     saved_count = 0
-    prev_frame = None  # To store the previous frame for comparison
+    frame_index = FrameIndex(threshold=similarity_threshold, max_entries=max_unique_frames)
+    frames = []  # Canonical image file name for every extracted frame
+    params = image_params(image_format, png_compression)
+    pending = deque()  # (file name, future) of the images being written
+    max_pending = max(1, writers) * MAX_PENDING_WRITES_PER_WRITER
 
-    while True:
-        # Read a frame from the video
-        ret, frame = video.read()
+    with ThreadPoolExecutor(max_workers=max(1, writers)) as executor:
+        while end_frame is None or frame_count < end_frame:
+            # Read a frame from the video
+            ret, frame = video.read()
 
-        # If no frame is read, we reached the end of the video
-        if not ret:
-            break
+            # If no frame is read, we reached the end of the video (or of the range without a known frame rate)
+            if not ret or (end_time is not None and end_frame is None
+                           and video.get(cv2.CAP_PROP_POS_MSEC) > end_time * 1000):
+                break
 
-        # Check if the current frame is identical to the previous frame
-        if prev_frame is not None and np.array_equal(prev_frame, frame):
+            # Generate the file name for the frame image, numbered by its position in the video
+            frame_filename = f"frame_{frame_count:04d}.{image_format}"
+
+            # Map the frame to an earlier frame that looks the same, if any
+            canonical_filename, is_new = frame_index.lookup(frame, frame_filename)
+            frames.append(canonical_filename)
             frame_count += 1
-            continue  # Skip saving this frame
 
-        # Generate the file name for the frame image
-        frame_filename = os.path.join(output_folder, f"frame_{frame_count:04d}.png")
+            # Skip the frames between two extracted ones without decoding them to images
+            skipped = 0
+            while skipped < every_nth - 1 and video.grab():
+                skipped += 1
+            frame_count += skipped
+
+            if not is_new:
+                continue  # Skip saving this frame
 
-        # Save the frame as an image
-        cv2.imwrite(frame_filename, frame)
-        saved_count += 1
+            # Save the frame as an image on a writer thread, waiting when too many writes are queued
+            if len(pending) >= max_pending:
+                check_written(*pending.popleft())
+            pending.append((frame_filename, executor.submit(write_frame, os.path.join(output_folder, frame_filename),
+                                                            frame, params)))
+            saved_count += 1
 
-        # Update the previous frame
-        prev_frame = frame
-        frame_count += 1
+        while pending:
+            check_written(*pending.popleft())
+
+    frame_rate = source_frame_rate / every_nth if source_frame_rate else None
+    save_manifest(output_folder, frames, frame_rate)
 
     # Release the video capture object
     video.release()
 
-    print(f"Exported {saved_count} unique frames to '{output_folder}'.")
+    print(f"Exported {saved_count} unique frames of {len(frames)} to '{output_folder}'.")
+    return len(frames)
+
 
 if __name__ == "__main__":
     # Input MP4 video file